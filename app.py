@@ -1,39 +1,144 @@
 # Premier League Betting Advice Application
 # Flask backend with statistical analysis
 
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
-from datetime import datetime, timedelta
+from flask import Flask, Response, render_template, jsonify, request, session, redirect, url_for
+from datetime import datetime, timedelta, timezone
 import json
 import statistics
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import sqlite3
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
+from types import MappingProxyType
 import secrets
+import tempfile
 import math
+import random
 import re
-from functools import lru_cache
+import bisect
+import heapq
+import threading
+import multiprocessing
+import time
+import warnings
+import zlib
+import base64
+import gzip
+import hashlib
+import numpy as np
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(32)  # Generate secure secret key for sessions
 
 # Database setup
 DATABASE = 'premier_league.db'
+MATCH_STORE_CHECK_INTERVAL = int(os.environ.get('MATCH_STORE_CHECK_INTERVAL', 30))  # Seconds between checks for matches other processes imported
 
 # Exchange Odds Adjustment
 # Bet365 odds have ~8% margin, but exchanges offer ~2% margin
 # Example: 1.83 on Bet365 = 1.93 on exchange (5.46% better)
 EXCHANGE_ODDS_MULTIPLIER = 1.93 / 1.83  # ≈ 1.0546
 
-# Odds Caching - store fetched odds for 1 hour
-ODDS_CACHE = {}
+# Odds Caching - store fetched odds for 1 hour (ODDS_CACHE is shared across workers, see SharedOddsCache)
 ODDS_CACHE_EXPIRY = 3600  # 1 hour in seconds
+ODDS_BACKGROUND_REFRESH = os.environ.get('ODDS_BACKGROUND_REFRESH', 'true').lower() == 'true'
+ODDS_REFRESH_AHEAD = float(os.environ.get('ODDS_REFRESH_AHEAD', 0.8))  # Refresh at this fraction of the expiry
+ODDS_REFRESH_INTERVAL = int(os.environ.get('ODDS_REFRESH_INTERVAL', 60))  # Max seconds between refresher checks
+# Refresh interval by time to the league's next kickoff: (seconds until kickoff, interval)
+ODDS_REFRESH_TIERS = (
+    (3600, 300),             # Within the hour or in play: every 5 minutes
+    (3 * 3600, 900),         # Within 3 hours: every 15 minutes
+    (24 * 3600, 1800),       # Today: every 30 minutes
+    (72 * 3600, 2 * 3600),   # Within 3 days: every 2 hours
+)
+ODDS_REFRESH_MAX = int(os.environ.get('ODDS_REFRESH_MAX', 6 * 3600))  # Nothing within 3 days
+ODDS_QUOTA_RESERVE = int(os.environ.get('ODDS_QUOTA_RESERVE', 20))  # Requests kept back for first fetches
+ODDS_QUOTA_RESET_DAY = int(os.environ.get('ODDS_QUOTA_RESET_DAY', 1))  # Day of month the quota resets (UTC)
+ODDS_REFRESH_IDLE = int(os.environ.get('ODDS_REFRESH_IDLE', 6 * 3600))  # Stop refreshing leagues nobody requested for this long
 ODDS_LAST_FETCH = None
+# Leagues scanned by league=all (The Odds API sport keys)
+ODDS_LEAGUES = [s for s in os.environ.get('ODDS_LEAGUES', ','.join([
+    'soccer_epl', 'soccer_efl_champ', 'soccer_spain_la_liga', 'soccer_germany_bundesliga',
+    'soccer_italy_serie_a', 'soccer_france_ligue_one', 'soccer_uefa_champs_league'
+])).split(',') if s]
+ODDS_FETCH_CONCURRENCY = int(os.environ.get('ODDS_FETCH_CONCURRENCY', 6))  # Leagues fetched/priced at once
+ODDS_RETRY_BASE = float(os.environ.get('ODDS_RETRY_BASE', 60))  # Seconds before retrying a failed league fetch; doubled per failure
+ODDS_RETRY_MAX = float(os.environ.get('ODDS_RETRY_MAX', 1800))
+
+# Value bets are precomputed per (league, model, region) when odds refresh (see ValueBetPipeline)
+VALUE_BET_PRECOMPUTE = os.environ.get('VALUE_BET_PRECOMPUTE', 'true').lower() == 'true'
+VALUE_BET_MODELS = [m for m in os.environ.get(
+    'VALUE_BET_MODELS', 'simple,opponent,complex,anomaly,form_momentum,sentiment_external,overall'
+).split(',') if m]
+VALUE_BET_CHECK_INTERVAL = int(os.environ.get('VALUE_BET_CHECK_INTERVAL', 300))  # Seconds between input-change checks
+VALUE_BET_PAGE_SIZE = int(os.environ.get('VALUE_BET_PAGE_SIZE', 50))  # Default /api/value-bets page size
+VALUE_BET_MAX_PAGE_SIZE = int(os.environ.get('VALUE_BET_MAX_PAGE_SIZE', 500))
+VALUE_BET_EXPLAIN_BATCH = int(os.environ.get('VALUE_BET_EXPLAIN_BATCH', 100))  # Max keys per /api/value-bets/explain call
+# Fixture pricing process pool (0 processes prices in the request thread). PRICING_PROCESSES is
+# for the whole host: each of the WEB_CONCURRENCY gunicorn workers gets an equal share of it.
+# The anomaly model is one vectorized scan per payload, so it is not pooled by default
+PRICING_PROCESSES = int(os.environ.get('PRICING_PROCESSES', max(0, min(4, (os.cpu_count() or 1) - 1))))
+WEB_CONCURRENCY = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))  # gunicorn's worker count (set it with -w too)
+PRICING_PROCESS_MIN_FIXTURES = int(os.environ.get('PRICING_PROCESS_MIN_FIXTURES', 8))  # Smaller slates are priced in-thread
+PRICING_PROCESS_MODELS = [m for m in os.environ.get(
+    'PRICING_PROCESS_MODELS', 'simple,opponent,complex,form_momentum,sentiment_external,overall'
+).split(',') if m]
+PRICING_START_METHOD = os.environ.get('PRICING_START_METHOD', 'spawn')  # 'fork' is unsafe with the app's threads
+# Arbitrage scanner: sets within this many percent of an arbitrage are reported as near-arbitrage
+ARBITRAGE_NEAR_MARGIN = float(os.environ.get('ARBITRAGE_NEAR_MARGIN', 2.0))
+ARBITRAGE_STAKE = float(os.environ.get('ARBITRAGE_STAKE', 100))  # Total stake the splits are quoted for
+EXCHANGE_COMMISSION = float(os.environ.get('EXCHANGE_COMMISSION', 0.02))  # Charged on lay winnings
+# Odds anomalies: a bookmaker's margin-adjusted probability this many robust (median/MAD) deviations
+# better than the consensus of at least ODDS_ANOMALY_MIN_BOOKMAKERS bookmakers
+ODDS_ANOMALY_Z = float(os.environ.get('ODDS_ANOMALY_Z', 3.5))
+ODDS_ANOMALY_MIN_BOOKMAKERS = int(os.environ.get('ODDS_ANOMALY_MIN_BOOKMAKERS', 3))
+ODDS_ANOMALY_MAD_FLOOR = float(os.environ.get('ODDS_ANOMALY_MAD_FLOOR', 0.01))  # Probability points; stops a unanimous market flagging every tick
 
 # External API Configuration
-FPL_API_BASE = 'https://fantasy.premierleague.com/api'
+FPL_API_BASE = os.environ.get('FPL_API_BASE', 'https://fantasy.premierleague.com/api')  # Point at a stand-in server for tests
+FPL_CACHE_TTL = int(os.environ.get('FPL_CACHE_TTL', 1800))  # 30 minutes in seconds
+FPL_CACHE_FILE = os.environ.get('FPL_CACHE_FILE', 'fpl_bootstrap_cache.json')  # Survives restarts
+FPL_RETRY_BASE = float(os.environ.get('FPL_RETRY_BASE', 30))  # Seconds before retrying a failed refresh; doubled per failure
+FPL_RETRY_MAX = float(os.environ.get('FPL_RETRY_MAX', 1800))
+FPL_HISTORY_INTERVAL = int(os.environ.get('FPL_HISTORY_INTERVAL', 6 * 3600))  # Min seconds between recorded snapshots
+FPL_DETAIL_FETCH = os.environ.get('FPL_DETAIL_FETCH', 'true').lower() == 'true'  # Per-player/fixture endpoints
+FPL_DETAIL_CONCURRENCY = int(os.environ.get('FPL_DETAIL_CONCURRENCY', 8))
+FPL_DETAIL_RATE_LIMIT = float(os.environ.get('FPL_DETAIL_RATE_LIMIT', 10))  # Requests per second per host
+FPL_DETAIL_TTL = int(os.environ.get('FPL_DETAIL_TTL', 3600))
 TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN', '')  # Optional - for X sentiment
 
+# Shared HTTP client for external APIs (see ExternalAPIClient)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_TIMEOUTS = {  # Per endpoint: (connect, read) seconds
+    'default': (HTTP_CONNECT_TIMEOUT, 10),
+    'odds': (HTTP_CONNECT_TIMEOUT, float(os.environ.get('HTTP_TIMEOUT_ODDS', 15))),
+    'fpl_bootstrap': (HTTP_CONNECT_TIMEOUT, float(os.environ.get('HTTP_TIMEOUT_FPL', 10))),
+    'fpl_detail': (HTTP_CONNECT_TIMEOUT, float(os.environ.get('HTTP_TIMEOUT_FPL_DETAIL', 10))),
+}
+HTTP_DEADLINES = {  # Per endpoint: seconds for all attempts and backoff together
+    # Below SharedOddsCache's fetch lease (30s), so a slow fetch never outlives its lease
+    'odds': float(os.environ.get('HTTP_DEADLINE_ODDS', 25)),
+}
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+HTTP_BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', 0.5))  # Seconds; doubled per attempt, full jitter
+HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', 8))
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', max(10, FPL_DETAIL_CONCURRENCY)))  # Keep-alive connections per host
+
+# Overall model: sub-models run concurrently, each within its own latency budget (seconds)
+MODEL_WORKERS = int(os.environ.get('MODEL_WORKERS', 6))
+MODEL_BUDGETS = {
+    'complex': float(os.environ.get('MODEL_BUDGET_COMPLEX', 2.0)),
+    'form_momentum': float(os.environ.get('MODEL_BUDGET_FORM', 2.0)),
+    'sentiment': float(os.environ.get('MODEL_BUDGET_SENTIMENT', 3.0)),
+}
+MODEL_WEIGHTS_FILE = os.environ.get('MODEL_WEIGHTS_FILE', 'model_weights.json')  # Written by calibrate_weights.py
+MODEL_WEIGHTS_AUTO_REFIT = (os.environ.get('MODEL_WEIGHTS_AUTO_REFIT', 'true').lower() == 'true'  # Refit after the app imports matches itself
+                            and multiprocessing.parent_process() is None)  # Never in pricing pool workers
+
 # Premier League Team Mappings (FPL names to our DB names)
 FPL_TEAM_MAPPING = {
     'Arsenal': 'Arsenal',
@@ -62,9 +167,9 @@ FPL_TEAM_MAPPING = {
     'Sunderland': 'Sunderland'
 }
 
-def get_db():
+def get_db(check_same_thread=True):
     """Get database connection"""
-    db = sqlite3.connect(DATABASE)
+    db = sqlite3.connect(DATABASE, check_same_thread=check_same_thread)
     db.row_factory = sqlite3.Row
     return db
 
@@ -75,16 +180,19 @@ def init_db():
     
     if not db_exists:
         print("Database not found, creating...")
-        db = get_db()
-        try:
-            with app.open_resource('schema.sql', mode='r') as f:
-                db.cursor().executescript(f.read())
-            db.commit()
+    
+    # Schema is idempotent (IF NOT EXISTS), so apply it every start to pick up new tables
+    db = get_db()
+    try:
+        with app.open_resource('schema.sql', mode='r') as f:
+            db.cursor().executescript(f.read())
+        db.commit()
+        if not db_exists:
             print("Database schema created!")
-        except Exception as e:
-            print(f"Database schema creation error: {e}")
-        finally:
-            db.close()
+    except Exception as e:
+        print(f"Database schema creation error: {e}")
+    finally:
+        db.close()
     
     # Check if database has data
     try:
@@ -187,6 +295,289 @@ def import_historical_data():
     
     print(f"Total matches imported: {total}")
 
+    # Append the new rows to the in-memory match store (if it has been built)
+    if MATCH_STORE.loaded:
+        MATCH_STORE.refresh()
+    
+    # Refit the ensemble weights on the new history
+    if total:
+        refit_model_weights_after_import()
+
+
+# Set when matches were imported before the weight calibrator was loaded (first start)
+MODEL_WEIGHTS_REFIT_PENDING = False
+
+
+def refit_model_weights_after_import():
+    """Refit the weights on newly imported matches (deferred while the module is still loading)"""
+    global MODEL_WEIGHTS_REFIT_PENDING
+    if not MODEL_WEIGHTS_AUTO_REFIT:
+        return
+    if 'MODEL_WEIGHTS' in globals():
+        refit_model_weights_if_stale()
+    else:
+        MODEL_WEIGHTS_REFIT_PENDING = True
+
+
+# =============================================================================
+# IN-MEMORY MATCH STORE & HEAD-TO-HEAD INDEX
+# =============================================================================
+class HeadToHeadIndex:
+    """
+    Unordered-pair index over the match store.
+
+    Each pair of teams maps to its date-sorted match offsets plus running
+    aggregates (wins, draws, goals) from the perspective of the alphabetically
+    first team, so any last-N summary is two prefix-sum lookups.
+    """
+
+    def __init__(self):
+        self._pairs = {}
+
+    @staticmethod
+    def pair_key(team_a, team_b):
+        """Order-independent key for a pair of teams"""
+        return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def add(self, offset, match_date, home_team, away_team, home_goals, away_goals):
+        """Add one match (by store offset) to its pair entry"""
+        key = self.pair_key(home_team, away_team)
+        entry = self._pairs.get(key)
+        if entry is None:
+            entry = {
+                'dates': [], 'offsets': [],
+                'cum_wins_a': [0], 'cum_wins_b': [0], 'cum_draws': [0],
+                'cum_goals_a': [0], 'cum_goals_b': [0],
+                '_results': []
+            }
+            self._pairs[key] = entry
+
+        # Goals from the perspective of the first team in the key
+        if home_team == key[0]:
+            goals_a, goals_b = home_goals, away_goals
+        else:
+            goals_a, goals_b = away_goals, home_goals
+
+        if not entry['dates'] or match_date >= entry['dates'][-1]:
+            # Common case: matches arrive in date order, extend the running sums
+            entry['dates'].append(match_date)
+            entry['offsets'].append(offset)
+            entry['_results'].append((goals_a, goals_b))
+            self._extend_aggregates(entry, goals_a, goals_b)
+        else:
+            # Out-of-order insert: keep the entry date-sorted and rebuild its sums
+            pos = bisect.bisect_right(entry['dates'], match_date)
+            entry['dates'].insert(pos, match_date)
+            entry['offsets'].insert(pos, offset)
+            entry['_results'].insert(pos, (goals_a, goals_b))
+            for name in ('cum_wins_a', 'cum_wins_b', 'cum_draws', 'cum_goals_a', 'cum_goals_b'):
+                entry[name] = [0]
+            for ga, gb in entry['_results']:
+                self._extend_aggregates(entry, ga, gb)
+
+    @staticmethod
+    def _extend_aggregates(entry, goals_a, goals_b):
+        entry['cum_wins_a'].append(entry['cum_wins_a'][-1] + (1 if goals_a > goals_b else 0))
+        entry['cum_wins_b'].append(entry['cum_wins_b'][-1] + (1 if goals_b > goals_a else 0))
+        entry['cum_draws'].append(entry['cum_draws'][-1] + (1 if goals_a == goals_b else 0))
+        entry['cum_goals_a'].append(entry['cum_goals_a'][-1] + goals_a)
+        entry['cum_goals_b'].append(entry['cum_goals_b'][-1] + goals_b)
+
+    def get_offsets(self, team_a, team_b, as_of_date=None):
+        """Date-sorted store offsets for a pair (optionally only before a date)"""
+        entry = self._pairs.get(self.pair_key(team_a, team_b))
+        if entry is None:
+            return []
+        end = len(entry['dates']) if as_of_date is None else bisect.bisect_left(entry['dates'], as_of_date)
+        return entry['offsets'][:end]
+
+    def summary(self, home_team, away_team, num_matches=10, as_of_date=None):
+        """
+        Head-to-head record of the last num_matches meetings, from home_team's
+        perspective. With as_of_date, only meetings strictly before that date
+        are counted (point-in-time, for backtests).
+        """
+        key = self.pair_key(home_team, away_team)
+        entry = self._pairs.get(key)
+        if entry is None:
+            return None
+
+        end = len(entry['dates']) if as_of_date is None else bisect.bisect_left(entry['dates'], as_of_date)
+        start = max(0, end - num_matches)
+        total = end - start
+        if total <= 0:
+            return None
+
+        wins_a = entry['cum_wins_a'][end] - entry['cum_wins_a'][start]
+        wins_b = entry['cum_wins_b'][end] - entry['cum_wins_b'][start]
+        draws = entry['cum_draws'][end] - entry['cum_draws'][start]
+        goals_a = entry['cum_goals_a'][end] - entry['cum_goals_a'][start]
+        goals_b = entry['cum_goals_b'][end] - entry['cum_goals_b'][start]
+
+        if home_team == key[0]:
+            home_wins, away_wins, home_goals, away_goals = wins_a, wins_b, goals_a, goals_b
+        else:
+            home_wins, away_wins, home_goals, away_goals = wins_b, wins_a, goals_b, goals_a
+
+        return {
+            'matches': total,
+            'home_wins': home_wins,
+            'away_wins': away_wins,
+            'draws': draws,
+            'home_win_rate': home_wins / total,
+            'away_win_rate': away_wins / total,
+            'draw_rate': draws / total,
+            'home_goals_avg': home_goals / total,
+            'away_goals_avg': away_goals / total
+        }
+
+
+class MatchStore:
+    """
+    Columnar, in-memory copy of the matches table.
+
+    Loaded once per process on first use and appended incrementally
+    (rows with id > last_id) after imports. Imports by other workers or
+    by the import scripts are picked up by sync(), which compares
+    MAX(id) with last_id at most every check_interval seconds. Indexes
+    such as the head-to-head index hold offsets into these columns.
+    """
+
+    def __init__(self, check_interval=MATCH_STORE_CHECK_INTERVAL):
+        self._lock = threading.RLock()
+        self.check_interval = check_interval
+        self._checked_at = 0
+        self.loaded = False
+        self.version = 0
+        self._numpy_view = None
+        self._reset()
+
+    def _reset(self):
+        # New objects rather than clearing, so readers mid-lookup keep a consistent copy
+        self.last_id = 0
+        self.ids = []
+        self.dates = []
+        self.home_teams = []
+        self.away_teams = []
+        self.home_goals = []
+        self.away_goals = []
+        self.h2h = HeadToHeadIndex()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def numpy_view(self):
+        """
+        NumPy columns of the store plus per-team, date-sorted offsets
+        ('home', 'away', 'all'). Rebuilt only when the store version changes.
+        """
+        view = self._numpy_view
+        if view is not None and view['version'] == self.version:
+            return view
+
+        with self._lock:
+            dates = np.array(self.dates, dtype='datetime64[D]')
+            home_teams = np.array(self.home_teams, dtype=object)
+            away_teams = np.array(self.away_teams, dtype=object)
+            order = np.lexsort((np.array(self.ids), dates))
+
+            team_offsets = {}
+            for team in set(self.home_teams) | set(self.away_teams):
+                is_home = home_teams[order] == team
+                is_away = away_teams[order] == team
+                team_offsets[team] = {
+                    'home': order[is_home],
+                    'away': order[is_away],
+                    'all': order[is_home | is_away]
+                }
+
+            view = {
+                'version': self.version,
+                'dates': dates,
+                'home_goals': np.array(self.home_goals, dtype=np.int64),
+                'away_goals': np.array(self.away_goals, dtype=np.int64),
+                'home_teams': home_teams,
+                'team_offsets': team_offsets
+            }
+            self._numpy_view = view
+        return view
+
+    def ensure_loaded(self):
+        """Build the store from the database on first use"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.refresh()
+                    self._checked_at = time.time()
+                    self.loaded = True
+        return self
+
+    def sync(self):
+        """
+        Pick up matches written by other processes (re-checked at most
+        every check_interval seconds). Returns rows added.
+        """
+        if time.time() - self._checked_at < self.check_interval:
+            return 0
+        with self._lock:
+            self._checked_at = time.time()
+            db = get_db()
+            try:
+                latest = db.execute('SELECT MAX(id) AS last_id FROM matches').fetchone()['last_id'] or 0
+            finally:
+                db.close()
+            if latest == self.last_id:
+                return 0
+            if latest < self.last_id:
+                # The table was rebuilt (e.g. a fresh import into a new database): start over
+                self._reset()
+                self.version += 1
+            return self.refresh()
+
+    def refresh(self):
+        """Append any rows inserted since the last load. Returns rows added."""
+        with self._lock:
+            db = get_db()
+            try:
+                cursor = db.execute('''
+                    SELECT id, match_date, home_team, away_team,
+                           home_goals_full_time, away_goals_full_time
+                    FROM matches
+                    WHERE id > ?
+                    ORDER BY match_date ASC, id ASC
+                ''', (self.last_id,))
+                rows = cursor.fetchall()
+            finally:
+                db.close()
+
+            for row in rows:
+                offset = len(self.ids)
+                self.ids.append(row['id'])
+                self.dates.append(row['match_date'])
+                self.home_teams.append(row['home_team'])
+                self.away_teams.append(row['away_team'])
+                self.home_goals.append(row['home_goals_full_time'])
+                self.away_goals.append(row['away_goals_full_time'])
+                self.h2h.add(offset, row['match_date'], row['home_team'], row['away_team'],
+                             row['home_goals_full_time'], row['away_goals_full_time'])
+                self.last_id = max(self.last_id, row['id'])
+
+            if rows:
+                self.version += 1
+                print(f"Match store: +{len(rows)} matches ({len(self.ids)} total, {len(self.h2h)} pairs)")
+            return len(rows)
+
+
+MATCH_STORE = MatchStore()
+
+def get_match_store():
+    """Get the process-wide match store, building it on first use and keeping it in step with the table"""
+    MATCH_STORE.ensure_loaded().sync()
+    return MATCH_STORE
+
 # Initialize database when module loads (for gunicorn/production)
 try:
     init_db()
@@ -196,7 +587,7 @@ except Exception as e:
 
 # The Odds API Configuration
 ODDS_API_KEY = os.environ.get('ODDS_API_KEY', '9bc157f3e9720cc01a71655708f5c3ca')
-ODDS_API_BASE_URL = 'https://api.the-odds-api.com/v4'
+ODDS_API_BASE_URL = os.environ.get('ODDS_API_BASE_URL', 'https://api.the-odds-api.com/v4')  # Point at a stand-in server for tests
 
 # Betfair API Configuration
 BETFAIR_APP_KEY = os.environ.get('BETFAIR_APP_KEY', 'A4YclwMGYKSZlK0y')
@@ -209,8 +600,8 @@ APP_PASSWORD = 'Eva2020'
 class AdvancedBettingAnalyzer:
     """Advanced statistical analysis engine with EV calculations"""
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db=None):
+        self.db = db or get_db()
     
     def calculate_implied_probability(self, decimal_odds):
         """Convert decimal odds to implied probability"""
@@ -304,37 +695,6 @@ class AdvancedBettingAnalyzer:
         
         return stats
     
-    def detect_bookmaker_anomalies(self, bookmaker_odds_list):
-        """
-        Detect bookmaker anomalies - where one bookmaker offers 25%+ better odds
-        bookmaker_odds_list: list of dicts with {'bookmaker': name, 'odds': decimal_odds}
-        Returns: dict with average_odds, best_odds, anomaly info
-        """
-        if not bookmaker_odds_list or len(bookmaker_odds_list) < 2:
-            return None
-        
-        odds_values = [bm['odds'] for bm in bookmaker_odds_list]
-        avg_odds = statistics.mean(odds_values)
-        best_odds_data = max(bookmaker_odds_list, key=lambda x: x['odds'])
-        best_odds = best_odds_data['odds']
-        
-        # Calculate how much better the best odds is compared to average
-        if avg_odds > 0:
-            percentage_better = ((best_odds - avg_odds) / avg_odds) * 100
-        else:
-            percentage_better = 0
-        
-        is_anomaly = percentage_better >= 25  # 25% threshold
-        
-        return {
-            'average_odds': round(avg_odds, 2),
-            'best_odds': round(best_odds, 2),
-            'best_bookmaker': best_odds_data['bookmaker'],
-            'percentage_better': round(percentage_better, 1),
-            'is_anomaly': is_anomaly,
-            'all_bookmakers': sorted(bookmaker_odds_list, key=lambda x: x['odds'], reverse=True)
-        }
-    
     def calculate_ai_probability(self, home_team, away_team, bet_type, market, model='complex'):
         """
         Calculate AI probability using different models:
@@ -342,19 +702,34 @@ class AdvancedBettingAnalyzer:
         - opponent: Historical stats adjusted for opponent strength
         - complex: Multi-factor model with home advantage, form weighting, etc.
         """
+        stats = self.get_fixture_stats(home_team, away_team, historical=(model == 'complex'))
+        return self.probability_from_stats(stats, bet_type, market, model)
+    
+    def get_fixture_stats(self, home_team, away_team, historical=True):
+        """
+        Current-season (and optionally two-season) stats for both teams, fetched
+        once so several markets/models can be priced from them.
+        Returns (home_current, away_current, home_historical, away_historical).
+        """
         home_stats_current = self.get_team_historical_stats(home_team, seasons=1)
         away_stats_current = self.get_team_historical_stats(away_team, seasons=1)
         
-        if not home_stats_current or not away_stats_current:
-            return None
-        
         # Get historical stats for complex model
         home_stats_historical = None
         away_stats_historical = None
-        if model == 'complex':
+        if historical and home_stats_current and away_stats_current:
             home_stats_historical = self.get_team_historical_stats(home_team, seasons=2)
             away_stats_historical = self.get_team_historical_stats(away_team, seasons=2)
         
+        return home_stats_current, away_stats_current, home_stats_historical, away_stats_historical
+    
+    def probability_from_stats(self, stats, bet_type, market, model='complex'):
+        """Same as calculate_ai_probability, but priced from get_fixture_stats output"""
+        home_stats_current, away_stats_current, home_stats_historical, away_stats_historical = stats
+        
+        if not home_stats_current or not away_stats_current:
+            return None
+        
         if bet_type == 'moneyline':
             if model == 'simple':
                 return self._calculate_moneyline_simple(home_stats_current, away_stats_current, market)
@@ -909,58 +1284,13 @@ class FormMomentumAnalyzer:
         self._form_cache[cache_key] = result
         return result
     
-    def get_head_to_head(self, home_team, away_team, num_matches=10):
-        """Get head-to-head record between two teams."""
-        query = """
-            SELECT * FROM matches 
-            WHERE (home_team = ? AND away_team = ?) OR (home_team = ? AND away_team = ?)
-            ORDER BY match_date DESC
-            LIMIT ?
+    def get_head_to_head(self, home_team, away_team, num_matches=10, as_of_date=None):
         """
-        cursor = self.db.execute(query, (home_team, away_team, away_team, home_team, num_matches))
-        matches = cursor.fetchall()
-        
-        if not matches:
-            return None
-        
-        home_wins = 0
-        away_wins = 0
-        draws = 0
-        home_goals = 0
-        away_goals = 0
-        
-        for match in matches:
-            if match['home_team'] == home_team:
-                # Home team playing at home in this match
-                hg = match['home_goals_full_time']
-                ag = match['away_goals_full_time']
-            else:
-                # Home team playing away in this match
-                hg = match['away_goals_full_time']
-                ag = match['home_goals_full_time']
-            
-            home_goals += hg
-            away_goals += ag
-            
-            if hg > ag:
-                home_wins += 1
-            elif hg < ag:
-                away_wins += 1
-            else:
-                draws += 1
-        
-        total = len(matches)
-        return {
-            'matches': total,
-            'home_wins': home_wins,
-            'away_wins': away_wins,
-            'draws': draws,
-            'home_win_rate': home_wins / total,
-            'away_win_rate': away_wins / total,
-            'draw_rate': draws / total,
-            'home_goals_avg': home_goals / total,
-            'away_goals_avg': away_goals / total
-        }
+        Get head-to-head record between two teams.
+        Served from the in-memory pair index (no SQL); as_of_date restricts
+        the record to meetings before that date.
+        """
+        return get_match_store().h2h.summary(home_team, away_team, num_matches, as_of_date)
     
     def get_momentum_score(self, team_name, home_away='both'):
         """
@@ -1045,6 +1375,291 @@ class FormMomentumAnalyzer:
         
         return {'score': round(momentum, 2), 'trend': trend}
     
+    # Column layout of the batch feature matrix returned by features_for_fixtures
+    FEATURE_COLUMNS = (
+        'home_elo', 'away_elo',
+        'home_form_score', 'home_weighted_ppg', 'home_goals_per_game', 'home_conceded_per_game', 'home_form_matches',
+        'away_form_score', 'away_weighted_ppg', 'away_goals_per_game', 'away_conceded_per_game', 'away_form_matches',
+        'h2h_matches', 'h2h_home_win_rate', 'h2h_away_win_rate', 'h2h_draw_rate',
+        'h2h_home_goals_avg', 'h2h_away_goals_avg',
+        'home_momentum', 'home_momentum_matches', 'away_momentum', 'away_momentum_matches'
+    )
+    
+    def features_for_fixtures(self, fixtures, as_of=None):
+        """
+        Compute ELO, form, head-to-head and momentum for a whole gameweek in one pass.
+        
+        fixtures: list of (home_team, away_team) tuples or dicts with home_team/away_team
+        as_of: optional cutoff date - only matches strictly before it are used
+        
+        Returns {'columns', 'fixtures', 'matrix'} where matrix has one row per
+        fixture and one column per FEATURE_COLUMNS entry. All teams are gathered
+        up front and every feature is an array operation over the match store.
+        """
+        pairs = [
+            (f['home_team'], f['away_team']) if isinstance(f, dict) else (f[0], f[1])
+            for f in fixtures
+        ]
+        columns = self.FEATURE_COLUMNS
+        matrix = np.zeros((len(pairs), len(columns)))
+        features = {'columns': columns, 'fixtures': pairs, 'matrix': matrix}
+        if not pairs:
+            return features
+        
+        store = get_match_store()
+        view = store.numpy_view()
+        cutoff = np.datetime64(str(as_of)[:10], 'D') if as_of else None
+        col = {name: i for i, name in enumerate(columns)}
+        
+        home_teams = sorted({home for home, _ in pairs})
+        away_teams = sorted({away for _, away in pairs})
+        all_teams = sorted(set(home_teams) | set(away_teams))
+        
+        elo = dict(zip(all_teams, self._batch_elo(view, all_teams, cutoff)))
+        home_form = self._batch_form(view, home_teams, 'home', cutoff)
+        away_form = self._batch_form(view, away_teams, 'away', cutoff)
+        home_mom = self._batch_momentum(view, home_teams, 'home', cutoff)
+        away_mom = self._batch_momentum(view, away_teams, 'away', cutoff)
+        
+        home_rows = np.array([home_teams.index(home) for home, _ in pairs])
+        away_rows = np.array([away_teams.index(away) for _, away in pairs])
+        
+        matrix[:, col['home_elo']] = [elo[home] for home, _ in pairs]
+        matrix[:, col['away_elo']] = [elo[away] for _, away in pairs]
+        for prefix, form, rows in (('home', home_form, home_rows), ('away', away_form, away_rows)):
+            for name in ('form_score', 'weighted_ppg', 'goals_per_game', 'conceded_per_game'):
+                matrix[:, col[f'{prefix}_{name}']] = form[name][rows]
+            matrix[:, col[f'{prefix}_form_matches']] = form['matches'][rows]
+        for prefix, mom, rows in (('home', home_mom, home_rows), ('away', away_mom, away_rows)):
+            matrix[:, col[f'{prefix}_momentum']] = mom['score'][rows]
+            matrix[:, col[f'{prefix}_momentum_matches']] = mom['matches'][rows]
+        
+        as_of_date = str(cutoff) if cutoff is not None else None
+        for i, (home, away) in enumerate(pairs):
+            h2h = store.h2h.summary(home, away, 10, as_of_date)
+            if h2h:
+                matrix[i, col['h2h_matches']] = h2h['matches']
+                matrix[i, col['h2h_home_win_rate']] = h2h['home_win_rate']
+                matrix[i, col['h2h_away_win_rate']] = h2h['away_win_rate']
+                matrix[i, col['h2h_draw_rate']] = h2h['draw_rate']
+                matrix[i, col['h2h_home_goals_avg']] = h2h['home_goals_avg']
+                matrix[i, col['h2h_away_goals_avg']] = h2h['away_goals_avg']
+        
+        return features
+    
+    @staticmethod
+    def _years_before(day, years):
+        """Same calendar day `years` earlier (Feb 29 rolls to Mar 1, as SQLite does)"""
+        try:
+            return day.replace(year=day.year - years)
+        except ValueError:
+            return day.replace(year=day.year - years, month=3, day=1)
+    
+    @staticmethod
+    def _team_match_matrix(view, teams, side, start=None, end=None, limit=None, newest_first=False):
+        """
+        Gather each team's matches (side: 'home', 'away' or 'all') in [start, end)
+        into padded (team x match) goals-for / goals-against arrays.
+        """
+        sequences = []
+        for team in teams:
+            offsets = view['team_offsets'].get(team, {}).get(side, np.empty(0, dtype=np.intp))
+            team_dates = view['dates'][offsets]
+            lo = int(np.searchsorted(team_dates, start, 'left')) if start is not None else 0
+            hi = int(np.searchsorted(team_dates, end, 'left')) if end is not None else len(offsets)
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            selected = offsets[lo:hi]
+            sequences.append(selected[::-1] if newest_first else selected)
+        
+        counts = np.array([len(seq) for seq in sequences], dtype=np.int64)
+        width = max(int(counts.max()), 1)
+        idx = np.zeros((len(teams), width), dtype=np.intp)
+        for i, seq in enumerate(sequences):
+            idx[i, :len(seq)] = seq
+        mask = np.arange(width)[None, :] < counts[:, None]
+        
+        is_home = view['home_teams'][idx] == np.array(teams, dtype=object)[:, None]
+        goals_for = np.where(is_home, view['home_goals'][idx], view['away_goals'][idx])
+        goals_against = np.where(is_home, view['away_goals'][idx], view['home_goals'][idx])
+        return goals_for, goals_against, mask, counts
+    
+    def _batch_elo(self, view, teams, cutoff):
+        """calculate_elo_rating for many teams at once (3-year window before cutoff)"""
+        reference = cutoff.astype(object) if cutoff is not None else datetime.utcnow().date()
+        window_start = np.datetime64(self._years_before(reference, 3), 'D')
+        goals_for, goals_against, mask, counts = self._team_match_matrix(
+            view, teams, 'all', start=window_start, end=cutoff
+        )
+        
+        result = np.where(goals_for > goals_against, 1.0, np.where(goals_for == goals_against, 0.5, 0.0))
+        multiplier = 1 + np.minimum(np.abs(goals_for - goals_against), 3) * 0.1
+        num_matches = np.maximum(counts, 1)
+        
+        # The rating recurrence is sequential in time, so step through match
+        # slots while updating every team's rating together
+        elo = np.full(len(teams), 1500.0)
+        for j in range(goals_for.shape[1]):
+            expected = 1 / (1 + 10 ** ((1500 - elo) / 400))
+            k_factor = 16 + (16 * ((j + 1) / num_matches))
+            updated = elo + k_factor * multiplier[:, j] * (result[:, j] - expected)
+            elo = np.where(mask[:, j], updated, elo)
+        
+        return np.where(counts > 0, np.round(elo, 1), 1500.0)
+    
+    def _batch_form(self, view, teams, home_away, cutoff, num_games=5):
+        """get_recent_form for many teams at once"""
+        goals_for, goals_against, mask, counts = self._team_match_matrix(
+            view, teams, home_away, end=cutoff, limit=num_games, newest_first=True
+        )
+        
+        points = np.where(goals_for > goals_against, 3, np.where(goals_for == goals_against, 1, 0))
+        weights = np.exp(-0.3 * np.arange(goals_for.shape[1]))[None, :] * mask
+        total_weight = weights.sum(axis=1)
+        has_matches = counts > 0
+        weighted_ppg = (points * weights).sum(axis=1) / np.where(has_matches, total_weight, 1)
+        num_matches = np.maximum(counts, 1)
+        
+        return {
+            'form_score': np.where(has_matches, np.round(weighted_ppg / 3, 3), 0.5),
+            'weighted_ppg': np.round(weighted_ppg, 2),
+            'goals_per_game': np.round((goals_for * mask).sum(axis=1) / num_matches, 2),
+            'conceded_per_game': np.round((goals_against * mask).sum(axis=1) / num_matches, 2),
+            'matches': counts
+        }
+    
+    def _batch_momentum(self, view, teams, home_away, cutoff):
+        """get_momentum_score for many teams at once (last 10 games, recent half vs older half)"""
+        goals_for, goals_against, mask, counts = self._team_match_matrix(
+            view, teams, home_away, end=cutoff, limit=10, newest_first=True
+        )
+        
+        goal_diff = (goals_for - goals_against) * mask
+        half = counts // 2
+        slots = np.arange(goals_for.shape[1])[None, :]
+        recent = slots < half[:, None]
+        older = mask & ~recent
+        
+        recent_gd = (goal_diff * recent).sum(axis=1) / np.maximum(half, 1)
+        older_gd = (goal_diff * older).sum(axis=1) / np.maximum(counts - half, 1)
+        momentum = np.where(counts >= 4, recent_gd - older_gd, 0.0)
+        
+        return {'score': momentum, 'matches': counts}
+    
+    @staticmethod
+    def _momentum_trend(momentum):
+        """Trend label used by get_momentum_score"""
+        if momentum > 0.5:
+            return 'strong_positive'
+        elif momentum > 0:
+            return 'positive'
+        elif momentum > -0.5:
+            return 'negative'
+        return 'strong_negative'
+    
+    def _components_from_features(self, features, index):
+        """Rebuild the per-component dicts used by the pricing methods from one feature row"""
+        row = dict(zip(features['columns'], features['matrix'][index].tolist()))
+        
+        def form(prefix):
+            if row[f'{prefix}_form_matches'] == 0:
+                return {'form_score': 0.5, 'points': 0, 'goals_scored': 0, 'goals_conceded': 0, 'matches': 0}
+            return {
+                'form_score': row[f'{prefix}_form_score'],
+                'weighted_ppg': row[f'{prefix}_weighted_ppg'],
+                'goals_per_game': row[f'{prefix}_goals_per_game'],
+                'conceded_per_game': row[f'{prefix}_conceded_per_game'],
+                'matches': int(row[f'{prefix}_form_matches'])
+            }
+        
+        def momentum(prefix):
+            if row[f'{prefix}_momentum_matches'] < 4:
+                return {'score': 0, 'trend': 'neutral'}
+            score = row[f'{prefix}_momentum']
+            return {'score': round(score, 2), 'trend': self._momentum_trend(score)}
+        
+        h2h = None
+        if row['h2h_matches'] > 0:
+            h2h = {
+                'matches': int(row['h2h_matches']),
+                'home_win_rate': row['h2h_home_win_rate'],
+                'away_win_rate': row['h2h_away_win_rate'],
+                'draw_rate': row['h2h_draw_rate'],
+                'home_goals_avg': row['h2h_home_goals_avg'],
+                'away_goals_avg': row['h2h_away_goals_avg']
+            }
+        
+        return {
+            'home_elo': row['home_elo'],
+            'away_elo': row['away_elo'],
+            'home_form': form('home'),
+            'away_form': form('away'),
+            'h2h': h2h,
+            'home_momentum': momentum('home'),
+            'away_momentum': momentum('away')
+        }
+    
+    def probability_from_features(self, features, index, bet_type, market):
+        """Same as calculate_probability, but priced from a features_for_fixtures row"""
+        c = self._components_from_features(features, index)
+        
+        if bet_type == 'moneyline':
+            return self._calculate_moneyline(
+                c['home_elo'], c['away_elo'], c['home_form'], c['away_form'], c['h2h'],
+                c['home_momentum'], c['away_momentum'], market
+            )
+        elif bet_type == 'goals':
+            return self._calculate_goals(
+                c['home_form'], c['away_form'], c['h2h'], c['home_momentum'], c['away_momentum'], market
+            )
+        
+        return None
+    
+    # Order of the columns returned by moneyline_components
+    MONEYLINE_COMPONENTS = ('elo', 'form', 'h2h', 'momentum')
+    
+    def moneyline_components(self, features):
+        """
+        Vectorized _calculate_moneyline inputs for every features_for_fixtures row.
+        
+        Returns (components, draw): components is (fixtures x 4) home-win
+        probabilities per MONEYLINE_COMPONENTS entry, draw is the draw
+        probability. home_win = (components @ weights) * (1 - draw).
+        """
+        col = {name: i for i, name in enumerate(features['columns'])}
+        m = features['matrix']
+        
+        elo_prob = 1 / (1 + 10 ** (-(m[:, col['home_elo']] - m[:, col['away_elo']] + 65) / 400))
+        
+        home_form = np.where(m[:, col['home_form_matches']] == 0, 0.5, m[:, col['home_form_score']])
+        away_form = np.where(m[:, col['away_form_matches']] == 0, 0.5, m[:, col['away_form_score']])
+        form_prob = np.clip(0.5 + (home_form - away_form + 0.1) * 0.4, 0.1, 0.9)
+        
+        h2h_prob = np.where(
+            m[:, col['h2h_matches']] >= 3,
+            m[:, col['h2h_home_win_rate']] + m[:, col['h2h_draw_rate']] * 0.4,
+            0.5
+        )
+        
+        home_mom = np.where(m[:, col['home_momentum_matches']] < 4, 0, np.round(m[:, col['home_momentum']], 2))
+        away_mom = np.where(m[:, col['away_momentum_matches']] < 4, 0, np.round(m[:, col['away_momentum']], 2))
+        momentum_prob = np.clip(0.5 + (home_mom - away_mom) * 0.15, 0.2, 0.8)
+        
+        draw = np.minimum(0.35, 0.26 * (1 + (1 - np.abs(home_form - away_form)) * 0.3))
+        
+        return np.column_stack([elo_prob, form_prob, h2h_prob, momentum_prob]), draw
+    
+    def explanation_from_features(self, features, index):
+        """Same as get_explanation, but built from a features_for_fixtures row"""
+        home_team, away_team = features['fixtures'][index]
+        c = self._components_from_features(features, index)
+        
+        return (
+            f"📊 ELO: {home_team} {c['home_elo']:.0f} vs {away_team} {c['away_elo']:.0f} | "
+            f"Form (5g): {c['home_form'].get('weighted_ppg', 0):.1f} vs {c['away_form'].get('weighted_ppg', 0):.1f} PPG | "
+            f"Momentum: {c['home_momentum']['trend'].replace('_', ' ')} vs {c['away_momentum']['trend'].replace('_', ' ')}"
+        )
+    
     def calculate_probability(self, home_team, away_team, bet_type, market):
         """
         Calculate probability using Form & Momentum model.
@@ -1107,12 +1722,13 @@ class FormMomentumAnalyzer:
         home_momentum_prob = 0.5 + (momentum_diff * 0.15)
         home_momentum_prob = max(0.2, min(0.8, home_momentum_prob))
         
-        # Combine with weights
+        # Combine with weights (defaults 30/35/15/20, refit by calibrate_weights.py)
+        weights = MODEL_WEIGHTS['form_components']
         home_win_prob = (
-            home_elo_prob * 0.30 +
-            home_form_prob * 0.35 +
-            h2h_home_prob * 0.15 +
-            home_momentum_prob * 0.20
+            home_elo_prob * weights['elo'] +
+            home_form_prob * weights['form'] +
+            h2h_home_prob * weights['h2h'] +
+            home_momentum_prob * weights['momentum']
         )
         
         # Calculate away and draw probabilities
@@ -1204,65 +1820,271 @@ class FormMomentumAnalyzer:
         
         return (
             f"📊 ELO: {home_team} {home_elo:.0f} vs {away_team} {away_elo:.0f} | "
-            f"Form (5g): {home_form['weighted_ppg']:.1f} vs {away_form['weighted_ppg']:.1f} PPG | "
+            f"Form (5g): {home_form.get('weighted_ppg', 0):.1f} vs {away_form.get('weighted_ppg', 0):.1f} PPG | "
             f"Momentum: {home_mom['trend'].replace('_', ' ')} vs {away_mom['trend'].replace('_', ' ')}"
         )
 
 
 # =============================================================================
-# ADVANCED AI MODEL 2: SENTIMENT & EXTERNAL DATA MODEL
+# EXTERNAL API CLIENT (pooled keep-alive sessions, retries, quota tracking)
 # =============================================================================
-class SentimentExternalAnalyzer:
+
+class HostRateLimiter:
+    """Token bucket per host, shared by all worker threads"""
+    
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = rate_per_second
+        self.burst = burst or max(1, int(rate_per_second))
+        self._lock = threading.Lock()
+        self._buckets = {}  # host -> (tokens, last_refill)
+    
+    def acquire(self, host):
+        """Block until a request to `host` is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class ExternalAPIClient:
     """
-    Advanced AI Model: Sentiment & External Data Analysis
+    One HTTP client for every external API call (The Odds API, FPL).
     
-    Considers:
-    - Fantasy Premier League data (ownership, transfers, price changes)
-    - Player injury/availability status
-    - X/Twitter sentiment analysis
-    - News sentiment
-    - Manager changes/team news
+    - A single requests.Session, so each host keeps a pool of keep-alive
+      connections instead of paying a TCP/TLS handshake per call
+    - Connection errors, 429 and 5xx responses are retried with jittered
+      exponential backoff (full jitter, honouring Retry-After)
+    - Per-endpoint (connect, read) timeouts from HTTP_TIMEOUTS, and an
+      overall deadline from HTTP_DEADLINES that caps the attempts, their
+      timeouts and the backoff between them
+    - Quota headers (x-requests-remaining/-used/-last) are tracked per
+      endpoint and handed to registered listeners, e.g. the odds scheduler
+    
+    Stats and quota are per process; see status().
     """
     
-    def __init__(self):
-        self.db = get_db()
-        self._fpl_cache = {}
-        self._sentiment_cache = {}
-        self._injury_cache = {}
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
     
-    @lru_cache(maxsize=32)
-    def fetch_fpl_data(self):
-        """Fetch Fantasy Premier League bootstrap data."""
+    def __init__(self, timeouts=HTTP_TIMEOUTS, max_retries=HTTP_MAX_RETRIES, backoff_base=HTTP_BACKOFF_BASE,
+                 backoff_max=HTTP_BACKOFF_MAX, pool_size=HTTP_POOL_SIZE, deadlines=HTTP_DEADLINES):
+        self.timeouts = timeouts
+        self.deadlines = deadlines
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        # Retries are handled here (with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._quota = {}  # endpoint -> latest quota headers
+        self._quota_listeners = defaultdict(list)
+        self.stats = defaultdict(lambda: {'requests': 0, 'retries': 0, 'failures': 0, 'total_latency_ms': 0,
+                                          'last_status': None, 'last_error': None})
+    
+    def add_quota_listener(self, endpoint, callback):
+        """callback(headers) runs for every response on `endpoint` that carries quota headers"""
+        self._quota_listeners[endpoint].append(callback)
+    
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry `attempt` (1-based)"""
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+    
+    @staticmethod
+    def _retry_after(response):
         try:
-            response = requests.get(f"{FPL_API_BASE}/bootstrap-static/", timeout=10)
-            if response.status_code == 200:
-                return response.json()
-        except Exception as e:
-            print(f"FPL API error: {e}")
-        return None
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
     
-    def get_team_fpl_metrics(self, team_name):
-        """
-        Get FPL-based team strength metrics.
+    def _record_failure(self, stats, error):
+        with self._lock:
+            stats['failures'] += 1
+            # Errors can echo the request URL - never keep API keys
+            stats['last_error'] = re.sub(r'apiKey=[^&\s)]+', 'apiKey=***', str(error))[:500]
+    
+    def _record_quota(self, endpoint, headers):
+        if headers.get('x-requests-remaining') is None:
+            return
         
-        Returns:
-        - avg_player_ownership: How popular team's players are
-        - key_player_availability: Injury/suspension impact
-        - transfers_in_momentum: Are people buying players?
-        - price_momentum: Are player prices rising?
+        def to_int(value):
+            try:
+                return int(float(value))
+            except (TypeError, ValueError):
+                return None
+        
+        with self._lock:
+            self._quota[endpoint] = {
+                'requests_remaining': to_int(headers.get('x-requests-remaining')),
+                'requests_used': to_int(headers.get('x-requests-used')),
+                'last_cost': to_int(headers.get('x-requests-last')),
+                'updated_at': datetime.utcnow().isoformat()
+            }
+        for callback in self._quota_listeners.get(endpoint, ()):
+            try:
+                callback(headers)
+            except Exception as e:
+                print(f"Quota listener error ({endpoint}): {e}")
+    
+    def get(self, url, endpoint='default', params=None, timeout=None, deadline=None):
         """
-        fpl_data = self.fetch_fpl_data()
-        if not fpl_data:
-            return None
+        GET with pooling, retries and quota tracking. Returns the response;
+        raises the last error once retries are exhausted, the endpoint's
+        deadline (seconds over all attempts) would pass, or on other 4xx.
+        """
+        timeout = timeout or self.timeouts.get(endpoint) or self.timeouts['default']
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        deadline = deadline or self.deadlines.get(endpoint)
+        give_up_at = time.time() + deadline if deadline else None
+        stats = self.stats[endpoint]
+        attempt = 0
+        while True:
+            started = time.time()
+            attempt_timeout = timeout
+            if give_up_at is not None:
+                remaining = max(0.1, give_up_at - started)
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+            try:
+                response = self.session.get(url, params=params, timeout=attempt_timeout)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            latency_ms = int((time.time() - started) * 1000)
+            
+            with self._lock:
+                stats['requests'] += 1
+                stats['total_latency_ms'] += latency_ms
+                stats['last_status'] = response.status_code if response is not None else None
+            if response is not None:
+                self._record_quota(endpoint, response.headers)
+            
+            retryable = error is not None or response.status_code in self.RETRY_STATUSES
+            if not retryable:
+                if response.status_code >= 400:
+                    self._record_failure(stats, f"HTTP {response.status_code}")
+                response.raise_for_status()
+                return response
+            
+            attempt += 1
+            wait = self.backoff(attempt, self._retry_after(response) if response is not None else None)
+            if attempt > self.max_retries or (give_up_at is not None and time.time() + wait >= give_up_at):
+                self._record_failure(stats, error or f"HTTP {response.status_code}")
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            
+            with self._lock:
+                stats['retries'] += 1
+            time.sleep(wait)
+    
+    def get_json(self, url, endpoint='default', params=None, timeout=None):
+        return self.get(url, endpoint=endpoint, params=params, timeout=timeout).json()
+    
+    def quota(self, endpoint):
+        with self._lock:
+            return dict(self._quota[endpoint]) if endpoint in self._quota else None
+    
+    def status(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self.stats.items():
+                endpoints[endpoint] = dict(
+                    stats,
+                    avg_latency_ms=round(stats['total_latency_ms'] / stats['requests'], 1) if stats['requests'] else None,
+                    quota=self._quota.get(endpoint)
+                )
+        return {'max_retries': self.max_retries, 'deadlines': dict(self.deadlines), 'endpoints': endpoints}
+
+
+HTTP_CLIENT = ExternalAPIClient()
+
+
+# =============================================================================
+# FPL BOOTSTRAP CACHE (shared by all analyzers in the process)
+# =============================================================================
+class FPLTeamTable:
+    """
+    Per-team aggregate records for one FPL bootstrap snapshot.
+    
+    Built in a single pass over `elements`; team-name matching is memoized,
+    so every sentiment-model lookup afterwards is a dict read. Records are
+    read-only (mapping proxies with tuple fields) because the table is
+    shared by every thread using the snapshot.
+    """
+    
+    def __init__(self, fpl_data, snapshot_id=None):
+        started = time.perf_counter()
+        self.snapshot_id = snapshot_id
+        self.teams = fpl_data.get('teams', [])
+        
+        players_by_team = defaultdict(list)
+        for player in fpl_data.get('elements', []):
+            players_by_team[player.get('team')].append(player)
+        
+        self.records = {
+            team_id: self._aggregate(players)
+            for team_id, players in players_by_team.items() if players
+        }
+        self._resolved = {}
+        self.build_seconds = time.perf_counter() - started
+    
+    def __len__(self):
+        return len(self.records)
+    
+    @staticmethod
+    def _aggregate(team_players):
+        """Aggregate one team's players (same metrics get_team_fpl_metrics always returned)"""
+        total_ownership = sum(float(p.get('selected_by_percent', 0)) for p in team_players)
+        avg_ownership = total_ownership / len(team_players)
         
-        # Find team ID in FPL data
-        teams = fpl_data.get('teams', [])
-        team_id = None
+        # Key player availability (top 5 by ownership)
+        top_players = sorted(team_players, key=lambda x: float(x.get('selected_by_percent', 0)), reverse=True)[:5]
+        available_count = sum(1 for p in top_players if p.get('status', 'a') == 'a')
+        key_player_availability = available_count / 5
+        
+        # Transfer momentum (net transfers this week)
+        total_transfers_in = sum(p.get('transfers_in_event', 0) for p in team_players)
+        total_transfers_out = sum(p.get('transfers_out_event', 0) for p in team_players)
+        
+        # Price changes
+        price_rises = sum(1 for p in team_players if p.get('cost_change_event', 0) > 0)
+        price_falls = sum(1 for p in team_players if p.get('cost_change_event', 0) < 0)
+        
+        # Form based on FPL points
+        avg_form = statistics.mean([float(p.get('form', 0)) for p in team_players if float(p.get('form', 0)) > 0] or [0])
+        
+        return MappingProxyType({
+            'avg_ownership': round(avg_ownership, 2),
+            'key_player_availability': key_player_availability,
+            'net_transfers': total_transfers_in - total_transfers_out,
+            'price_rises': price_rises,
+            'price_falls': price_falls,
+            'avg_form': round(avg_form, 2),
+            'top_players': tuple((p['web_name'], float(p.get('selected_by_percent', 0)), p.get('status', 'a')) for p in top_players),
+            'top_player_ids': tuple(p.get('id') for p in top_players),
+            'top_player_chances': tuple(p.get('chance_of_playing_next_round') for p in top_players)
+        })
+    
+    def resolve_team_id(self, team_name):
+        """Match a database team name to an FPL team id (memoized)"""
+        if team_name in self._resolved:
+            return self._resolved[team_name]
         
-        for fpl_team in teams:
+        team_id = None
+        db_name = team_name.replace(' ', '').replace("'", '')
+        for fpl_team in self.teams:
             fpl_name = fpl_team.get('name', '').replace(' ', '')
-            db_name = team_name.replace(' ', '').replace("'", '')
-            
             if fpl_name.lower() in db_name.lower() or db_name.lower() in fpl_name.lower():
                 team_id = fpl_team['id']
                 break
@@ -1271,60 +2093,637 @@ class SentimentExternalAnalyzer:
             # Try mapping
             for fpl_key, db_value in FPL_TEAM_MAPPING.items():
                 if db_value.lower() == team_name.lower():
-                    for fpl_team in teams:
+                    for fpl_team in self.teams:
                         if fpl_key.lower() in fpl_team.get('name', '').lower():
                             team_id = fpl_team['id']
                             break
         
-        if not team_id:
+        self._resolved[team_name] = team_id
+        return team_id
+    
+    def get(self, team_name):
+        """Read-only aggregate record for a database team name, or None"""
+        team_id = self.resolve_team_id(team_name)
+        return self.records.get(team_id) if team_id else None
+
+
+class FPLBootstrapCache:
+    """
+    Process-wide cache for the FPL bootstrap-static payload.
+    
+    - TTL based: a snapshot older than `ttl` seconds is stale
+    - Stale-while-revalidate: stale reads return the last good snapshot
+      immediately and kick off a background refresh
+    - Single-flight: at most one fetch is in flight; concurrent cold
+      callers wait for it instead of issuing their own request
+    - Backoff: after a failed fetch no refresh is attempted until
+      `next_retry_at` (exponential in the consecutive failures)
+    - Persisted to disk so restarts (and other workers) start warm
+    """
+    
+    def __init__(self, ttl=FPL_CACHE_TTL, cache_file=FPL_CACHE_FILE, retry_base=FPL_RETRY_BASE,
+                 retry_max=FPL_RETRY_MAX):
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.consecutive_failures = 0
+        self.next_retry_at = 0  # epoch seconds; refreshes are suppressed until then
+        self._lock = threading.Lock()
+        self._inflight = None  # threading.Event while a fetch is running
+        self._disk_checked = False
+        self.data = None
+        self.fetched_at = None  # epoch seconds of the current snapshot
+        self._team_table = None
+        self.team_table_rebuilds = 0
+        self.stats = {
+            'fetches': 0,
+            'failures': 0,
+            'last_error': None,
+            'last_fetch_seconds': None,
+            'disk_loads': 0
+        }
+    
+    def age_seconds(self):
+        if self.fetched_at is None:
             return None
+        return time.time() - self.fetched_at
+    
+    def is_stale(self):
+        age = self.age_seconds()
+        return age is None or age >= self.ttl
+    
+    def backing_off(self):
+        return time.time() < self.next_retry_at
+    
+    def snapshot_time(self):
+        """fetched_at of the newest snapshot in memory or on disk; never fetches"""
+        self._load_from_disk()
+        return self.fetched_at
+    
+    def get(self, wait_timeout=15):
+        """Return the current snapshot, refreshing in the background when stale."""
+        if not self._disk_checked:
+            self._load_from_disk()
+        
+        if self.data is None:
+            if self.backing_off():
+                return None
+            # Cold cache - nothing to serve yet, so wait for the (single) fetch
+            return self._refresh(wait_timeout=wait_timeout)
+        
+        if self.is_stale() and not self.backing_off():
+            self.refresh_async()
+        return self.data
+    
+    def refresh_async(self):
+        """Start a background refresh unless one is already running."""
+        if self._inflight is not None:
+            return
+        thread = threading.Thread(target=self._refresh, name='fpl-cache-refresh', daemon=True)
+        thread.start()
+    
+    def _refresh(self, wait_timeout=15):
+        with self._lock:
+            event = self._inflight
+            is_leader = event is None
+            if is_leader:
+                event = threading.Event()
+                self._inflight = event
+        
+        if not is_leader:
+            event.wait(wait_timeout)
+            return self.data
         
-        # Get players for this team
-        elements = fpl_data.get('elements', [])
-        team_players = [p for p in elements if p.get('team') == team_id]
+        try:
+            # Another worker may already have written a fresher snapshot
+            self._load_from_disk()
+            if self.is_stale():
+                self._fetch()
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
         
-        if not team_players:
-            return None
+        return self.data
+    
+    def _fetch(self):
+        started = time.time()
+        self.stats['fetches'] += 1
+        try:
+            data = HTTP_CLIENT.get_json(f"{FPL_API_BASE}/bootstrap-static/", endpoint='fpl_bootstrap')
+        except Exception as e:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(e)
+            self.consecutive_failures += 1
+            delay = min(self.retry_max, self.retry_base * 2 ** (self.consecutive_failures - 1))
+            self.next_retry_at = time.time() + delay
+            print(f"FPL API error: {e} (next retry in {delay:.0f}s)")
+            return
+        finally:
+            self.stats['last_fetch_seconds'] = round(time.time() - started, 3)
         
-        # Calculate metrics
-        total_ownership = sum(float(p.get('selected_by_percent', 0)) for p in team_players)
-        avg_ownership = total_ownership / len(team_players)
+        self.consecutive_failures = 0
+        self.next_retry_at = 0
+        self.data = data
+        self.fetched_at = time.time()
+        self._save_to_disk()
+        print(f"FPL bootstrap refreshed in {self.stats['last_fetch_seconds']}s")
         
-        # Key player availability (top 5 by ownership)
-        top_players = sorted(team_players, key=lambda x: float(x.get('selected_by_percent', 0)), reverse=True)[:5]
+        try:
+            FPL_SNAPSHOT_STORE.record(data, self.fetched_at)
+        except Exception as e:
+            print(f"FPL snapshot history error: {e}")
+    
+    def _load_from_disk(self):
+        self._disk_checked = True
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            if self.fetched_at is not None and os.path.getmtime(self.cache_file) <= self.fetched_at:
+                return
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if self.fetched_at is None or stored['fetched_at'] > self.fetched_at:
+                self.data = stored['data']
+                self.fetched_at = stored['fetched_at']
+                self.stats['disk_loads'] += 1
+        except Exception as e:
+            print(f"FPL cache file error: {e}")
+    
+    def _save_to_disk(self):
+        if not self.cache_file:
+            return
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self.fetched_at, 'data': self.data}, f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"FPL cache write error: {e}")
+    
+    def team_table(self):
+        """FPLTeamTable for the current snapshot, rebuilt only when the snapshot changes"""
+        data = self.get()
+        if not data:
+            return None
+        table = self._team_table
+        if table is None or table.snapshot_id != self.fetched_at:
+            table = FPLTeamTable(data, snapshot_id=self.fetched_at)
+            self._team_table = table
+            self.team_table_rebuilds += 1
+            print(f"FPL team table rebuilt: {len(table)} teams in {table.build_seconds * 1000:.1f}ms")
+        return table
+    
+    def status(self):
+        age = self.age_seconds()
+        table = self._team_table
+        return {
+            'has_data': self.data is not None,
+            'fetched_at': datetime.utcfromtimestamp(self.fetched_at).isoformat() if self.fetched_at else None,
+            'age_seconds': int(age) if age is not None else None,
+            'ttl_seconds': self.ttl,
+            'is_stale': self.is_stale(),
+            'refresh_in_progress': self._inflight is not None,
+            'consecutive_failures': self.consecutive_failures,
+            'next_retry_at': datetime.utcfromtimestamp(self.next_retry_at).isoformat() if self.backing_off() else None,
+            'cache_file': self.cache_file,
+            'team_table': {
+                'teams': len(table) if table else 0,
+                'build_ms': round(table.build_seconds * 1000, 2) if table else None,
+                'rebuilds': self.team_table_rebuilds
+            },
+            **self.stats
+        }
+
+
+FPL_BOOTSTRAP_CACHE = FPLBootstrapCache()
+
+
+class FPLSnapshotStore:
+    """
+    Historical store of FPL bootstrap snapshots, keyed by fetch timestamp.
+    
+    Each snapshot keeps only the player/team columns the models use, stored
+    column-wise and zlib-compressed in fpl_snapshots. Per-team aggregates and
+    per-player state are also written to indexed history tables so trends can
+    be queried without decoding snapshots. Recorded snapshots can be loaded
+    back by date to run the sentiment model fully offline.
+    """
+    
+    PLAYER_COLUMNS = (
+        'id', 'web_name', 'team', 'element_type', 'status', 'selected_by_percent', 'form',
+        'now_cost', 'cost_change_event', 'transfers_in_event', 'transfers_out_event',
+        'chance_of_playing_next_round', 'minutes', 'total_points'
+    )
+    TEAM_COLUMNS = ('id', 'name', 'short_name', 'strength')
+    
+    def __init__(self, min_interval=FPL_HISTORY_INTERVAL):
+        self.min_interval = min_interval
+        self._last_recorded = None
+        self._loaded = {}  # fetched_at -> (fpl_data, FPLTeamTable), small per-process memo
+    
+    @staticmethod
+    def _timestamp(value):
+        """Normalize epoch seconds / datetime / date string to a sortable UTC ISO string"""
+        if isinstance(value, (int, float)):
+            return datetime.utcfromtimestamp(value).strftime('%Y-%m-%dT%H:%M:%S')
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%dT%H:%M:%S')
+        value = str(value)
+        return value if 'T' in value else f"{value[:10]}T23:59:59"
+    
+    @staticmethod
+    def _encode(rows, columns):
+        payload = json.dumps({col: [row.get(col) for row in rows] for col in columns}, separators=(',', ':'))
+        return zlib.compress(payload.encode('utf-8'), 9)
+    
+    @staticmethod
+    def _decode(blob):
+        table = json.loads(zlib.decompress(blob).decode('utf-8'))
+        columns = list(table.keys())
+        length = len(table[columns[0]]) if columns else 0
+        return [{col: table[col][i] for col in columns} for i in range(length)]
+    
+    def record(self, fpl_data, fetched_at, force=False):
+        """Persist a snapshot (at most one per min_interval unless forced). Returns True if stored."""
+        if not fpl_data or not fpl_data.get('elements'):
+            return False
+        if not force and self._last_recorded is not None and fetched_at - self._last_recorded < self.min_interval:
+            return False
+        
+        key = self._timestamp(fetched_at)
+        elements = fpl_data.get('elements', [])
+        teams = fpl_data.get('teams', [])
+        players_blob = self._encode(elements, self.PLAYER_COLUMNS)
+        teams_blob = self._encode(teams, self.TEAM_COLUMNS)
+        table = FPLTeamTable(fpl_data, snapshot_id=fetched_at)
+        team_names = {t['id']: FPL_TEAM_MAPPING.get(t.get('name'), t.get('name')) for t in teams}
         
-        available_count = 0
-        injured_count = 0
-        for player in top_players:
-            status = player.get('status', 'a')
-            if status == 'a':  # Available
-                available_count += 1
-            elif status in ['i', 'd', 's']:  # Injured, doubtful, suspended
-                injured_count += 1
+        db = get_db()
+        try:
+            # Another worker may have recorded a snapshot recently
+            row = db.execute('SELECT MAX(fetched_at) AS latest FROM fpl_snapshots').fetchone()
+            if not force and row['latest'] and row['latest'] >= self._timestamp(fetched_at - self.min_interval):
+                self._last_recorded = fetched_at
+                return False
+            
+            db.execute('''
+                INSERT OR REPLACE INTO fpl_snapshots (fetched_at, players, teams, player_count, raw_bytes, stored_bytes)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key, players_blob, teams_blob, len(elements),
+                  len(json.dumps(fpl_data)), len(players_blob) + len(teams_blob)))
+            db.executemany('''
+                INSERT OR REPLACE INTO fpl_team_history (
+                    team_name, fetched_at, fpl_team_id, avg_ownership, key_player_availability,
+                    net_transfers, price_rises, price_falls, avg_form
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (team_names.get(team_id, str(team_id)), key, team_id, rec['avg_ownership'],
+                 rec['key_player_availability'], rec['net_transfers'], rec['price_rises'],
+                 rec['price_falls'], rec['avg_form'])
+                for team_id, rec in table.records.items()
+            ])
+            db.executemany('''
+                INSERT OR REPLACE INTO fpl_player_history (
+                    player_id, fetched_at, fpl_team_id, selected_by_percent, now_cost, form, status, net_transfers
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (p.get('id'), key, p.get('team'), float(p.get('selected_by_percent', 0) or 0),
+                 p.get('now_cost'), float(p.get('form', 0) or 0), p.get('status'),
+                 (p.get('transfers_in_event', 0) or 0) - (p.get('transfers_out_event', 0) or 0))
+                for p in elements
+            ])
+            db.commit()
+        finally:
+            db.close()
         
-        key_player_availability = available_count / 5
+        self._last_recorded = fetched_at
+        print(f"FPL snapshot recorded at {key} ({len(players_blob) + len(teams_blob):,} bytes compressed)")
+        return True
+    
+    def load(self, as_of=None):
+        """
+        Load the latest recorded snapshot at or before as_of (epoch, datetime or
+        'YYYY-MM-DD'). Returns (fpl_data, FPLTeamTable) or (None, None).
+        """
+        db = get_db()
+        try:
+            if as_of is None:
+                row = db.execute('SELECT fetched_at FROM fpl_snapshots ORDER BY fetched_at DESC LIMIT 1').fetchone()
+            else:
+                row = db.execute('''
+                    SELECT fetched_at FROM fpl_snapshots WHERE fetched_at <= ?
+                    ORDER BY fetched_at DESC LIMIT 1
+                ''', (self._timestamp(as_of),)).fetchone()
+            if not row:
+                return None, None
+            
+            key = row['fetched_at']
+            if key not in self._loaded:
+                blobs = db.execute('SELECT players, teams FROM fpl_snapshots WHERE fetched_at = ?', (key,)).fetchone()
+                fpl_data = {
+                    'elements': self._decode(blobs['players']),
+                    'teams': self._decode(blobs['teams']),
+                    'snapshot_at': key
+                }
+                if len(self._loaded) >= 8:
+                    self._loaded.pop(next(iter(self._loaded)))
+                self._loaded[key] = (fpl_data, FPLTeamTable(fpl_data, snapshot_id=key))
+            return self._loaded[key]
+        finally:
+            db.close()
+    
+    def team_history(self, team_name, since=None, until=None):
+        """Per-team aggregates over time (oldest first)"""
+        db = get_db()
+        try:
+            cursor = db.execute('''
+                SELECT * FROM fpl_team_history
+                WHERE team_name = ? AND fetched_at >= ? AND fetched_at <= ?
+                ORDER BY fetched_at ASC
+            ''', (team_name, self._timestamp(since) if since else '', self._timestamp(until) if until else '9999'))
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            db.close()
+    
+    def player_history(self, player_id, since=None, until=None):
+        """One player's FPL state over time (oldest first)"""
+        db = get_db()
+        try:
+            cursor = db.execute('''
+                SELECT * FROM fpl_player_history
+                WHERE player_id = ? AND fetched_at >= ? AND fetched_at <= ?
+                ORDER BY fetched_at ASC
+            ''', (player_id, self._timestamp(since) if since else '', self._timestamp(until) if until else '9999'))
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            db.close()
+
+
+FPL_SNAPSHOT_STORE = FPLSnapshotStore()
+
+
+class FPLDetailFetcher:
+    """
+    Concurrent fetcher for the per-player and fixture FPL endpoints
+    (element-summary/{id}/, fixtures/).
+    
+    Requests go through the shared HTTP_CLIENT (keep-alive pool, retries
+    with backoff) behind a per-host rate limit and a TTL response cache,
+    and are fanned out over a bounded thread pool. Request paths use
+    `cached_only`: they read whatever is cached (even expired) and leave
+    the missing and expired endpoints to a background warm, so pricing
+    never waits on the FPL API. `generation` counts the warms that stored
+    new responses.
+    """
+    
+    def __init__(self, base_url=None, max_workers=FPL_DETAIL_CONCURRENCY,
+                 rate_per_second=FPL_DETAIL_RATE_LIMIT, ttl=FPL_DETAIL_TTL, client=None):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.client = client or HTTP_CLIENT
+        self.rate_limiter = HostRateLimiter(rate_per_second)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fpl-detail')
+        self._cache = {}  # url -> (expires_at, data)
+        self._cache_lock = threading.Lock()
+        self._warming = set()  # paths queued for a background fetch
+        self.generation = 0
+        self.stats = {'requests': 0, 'cache_hits': 0, 'failures': 0, 'warms': 0}
+    
+    def _url(self, path):
+        return f"{(self.base_url or FPL_API_BASE).rstrip('/')}/{path.lstrip('/')}"
+    
+    def get_json(self, path, timeout=None):
+        """GET one endpoint through the cache, rate limiter and pooled client"""
+        url = self._url(path)
+        now = time.time()
+        with self._cache_lock:
+            cached = self._cache.get(url)
+            if cached and cached[0] > now:
+                self.stats['cache_hits'] += 1
+                return cached[1]
+        
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        with self._cache_lock:
+            self.stats['requests'] += 1
+        try:
+            data = self.client.get_json(url, endpoint='fpl_detail', timeout=timeout)
+        except Exception as e:
+            with self._cache_lock:
+                self.stats['failures'] += 1
+            print(f"FPL detail error ({path}): {e}")
+            return None
         
-        # Transfer momentum (net transfers this week)
-        total_transfers_in = sum(p.get('transfers_in_event', 0) for p in team_players)
-        total_transfers_out = sum(p.get('transfers_out_event', 0) for p in team_players)
-        net_transfers = total_transfers_in - total_transfers_out
+        with self._cache_lock:
+            self._cache[url] = (time.time() + self.ttl, data)
+        return data
+    
+    def get_many(self, paths):
+        """Fetch several endpoints concurrently. Returns {path: data or None}"""
+        paths = list(dict.fromkeys(paths))
+        results = self._executor.map(self.get_json, paths)
+        return dict(zip(paths, results))
+    
+    def peek(self, path):
+        """Last response for an endpoint, even if expired, without fetching (None if never fetched)"""
+        with self._cache_lock:
+            cached = self._cache.get(self._url(path))
+        return cached[1] if cached else None
+    
+    def warm(self, paths):
+        """Fetch the missing and expired endpoints in a background thread; returns immediately"""
+        now = time.time()
+        with self._cache_lock:
+            todo = []
+            for path in dict.fromkeys(paths):
+                cached = self._cache.get(self._url(path))
+                if path not in self._warming and not (cached and cached[0] > now):
+                    todo.append(path)
+            self._warming.update(todo)
+        if todo:
+            threading.Thread(target=self._warm, args=(todo,), name='fpl-detail-warm', daemon=True).start()
+    
+    def _warm(self, paths):
+        fetched = {}
+        try:
+            fetched = self.get_many(paths)
+        except Exception as e:
+            print(f"FPL detail warm error: {e}")
+        finally:
+            with self._cache_lock:
+                self._warming.difference_update(paths)
+                self.stats['warms'] += 1
+                if any(data is not None for data in fetched.values()):
+                    self.generation += 1
+    
+    def get_element_summaries(self, player_ids, cached_only=False):
+        """element-summary for many players at once. Returns {player_id: summary or None}"""
+        paths = {pid: f"element-summary/{pid}/" for pid in player_ids}
+        if cached_only:
+            self.warm(paths.values())
+            return {pid: self.peek(path) for pid, path in paths.items()}
+        fetched = self.get_many(paths.values())
+        return {pid: fetched[path] for pid, path in paths.items()}
+    
+    def get_fixtures(self, cached_only=False):
+        """Upcoming fixtures with FPL difficulty ratings"""
+        if cached_only:
+            self.warm(['fixtures/?future=1'])
+            return self.peek('fixtures/?future=1') or []
+        return self.get_json('fixtures/?future=1') or []
+    
+    def status(self):
+        with self._cache_lock:
+            return dict(self.stats, cached_responses=len(self._cache), warming=len(self._warming),
+                        generation=self.generation, max_workers=self.max_workers,
+                        rate_per_second=self.rate_limiter.rate)
+
+
+FPL_DETAIL_FETCHER = FPLDetailFetcher()
+
+
+# =============================================================================
+# ADVANCED AI MODEL 2: SENTIMENT & EXTERNAL DATA MODEL
+# =============================================================================
+class SentimentExternalAnalyzer:
+    """
+    Advanced AI Model: Sentiment & External Data Analysis
+    
+    Considers:
+    - Fantasy Premier League data (ownership, transfers, price changes)
+    - Player injury/availability status
+    - X/Twitter sentiment analysis
+    - News sentiment
+    - Manager changes/team news
+    """
+    
+    def __init__(self, as_of=None):
+        """
+        as_of: optional date/timestamp - run against the latest recorded FPL
+        snapshot at or before it (offline, no FPL API calls)
+        """
+        self.db = get_db()
+        self.as_of = as_of
+        self._fpl_cache = {}
+        self._sentiment_cache = {}
+        self._injury_cache = {}
+        self._team_components = {}  # team -> strength, injury and sentiment (see get_team_components)
+        self._snapshot_data = None
+        self._snapshot_table = None
+        if as_of is not None:
+            self._snapshot_data, self._snapshot_table = FPL_SNAPSHOT_STORE.load(as_of)
+    
+    def fetch_fpl_data(self):
+        """Fetch Fantasy Premier League bootstrap data (shared, TTL-cached snapshot)."""
+        if self.as_of is not None:
+            return self._snapshot_data
+        return FPL_BOOTSTRAP_CACHE.get()
+    
+    def get_fpl_team_table(self):
+        """Per-team FPL aggregates for the current snapshot (built once per snapshot)."""
+        if self.as_of is not None:
+            return self._snapshot_table
+        return FPL_BOOTSTRAP_CACHE.team_table()
+    
+    def get_team_fpl_metrics(self, team_name):
+        """
+        Get FPL-based team strength metrics.
         
-        # Price changes
-        price_rises = sum(1 for p in team_players if p.get('cost_change_event', 0) > 0)
-        price_falls = sum(1 for p in team_players if p.get('cost_change_event', 0) < 0)
+        Returns:
+        - avg_player_ownership: How popular team's players are
+        - key_player_availability: Injury/suspension impact
+        - transfers_in_momentum: Are people buying players?
+        - price_momentum: Are player prices rising?
+        """
+        table = self.get_fpl_team_table()
+        if not table:
+            return None
+        return table.get(team_name)
+    
+    def prefetch_player_details(self, team_names):
+        """
+        Start fetching element-summary for every listed team's key players
+        (and the fixture list) in the background; pricing reads whatever
+        is cached by then.
+        """
+        # Teams with known components (e.g. preloaded in a pricing worker) need no details
+        team_names = [t for t in team_names if t not in self._team_components]
+        if self.as_of is not None or not FPL_DETAIL_FETCH or not team_names:
+            return
+        table = self.get_fpl_team_table()
+        if not table:
+            return
+        player_ids = []
+        for team_name in team_names:
+            record = table.get(team_name)
+            if record:
+                player_ids.extend(record['top_player_ids'])
+        FPL_DETAIL_FETCHER.warm([f"element-summary/{pid}/" for pid in player_ids] + ['fixtures/?future=1'])
+    
+    def get_player_availability_details(self, team_name):
+        """
+        Expected availability of the team's top 5 players from the per-player
+        endpoints: chance of playing next round x share of minutes over the
+        last 3 matches. Returns None when details are disabled, offline or
+        not cached yet (they are fetched in the background meanwhile).
+        """
+        if self.as_of is not None or not FPL_DETAIL_FETCH:
+            return None
+        if team_name in self._injury_cache:
+            return self._injury_cache[team_name]
         
-        # Form based on FPL points
-        avg_form = statistics.mean([float(p.get('form', 0)) for p in team_players if float(p.get('form', 0)) > 0] or [0])
+        fpl_metrics = self.get_team_fpl_metrics(team_name)
+        if not fpl_metrics:
+            return None
         
-        return {
-            'avg_ownership': round(avg_ownership, 2),
-            'key_player_availability': key_player_availability,
-            'net_transfers': net_transfers,
-            'price_rises': price_rises,
-            'price_falls': price_falls,
-            'avg_form': round(avg_form, 2),
-            'top_players': [(p['web_name'], float(p.get('selected_by_percent', 0)), p.get('status', 'a')) for p in top_players]
+        summaries = FPL_DETAIL_FETCHER.get_element_summaries(fpl_metrics['top_player_ids'], cached_only=True)
+        if None in summaries.values():
+            # Not all cached yet: neutral (squad status only) until the warm completes
+            return None
+        players = []
+        for (name, _, status), player_id, chance in zip(
+            fpl_metrics['top_players'], fpl_metrics['top_player_ids'], fpl_metrics['top_player_chances']
+        ):
+            if chance is None:
+                chance = 100 if status == 'a' else 0
+            summary = summaries.get(player_id) or {}
+            recent = summary.get('history', [])[-3:]
+            minutes_share = min(1.0, statistics.mean([m.get('minutes', 0) for m in recent]) / 90) if recent else 1.0
+            players.append({
+                'name': name,
+                'chance_of_playing': chance,
+                'minutes_share': round(minutes_share, 2),
+                'expected': round(chance / 100 * minutes_share, 3)
+            })
+        
+        details = {
+            'expected_availability': round(statistics.mean(p['expected'] for p in players), 3) if players else None,
+            'players': players
         }
+        self._injury_cache[team_name] = details
+        return details
+    
+    def get_fixture_difficulty(self, team_name, num_fixtures=3):
+        """Average FPL difficulty rating (1-5) of the team's next fixtures"""
+        if self.as_of is not None or not FPL_DETAIL_FETCH:
+            return None
+        table = self.get_fpl_team_table()
+        team_id = table.resolve_team_id(team_name) if table else None
+        if not team_id:
+            return None
+        
+        upcoming = sorted(
+            (f for f in FPL_DETAIL_FETCHER.get_fixtures(cached_only=True)
+             if not f.get('finished') and team_id in (f.get('team_h'), f.get('team_a'))),
+            key=lambda f: f.get('kickoff_time') or ''
+        )[:num_fixtures]
+        if not upcoming:
+            return None
+        
+        difficulties = [f['team_h_difficulty'] if f.get('team_h') == team_id else f['team_a_difficulty'] for f in upcoming]
+        return round(statistics.mean(difficulties), 2)
     
     def get_injury_impact(self, team_name):
         """
@@ -1337,6 +2736,11 @@ class SentimentExternalAnalyzer:
         
         availability = fpl_metrics['key_player_availability']
         
+        # Blend squad status with expected minutes from the per-player endpoints
+        details = self.get_player_availability_details(team_name)
+        if details and details['expected_availability'] is not None:
+            availability = (availability + details['expected_availability']) / 2
+        
         # Impact ranges from -0.15 (all key players out) to +0.05 (all available)
         impact = (availability - 0.8) * 0.5
         
@@ -1432,32 +2836,59 @@ class SentimentExternalAnalyzer:
         - Sentiment/momentum (20%)
         - Historical baseline (15%)
         """
-        # Get all components
-        home_strength = self.get_team_strength_index(home_team)
-        away_strength = self.get_team_strength_index(away_team)
-        
-        home_injury = self.get_injury_impact(home_team)
-        away_injury = self.get_injury_impact(away_team)
-        
-        home_sentiment = self.get_sentiment_score(home_team)
-        away_sentiment = self.get_sentiment_score(away_team)
+        components = self.get_fixture_components(home_team, away_team)
         
         # Get historical baseline from simple model
         base_analyzer = AdvancedBettingAnalyzer()
         base_prob = base_analyzer.calculate_ai_probability(home_team, away_team, bet_type, market, 'simple')
         
+        return self.probability_from_components(components, bet_type, market, base_prob)
+    
+    def get_team_components(self, team_name):
+        """Strength, injury and sentiment for one team (computed once per analyzer)"""
+        components = self._team_components.get(team_name)
+        if components is None:
+            components = self._team_components[team_name] = {
+                'strength': self.get_team_strength_index(team_name),
+                'injury': self.get_injury_impact(team_name),
+                'sentiment': self.get_sentiment_score(team_name)
+            }
+        return components
+    
+    def slate_components(self, team_names):
+        """get_team_components for every listed team, as plain data another process can preload"""
+        return {team_name: self.get_team_components(team_name) for team_name in team_names}
+    
+    def preload_components(self, components):
+        """Use slate_components computed elsewhere; these teams then need no FPL data here"""
+        self._team_components.update(components)
+    
+    def get_fixture_components(self, home_team, away_team):
+        """Strength, injury and sentiment for both teams - everything the pricing needs except the baseline"""
+        home, away = self.get_team_components(home_team), self.get_team_components(away_team)
+        return {
+            'home_strength': home['strength'],
+            'away_strength': away['strength'],
+            'home_injury': home['injury'],
+            'away_injury': away['injury'],
+            'home_sentiment': home['sentiment'],
+            'away_sentiment': away['sentiment']
+        }
+    
+    def probability_from_components(self, c, bet_type, market, base_prob=None):
+        """Same as calculate_probability, but priced from get_fixture_components output"""
         if bet_type == 'moneyline':
             return self._calculate_moneyline(
-                home_strength, away_strength,
-                home_injury, away_injury,
-                home_sentiment, away_sentiment,
+                c['home_strength'], c['away_strength'],
+                c['home_injury'], c['away_injury'],
+                c['home_sentiment'], c['away_sentiment'],
                 base_prob, market
             )
         elif bet_type == 'goals':
             return self._calculate_goals(
-                home_strength, away_strength,
-                home_injury, away_injury,
-                home_sentiment, away_sentiment,
+                c['home_strength'], c['away_strength'],
+                c['home_injury'], c['away_injury'],
+                c['home_sentiment'], c['away_sentiment'],
                 market
             )
         
@@ -1573,14 +3004,399 @@ class SentimentExternalAnalyzer:
         if home_sentiment['description'] != 'No sentiment data':
             parts.append(home_sentiment['description'])
         
+        home_fdr = self.get_fixture_difficulty(home_team)
+        away_fdr = self.get_fixture_difficulty(away_team)
+        if home_fdr is not None and away_fdr is not None:
+            parts.append(f"📅 Next 3 FDR: {home_fdr:.1f} vs {away_fdr:.1f}")
+        
         return " | ".join(parts)
 
 
 # =============================================================================
-# COMBINED OVERALL AI MODEL
+# MODEL WEIGHTS & CALIBRATION
 # =============================================================================
-class CombinedAIAnalyzer:
-    """
+MONEYLINE_OUTCOMES = ('home_win', 'draw', 'away_win')
+
+# Hand-tuned weights used until calibrate_weights.py has written a fit
+DEFAULT_MODEL_WEIGHTS = {
+    'version': 'default',
+    'form_components': {'elo': 0.30, 'form': 0.35, 'h2h': 0.15, 'momentum': 0.20},
+    'ensemble': {'complex': 0.25, 'form_momentum': 0.30, 'sentiment': 0.25},
+    # Moneyline map: softmax(log(p) / temperature + bias), bias per MONEYLINE_OUTCOMES
+    'calibration': {'temperature': 1.0, 'bias': [0.0, 0.0, 0.0]}
+}
+
+
+def load_model_weights(path=None):
+    """Load versioned weights written by the calibration job, falling back to the defaults"""
+    path = path or MODEL_WEIGHTS_FILE
+    weights = json.loads(json.dumps(DEFAULT_MODEL_WEIGHTS))
+    try:
+        with open(path, 'r') as f:
+            fitted = json.load(f)
+        for section in ('form_components', 'ensemble', 'calibration'):
+            if set(fitted[section]) != set(weights[section]):
+                raise ValueError(f"unexpected keys in '{section}'")
+        weights.update(fitted)
+        print(f"Model weights loaded: version {weights['version']}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Model weights error ({path}), using defaults: {e}")
+    return weights
+
+
+def calibration_is_identity(calibration):
+    return calibration['temperature'] == 1.0 and not any(calibration['bias'])
+
+
+def apply_calibration(probs, calibration):
+    """Calibrated home/draw/away probabilities for one (3,) vector or an (n, 3) matrix"""
+    logits = np.log(np.clip(probs, 1e-9, 1)) / calibration['temperature'] + np.asarray(calibration['bias'])
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class ModelWeightCalibrator:
+    """
+    Offline fit of the form-model component weights, the overall ensemble
+    weights and the moneyline calibration map by minimizing log-loss over
+    every historical match.
+    
+    The prediction matrix (model x match x outcome) is built point-in-time -
+    each match only sees results before its kickoff - in one vectorized pass:
+    form features are batched per match day and the complex model's
+    windowed win/draw rates come from per-team cumulative counts. The
+    sentiment model has no history to backtest, so it keeps its default
+    share of the ensemble and the other two are refit within the rest.
+    """
+    
+    def __init__(self, warmup_years=2, holdout=0.2, iterations=500, learning_rate=0.05):
+        self.warmup_years = warmup_years  # Leading history used only as model input
+        self.holdout = holdout            # Most recent share of matches used to validate the fit
+        self.iterations = iterations
+        self.learning_rate = learning_rate
+        self.form_analyzer = FormMomentumAnalyzer()
+    
+    def build_dataset(self):
+        """Point-in-time predictions and results for every match after the warm-up period"""
+        store = get_match_store()
+        view = store.numpy_view()
+        dates = view['dates']
+        home_teams = view['home_teams']
+        away_teams = np.array(store.away_teams, dtype=object)
+        
+        first_day = dates.min().astype(object)
+        start = np.datetime64(FormMomentumAnalyzer._years_before(first_day, -self.warmup_years), 'D')
+        rows = np.flatnonzero(dates >= start)
+        rows = rows[np.argsort(dates[rows], kind='stable')]
+        
+        home_goals = view['home_goals'][rows]
+        away_goals = view['away_goals'][rows]
+        outcome = np.where(home_goals > away_goals, 0, np.where(home_goals == away_goals, 1, 2))
+        
+        # Form model: one features_for_fixtures call per match day
+        components = np.zeros((len(rows), len(FormMomentumAnalyzer.MONEYLINE_COMPONENTS)))
+        draw = np.zeros(len(rows))
+        day_starts = np.flatnonzero(np.r_[True, dates[rows][1:] != dates[rows][:-1]])
+        for lo, hi in zip(day_starts, np.r_[day_starts[1:], len(rows)]):
+            day_rows = rows[lo:hi]
+            features = self.form_analyzer.features_for_fixtures(
+                list(zip(home_teams[day_rows], away_teams[day_rows])), as_of=str(dates[day_rows[0]])
+            )
+            components[lo:hi], draw[lo:hi] = self.form_analyzer.moneyline_components(features)
+        
+        complex_probs, complex_valid = self._complex_predictions(view, rows, home_teams, away_teams)
+        
+        return {
+            'outcome': outcome[complex_valid],
+            'form_components': components[complex_valid],
+            'form_draw': draw[complex_valid],
+            'complex': complex_probs[complex_valid],
+            'last_match_id': max(store.ids) if store.ids else None
+        }
+    
+    @staticmethod
+    def _window_counts(view, team, side, match_dates, years):
+        """Wins, draws and totals for `team` at `side` in [date - years, date) for each date"""
+        offsets = view['team_offsets'].get(team, {}).get(side, np.empty(0, dtype=np.intp))
+        team_dates = view['dates'][offsets]
+        goals_for = (view['home_goals'] if side == 'home' else view['away_goals'])[offsets]
+        goals_against = (view['away_goals'] if side == 'home' else view['home_goals'])[offsets]
+        cum_wins = np.r_[0, np.cumsum(goals_for > goals_against)]
+        cum_draws = np.r_[0, np.cumsum(goals_for == goals_against)]
+        
+        starts = np.array([
+            np.datetime64(FormMomentumAnalyzer._years_before(d, years), 'D') for d in match_dates.astype(object)
+        ], dtype='datetime64[D]')
+        lo = np.searchsorted(team_dates, starts, 'left')
+        hi = np.searchsorted(team_dates, match_dates, 'left')
+        return cum_wins[hi] - cum_wins[lo], cum_draws[hi] - cum_draws[lo], hi - lo
+    
+    def _complex_predictions(self, view, rows, home_teams, away_teams):
+        """Vectorized _calculate_moneyline_probability (1- and 2-season windows) for every row"""
+        counts = {}
+        for key, teams, side in (('home', home_teams, 'home'), ('away', away_teams, 'away')):
+            wins = {1: np.zeros(len(rows)), 2: np.zeros(len(rows))}
+            draws = np.zeros(len(rows))
+            totals = {1: np.zeros(len(rows)), 2: np.zeros(len(rows))}
+            row_teams = teams[rows]
+            for team in set(row_teams):
+                selected = np.flatnonzero(row_teams == team)
+                match_dates = view['dates'][rows[selected]]
+                for years in (1, 2):
+                    w, d, t = self._window_counts(view, team, side, match_dates, years)
+                    wins[years][selected] = w
+                    totals[years][selected] = t
+                    if years == 1:
+                        draws[selected] = d
+            counts[key] = (wins, draws, totals)
+        
+        (home_wins, home_draws, home_totals), (away_wins, away_draws, away_totals) = counts['home'], counts['away']
+        home_adj = home_wins[1] / np.maximum(home_totals[1], 1) * 0.7 + home_wins[2] / np.maximum(home_totals[2], 1) * 0.3
+        away_adj = away_wins[1] / np.maximum(away_totals[1], 1) * 0.7 + away_wins[2] / np.maximum(away_totals[2], 1) * 0.3
+        draw_rate = (home_draws / np.maximum(home_totals[1], 1) + away_draws / np.maximum(away_totals[1], 1)) / 2
+        
+        probs = np.column_stack([home_adj + 0.15, draw_rate, away_adj])
+        probs /= probs.sum(axis=1, keepdims=True)
+        valid = (home_totals[1] > 0) & (away_totals[1] > 0)
+        return probs, valid
+    
+    @staticmethod
+    def _form_probs(components, draw, weights):
+        home = (components @ weights) * (1 - draw)
+        return np.column_stack([home, draw, (1 - draw) - home])
+    
+    @staticmethod
+    def _log_loss(probs, outcome):
+        return float(-np.mean(np.log(np.clip(probs[np.arange(len(outcome)), outcome], 1e-12, 1))))
+    
+    def _descend(self, grad, params):
+        """Plain Adam on a small parameter vector"""
+        m = np.zeros_like(params)
+        v = np.zeros_like(params)
+        for step in range(1, self.iterations + 1):
+            g = grad(params)
+            m = 0.9 * m + 0.1 * g
+            v = 0.999 * v + 0.001 * g * g
+            params = params - self.learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        return params
+    
+    def _fit_form_components(self, components, draw, outcome):
+        """Softmax-parametrized component weights minimizing the form model's log-loss"""
+        y_home = (outcome == 0).astype(float)
+        y_away = (outcome == 2).astype(float)
+        
+        def grad(theta):
+            w = np.exp(theta - theta.max())
+            w /= w.sum()
+            h = np.clip(components @ w, 1e-6, 1 - 1e-6)
+            grad_w = components.T @ (-(y_home / h - y_away / (1 - h))) / len(outcome)
+            return w * (grad_w - w @ grad_w)
+        
+        theta = self._descend(grad, np.zeros(components.shape[1]))
+        w = np.exp(theta - theta.max())
+        return w / w.sum()
+    
+    def _fit_ensemble_share(self, complex_probs, form_probs, outcome):
+        """Share of complex vs form in their ensemble mixture minimizing log-loss"""
+        index = np.arange(len(outcome))
+        p_complex = complex_probs[index, outcome]
+        p_form = form_probs[index, outcome]
+        
+        def grad(phi):
+            a = 1 / (1 + np.exp(-phi[0]))
+            mixed = np.clip(a * p_complex + (1 - a) * p_form, 1e-12, 1)
+            return np.array([-np.mean((p_complex - p_form) / mixed) * a * (1 - a)])
+        
+        phi = self._descend(grad, np.zeros(1))
+        return float(1 / (1 + np.exp(-phi[0])))
+    
+    def _fit_calibration(self, probs, outcome):
+        """Temperature and per-outcome bias (home fixed at 0) minimizing log-loss"""
+        log_probs = np.log(np.clip(probs, 1e-9, 1))
+        targets = np.eye(3)[outcome]
+        
+        # params[0] is log(1 / temperature), which keeps the temperature positive
+        def grad(params):
+            scale = np.exp(params[0])
+            logits = log_probs * scale + np.r_[0, params[1:]]
+            logits -= logits.max(axis=1, keepdims=True)
+            p = np.exp(logits)
+            p /= p.sum(axis=1, keepdims=True)
+            diff = (p - targets) / len(outcome)
+            return np.r_[np.sum(diff * log_probs) * scale, diff[:, 1:].sum(axis=0)]
+        
+        params = self._descend(grad, np.zeros(3))
+        return {'temperature': round(float(np.exp(-params[0])), 4), 'bias': [0.0] + [round(float(b), 4) for b in params[1:]]}
+    
+    def fit(self, dataset):
+        """Fit on the older matches, validate on the most recent `holdout` share"""
+        outcome = dataset['outcome']
+        split = int(len(outcome) * (1 - self.holdout))
+        train, test = slice(0, split), slice(split, None)
+        defaults = DEFAULT_MODEL_WEIGHTS
+        
+        default_form_w = np.array([defaults['form_components'][c] for c in FormMomentumAnalyzer.MONEYLINE_COMPONENTS])
+        form_w = self._fit_form_components(dataset['form_components'][train], dataset['form_draw'][train], outcome[train])
+        form_probs = self._form_probs(dataset['form_components'], dataset['form_draw'], form_w)
+        
+        share = self._fit_ensemble_share(dataset['complex'][train], form_probs[train], outcome[train])
+        mixed = share * dataset['complex'] + (1 - share) * form_probs
+        calibration = self._fit_calibration(mixed[train], outcome[train])
+        
+        # Holdout log-loss of the hand-tuned and fitted pipelines
+        default_ensemble = defaults['ensemble']
+        default_share = default_ensemble['complex'] / (default_ensemble['complex'] + default_ensemble['form_momentum'])
+        default_probs = (default_share * dataset['complex'][test] +
+                         (1 - default_share) * self._form_probs(dataset['form_components'][test], dataset['form_draw'][test], default_form_w))
+        fitted_probs = apply_calibration(mixed[test], calibration)
+        
+        # The sentiment model keeps its default weight; complex/form split the rest
+        backtested_total = default_ensemble['complex'] + default_ensemble['form_momentum']
+        return {
+            'form_components': {c: round(float(w), 4) for c, w in zip(FormMomentumAnalyzer.MONEYLINE_COMPONENTS, form_w)},
+            'ensemble': {
+                'complex': round(backtested_total * share, 4),
+                'form_momentum': round(backtested_total * (1 - share), 4),
+                'sentiment': default_ensemble['sentiment']
+            },
+            'calibration': calibration,
+            'log_loss': {
+                'default': round(self._log_loss(default_probs, outcome[test]), 5),
+                'fitted': round(self._log_loss(fitted_probs, outcome[test]), 5)
+            },
+            'matches': {'train': split, 'holdout': len(outcome) - split}
+        }
+    
+    def run(self, path=None):
+        """Build the dataset, fit, and atomically write versioned weights. Returns the weights dict"""
+        path = path or MODEL_WEIGHTS_FILE
+        started = time.time()
+        dataset = self.build_dataset()
+        if len(dataset['outcome']) < 100:
+            print(f"Calibration skipped: only {len(dataset['outcome'])} usable matches")
+            self._record_check(path, dataset['last_match_id'], 'skipped')
+            return None
+        built = time.time()
+        
+        weights = self.fit(dataset)
+        if weights['log_loss']['fitted'] > weights['log_loss']['default']:
+            print(f"Calibration rejected: holdout log-loss {weights['log_loss']['fitted']} > default {weights['log_loss']['default']}")
+            self._record_check(path, dataset['last_match_id'], 'rejected', weights['log_loss'])
+            return None
+        
+        now = datetime.utcnow()
+        weights.update({
+            'version': now.strftime('%Y%m%dT%H%M%SZ'),
+            'created_at': now.isoformat(),
+            'last_match_id': dataset['last_match_id'],
+            'build_seconds': round(built - started, 2),
+            'fit_seconds': round(time.time() - built, 2)
+        })
+        
+        self._write(path, weights)
+        print(f"Model weights {weights['version']} written: holdout log-loss "
+              f"{weights['log_loss']['default']} -> {weights['log_loss']['fitted']} "
+              f"({weights['build_seconds']}s build, {weights['fit_seconds']}s fit)")
+        return weights
+    
+    def _record_check(self, path, last_match_id, result, log_loss=None):
+        """
+        Keep the current weights but note that they were checked against
+        `last_match_id`, so the same history isn't refit on every start.
+        """
+        weights = load_model_weights(path)
+        weights['last_match_id'] = last_match_id
+        weights['last_check'] = {'result': result, 'at': datetime.utcnow().isoformat(), 'log_loss': log_loss}
+        self._write(path, weights)
+    
+    @staticmethod
+    def _write(path, weights):
+        """Atomic replace through a temp file unique to this writer, in the same directory"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                        prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(weights, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def model_weights_mtime(path=None):
+    """
+    Modification time (with the inode, as every write replaces the file) of
+    the weights file, or None if there is none
+    """
+    try:
+        stat = os.stat(path or MODEL_WEIGHTS_FILE)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_ino)
+
+
+def reload_model_weights(path=None):
+    """Swap in weights from disk; analyzers created afterwards use them"""
+    global MODEL_WEIGHTS_MTIME
+    # Stat before reading, so a write in between is picked up by the next check
+    MODEL_WEIGHTS_MTIME = model_weights_mtime(path)
+    MODEL_WEIGHTS.update(load_model_weights(path))
+    return MODEL_WEIGHTS
+
+
+def reload_model_weights_if_changed():
+    """
+    Reload when the weights file changed since it was last read - a refit
+    runs in one worker, the others pick its weights up here. True if reloaded.
+    """
+    if model_weights_mtime() == MODEL_WEIGHTS_MTIME:
+        return False
+    reload_model_weights()
+    return True
+
+
+def refit_model_weights_if_stale():
+    """Refit in the background when the weights predate the latest imported match"""
+    try:
+        db = get_db()
+        last_match_id = db.execute('SELECT MAX(id) FROM matches').fetchone()[0]
+        db.close()
+    except Exception as e:
+        print(f"Model weights check error: {e}")
+        return
+    if last_match_id is None or MODEL_WEIGHTS.get('last_match_id') == last_match_id:
+        return
+    
+    def refit():
+        try:
+            # A rejected fit still records the match it was checked against
+            ModelWeightCalibrator().run()
+            reload_model_weights()
+        except Exception as e:
+            print(f"Model weight calibration error: {e}")
+    
+    threading.Thread(target=refit, daemon=True, name='calibrate-weights').start()
+
+
+MODEL_WEIGHTS_MTIME = model_weights_mtime()
+MODEL_WEIGHTS = load_model_weights()
+if MODEL_WEIGHTS_REFIT_PENDING:
+    # The first-start import in init_db ran before the calibrator was defined
+    refit_model_weights_if_stale()
+
+
+# =============================================================================
+# COMBINED OVERALL AI MODEL
+# =============================================================================
+# Shared by all requests; sized for a few concurrent fixtures x 3 sub-models
+MODEL_EXECUTOR = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix='model')
+
+
+class CombinedAIAnalyzer:
+    """
     Combined Overall AI Model - Blends multiple models for robust predictions.
     
     Combines:
@@ -1590,161 +3406,228 @@ class CombinedAIAnalyzer:
     - Bookmaker Anomaly detection - 20% weight (when anomaly detected)
     
     Uses ensemble approach with dynamic weighting based on data availability.
+    
+    Each sub-model's inputs are loaded once per fixture (fixture_context) and
+    every market, breakdown and explanation is priced from that shared state.
     """
     
-    def __init__(self):
+    MODEL_LABELS = {'complex': 'Complex', 'form_momentum': 'Form', 'sentiment': 'Sentiment'}
+    
+    def __init__(self, budgets=None):
         self.db = get_db()
-        self.advanced_analyzer = AdvancedBettingAnalyzer()
+        # Sub-model data loads run on MODEL_EXECUTOR threads
+        self.advanced_analyzer = AdvancedBettingAnalyzer(db=get_db(check_same_thread=False))
         self.form_analyzer = FormMomentumAnalyzer()
         self.sentiment_analyzer = SentimentExternalAnalyzer()
+        self.budgets = dict(MODEL_BUDGETS, **(budgets or {}))
+        # Defaults 25/30/25, refit by calibrate_weights.py
+        self.weights = dict(MODEL_WEIGHTS['ensemble'])
+        self.calibration = MODEL_WEIGHTS['calibration']
+        # A model still running past its budget keeps its lock, so later
+        # fixtures skip it instead of queueing behind it
+        self._model_locks = {name: threading.Lock() for name in self.MODEL_LABELS}
+        self._fixture_cache = {}
     
-    def calculate_probability(self, home_team, away_team, bet_type, market, bookmaker_odds=None):
+    def _run_locked(self, name, func, *args):
+        try:
+            return func(*args)
+        finally:
+            self._model_locks[name].release()
+    
+    def fixture_context(self, home_team, away_team):
         """
-        Calculate combined probability from multiple models.
-        
-        Weights:
-        - Complex model: 25%
-        - Form & Momentum: 30%
-        - Sentiment & FPL: 25%
-        - Anomaly adjustment: 20% (when applicable)
+        Run every sub-model's data gathering once for a fixture, concurrently
+        on MODEL_EXECUTOR:
+        - complex: current + two-season team stats
+        - form_momentum: one features_for_fixtures row (ELO, form, H2H, momentum)
+        - sentiment: strength, injury and sentiment components (may hit FPL)
+        A sub-model that fails or misses its latency budget is left as None
+        and listed in context['missed'].
         """
-        probabilities = []
-        weights = []
-        explanations = []
+        key = (home_team, away_team)
+        if key in self._fixture_cache:
+            return self._fixture_cache[key]
+        
+        context = {'home_team': home_team, 'away_team': away_team,
+                   'stats': None, 'form': None, 'sentiment': None,
+                   'missed': [], 'timings': {}}
+        loaders = {
+            'complex': ('stats', self.advanced_analyzer.get_fixture_stats, (home_team, away_team)),
+            'form_momentum': ('form', self.form_analyzer.features_for_fixtures, ([key],)),
+            'sentiment': ('sentiment', self.sentiment_analyzer.get_fixture_components, (home_team, away_team)),
+        }
         
-        # 1. Multi-Factor AI (Complex) - 25%
-        try:
-            complex_prob = self.advanced_analyzer.calculate_ai_probability(
-                home_team, away_team, bet_type, market, 'complex'
-            )
-            if complex_prob:
-                probabilities.append(complex_prob)
-                weights.append(0.25)
-                explanations.append("Complex")
-        except Exception as e:
-            print(f"Complex model error: {e}")
+        started = time.monotonic()
+        futures = {}
+        for name, (_, func, args) in loaders.items():
+            if self._model_locks[name].acquire(blocking=False):
+                futures[name] = MODEL_EXECUTOR.submit(self._run_locked, name, func, *args)
+            else:
+                context['missed'].append(name)
+                print(f"{self.MODEL_LABELS[name]} model still busy, skipping for {home_team} vs {away_team}")
         
-        # 2. Form & Momentum - 30%
-        try:
-            form_prob = self.form_analyzer.calculate_probability(
-                home_team, away_team, bet_type, market
-            )
-            if form_prob:
-                probabilities.append(form_prob)
-                weights.append(0.30)
-                explanations.append("Form")
-        except Exception as e:
-            print(f"Form model error: {e}")
+        for name, future in futures.items():
+            remaining = max(0, started + self.budgets[name] - time.monotonic())
+            try:
+                context[loaders[name][0]] = future.result(timeout=remaining)
+                context['timings'][name] = round(time.monotonic() - started, 3)
+            except FutureTimeoutError:
+                context['missed'].append(name)
+                print(f"{self.MODEL_LABELS[name]} model missed its {self.budgets[name]}s budget for {home_team} vs {away_team}")
+            except Exception as e:
+                context['missed'].append(name)
+                print(f"{self.MODEL_LABELS[name]} model error: {e}")
         
-        # 3. Sentiment & FPL - 25%
-        try:
-            sentiment_prob = self.sentiment_analyzer.calculate_probability(
-                home_team, away_team, bet_type, market
-            )
-            if sentiment_prob:
-                probabilities.append(sentiment_prob)
-                weights.append(0.25)
-                explanations.append("Sentiment")
-        except Exception as e:
-            print(f"Sentiment model error: {e}")
+        self._fixture_cache[key] = context
+        return context
+    
+    def _model_probabilities(self, context, bet_type, market):
+        """Price one market with each sub-model from the shared fixture context"""
+        breakdown = {'complex': None, 'form_momentum': None, 'sentiment': None}
         
-        # 4. Anomaly Detection - 20% adjustment
-        anomaly_bonus = 0
-        if bookmaker_odds and bet_type == 'moneyline':
+        if context['stats']:
             try:
-                anomaly_data = self.advanced_analyzer.detect_bookmaker_anomalies(bookmaker_odds)
-                if anomaly_data and anomaly_data['is_anomaly']:
-                    # Significant anomaly detected - boost confidence
-                    anomaly_bonus = anomaly_data['percentage_better'] / 100 * 0.20
-                    explanations.append(f"Anomaly+{anomaly_data['percentage_better']:.0f}%")
+                breakdown['complex'] = self.advanced_analyzer.probability_from_stats(
+                    context['stats'], bet_type, market, 'complex'
+                )
             except Exception as e:
-                print(f"Anomaly detection error: {e}")
+                print(f"Complex model error: {e}")
         
-        if not probabilities:
-            return None
+        if context['form']:
+            try:
+                breakdown['form_momentum'] = self.form_analyzer.probability_from_features(
+                    context['form'], 0, bet_type, market
+                )
+            except Exception as e:
+                print(f"Form model error: {e}")
+        
+        if context['sentiment']:
+            try:
+                # Historical baseline is the simple model on the current-season stats
+                base_prob = None
+                if context['stats']:
+                    home_current, away_current, _, _ = context['stats']
+                    base_prob = self.advanced_analyzer.probability_from_stats(
+                        (home_current, away_current, None, None), bet_type, market, 'simple'
+                    )
+                breakdown['sentiment'] = self.sentiment_analyzer.probability_from_components(
+                    context['sentiment'], bet_type, market, base_prob
+                )
+            except Exception as e:
+                print(f"Sentiment model error: {e}")
         
-        # Normalize weights
-        total_weight = sum(weights)
-        normalized_weights = [w / total_weight for w in weights]
+        return breakdown
+    
+    def evaluate(self, home_team, away_team, bet_type, market, anomaly=None):
+        """
+        Evaluate the ensemble for one market in a single pass. `anomaly` is
+        the outcome's OddsAnomalyEngine record, if its odds are known.
+        
+        Returns {'probability', 'breakdown', 'models_used', 'models_missed',
+        'anomaly', 'context'}; probability is None when no sub-model could
+        price the market. Weights are renormalized over the models that
+        produced a probability within their budget. The
+        context is what get_explanation needs, so explaining the same bet
+        does not re-run any model.
+        """
+        context = self.fixture_context(home_team, away_team)
+        breakdown = self._model_probabilities(context, bet_type, market)
+        models_used = [self.MODEL_LABELS[name] for name, prob in breakdown.items() if prob]
         
-        # Calculate weighted average
-        combined_prob = sum(p * w for p, w in zip(probabilities, normalized_weights))
+        # Anomaly Detection - 20% adjustment
+        anomaly_bonus = 0
+        if anomaly and anomaly['is_anomaly']:
+            # A bookmaker is a robust outlier against the market consensus - boost confidence
+            anomaly_bonus = anomaly['edge_percentage'] / 100 * 0.20
+            models_used.append(f"Anomaly+{anomaly['edge_percentage']:.0f}%")
+        
+        probability = self._combine(breakdown)
+        
+        # Calibration map works on the full home/draw/away vector
+        if probability is not None and bet_type == 'moneyline' and not calibration_is_identity(self.calibration):
+            outcomes = [
+                probability if outcome == market else self._combine(self._model_probabilities(context, bet_type, outcome))
+                for outcome in MONEYLINE_OUTCOMES
+            ]
+            if None not in outcomes:
+                calibrated = apply_calibration(np.array(outcomes), self.calibration)
+                probability = float(calibrated[MONEYLINE_OUTCOMES.index(market)])
+        
+        if probability is not None:
+            # Apply anomaly bonus (if odds are better than market average)
+            probability = min(0.95, probability + anomaly_bonus)
         
-        # Apply anomaly bonus (if odds are better than market average)
-        combined_prob = min(0.95, combined_prob + anomaly_bonus)
+        return {
+            'probability': probability,
+            'breakdown': breakdown,
+            'models_used': models_used,
+            'models_missed': [self.MODEL_LABELS[name] for name in context['missed']],
+            'anomaly': anomaly,
+            'context': context
+        }
+    
+    def _combine(self, breakdown):
+        """Weighted average over the models that produced a probability (weights renormalized)"""
+        weights = {name: self.weights[name] for name, prob in breakdown.items() if prob}
+        if not weights:
+            return None
+        total_weight = sum(weights.values())
+        return sum(breakdown[name] * w / total_weight for name, w in weights.items())
+    
+    def calculate_probability(self, home_team, away_team, bet_type, market, anomaly=None):
+        """
+        Calculate combined probability from multiple models.
         
-        return combined_prob
+        Weights:
+        - Complex model: 25%
+        - Form & Momentum: 30%
+        - Sentiment & FPL: 25%
+        - Anomaly adjustment: 20% (when applicable)
+        """
+        return self.evaluate(home_team, away_team, bet_type, market, anomaly)['probability']
     
     def get_model_breakdown(self, home_team, away_team, bet_type, market):
         """Get individual model probabilities for transparency."""
-        breakdown = {}
-        
-        try:
-            breakdown['complex'] = self.advanced_analyzer.calculate_ai_probability(
-                home_team, away_team, bet_type, market, 'complex'
-            )
-        except:
-            breakdown['complex'] = None
-        
-        try:
-            breakdown['form_momentum'] = self.form_analyzer.calculate_probability(
-                home_team, away_team, bet_type, market
-            )
-        except:
-            breakdown['form_momentum'] = None
-        
-        try:
-            breakdown['sentiment'] = self.sentiment_analyzer.calculate_probability(
-                home_team, away_team, bet_type, market
-            )
-        except:
-            breakdown['sentiment'] = None
-        
-        return breakdown
+        return self.evaluate(home_team, away_team, bet_type, market)['breakdown']
     
-    def get_explanation(self, home_team, away_team, bet_type, market):
-        """Generate comprehensive explanation combining all models."""
+    def explanation_from_evaluation(self, evaluation):
+        """Build the combined explanation from an evaluate() result without re-running models"""
+        context = evaluation['context']
+        home_team, away_team = context['home_team'], context['away_team']
         parts = []
         
-        # Get ELO from form analyzer
-        try:
-            home_elo = self.form_analyzer.calculate_elo_rating(home_team)
-            away_elo = self.form_analyzer.calculate_elo_rating(away_team)
-            parts.append(f"⚡ ELO: {home_team[:3].upper()} {home_elo:.0f} vs {away_team[:3].upper()} {away_elo:.0f}")
-        except:
-            pass
-        
-        # Get form from form analyzer
-        try:
-            home_form = self.form_analyzer.get_recent_form(home_team, 5, 'home')
-            away_form = self.form_analyzer.get_recent_form(away_team, 5, 'away')
-            parts.append(f"📊 Form: {home_form['weighted_ppg']:.1f} vs {away_form['weighted_ppg']:.1f} PPG")
-        except:
-            pass
-        
-        # Get strength from sentiment analyzer
-        try:
-            home_strength = self.sentiment_analyzer.get_team_strength_index(home_team)
-            away_strength = self.sentiment_analyzer.get_team_strength_index(away_team)
-            parts.append(f"💪 Strength: {home_strength:.0f} vs {away_strength:.0f}")
-        except:
-            pass
+        if context['form']:
+            c = self.form_analyzer._components_from_features(context['form'], 0)
+            
+            # ELO from the form features
+            parts.append(f"⚡ ELO: {home_team[:3].upper()} {c['home_elo']:.0f} vs {away_team[:3].upper()} {c['away_elo']:.0f}")
+            
+            # Form from the form features
+            if 'weighted_ppg' in c['home_form'] and 'weighted_ppg' in c['away_form']:
+                parts.append(f"📊 Form: {c['home_form']['weighted_ppg']:.1f} vs {c['away_form']['weighted_ppg']:.1f} PPG")
         
-        # Get injury info
-        try:
-            home_injury = self.sentiment_analyzer.get_injury_impact(home_team)
-            if 'Injuries:' in home_injury['description'] or 'injury crisis' in home_injury['description']:
-                parts.append(home_injury['description'])
-        except:
-            pass
+        if context['sentiment']:
+            s = context['sentiment']
+            parts.append(f"💪 Strength: {s['home_strength']:.0f} vs {s['away_strength']:.0f}")
+            
+            home_injury = s['home_injury']['description']
+            if 'Injuries:' in home_injury or 'injury crisis' in home_injury:
+                parts.append(home_injury)
         
-        # Get model breakdown
-        breakdown = self.get_model_breakdown(home_team, away_team, bet_type, market)
-        probs = [f"{k[:4]}:{v*100:.0f}%" for k, v in breakdown.items() if v]
+        probs = [f"{k[:4]}:{v*100:.0f}%" for k, v in evaluation['breakdown'].items() if v]
         if probs:
             parts.append(f"🤖 Models: {', '.join(probs)}")
+        anomaly = evaluation['anomaly']
+        if anomaly and anomaly['is_anomaly']:
+            parts.append(f"🎯 Anomaly: {anomaly['bookmaker']} {anomaly['edge_percentage']:+.1f}% vs consensus")
+        if evaluation['models_missed']:
+            parts.append(f"⏱️ Skipped: {', '.join(evaluation['models_missed'])}")
         
         return " | ".join(parts) if parts else "Combined AI model analysis"
+    
+    def get_explanation(self, home_team, away_team, bet_type, market):
+        """Generate comprehensive explanation combining all models."""
+        return self.explanation_from_evaluation(self.evaluate(home_team, away_team, bet_type, market))
 
 
 class BettingAnalyzer:
@@ -1973,97 +3856,947 @@ def fetch_betfair_markets():
     # - Event ID mapping
     return None
 
-def fetch_league_odds(sport='soccer_epl'):
+class OddsRefreshScheduler:
     """
-    Fetch odds from The Odds API for any league (includes Betfair data).
-    Results are cached for 1 hour to reduce API calls.
+    Per-league odds refresh intervals from kickoff proximity and API quota.
+    
+    Every event gets an interval from how soon it kicks off (ODDS_REFRESH_TIERS,
+    in-play counts as imminent); a league's interval is its most urgent
+    event's, since one API call refreshes every event in the league. When
+    the remaining quota (from the x-requests-* response headers, shared
+    through the odds_api_quota table) cannot sustain the planned call rate
+    until the quota resets, all intervals are stretched proportionally.
+    Due refreshes sit in a min-heap keyed by (due time, interval), so the
+    leagues with the most imminent fixtures go first.
     """
-    global ODDS_CACHE, ODDS_LAST_FETCH
     
-    current_time = datetime.utcnow()
-    cache_key = sport
+    def __init__(self, tiers=ODDS_REFRESH_TIERS, max_interval=ODDS_REFRESH_MAX,
+                 reserve=ODDS_QUOTA_RESERVE, reset_day=ODDS_QUOTA_RESET_DAY):
+        self.tiers = tiers
+        self.max_interval = max_interval
+        self.reserve = reserve      # Quota kept back for first fetches and manual refreshes
+        self.reset_day = reset_day  # Day of month the Odds API quota resets (UTC)
+        self._lock = threading.Lock()
+        self._heap = []             # (due_ts, interval, league)
+        self._due = {}              # league -> due_ts of its live heap entry
+        self._base_intervals = {}   # league -> kickoff-based interval before quota stretching
+        self._nearest_kickoff = {}
+        self._quota = None
+        self._quota_read_at = 0
     
-    # Check if we have valid cached data
-    if cache_key in ODDS_CACHE:
-        cached_data, cached_time = ODDS_CACHE[cache_key]
-        age_seconds = (current_time - cached_time).total_seconds()
-        
-        if age_seconds < ODDS_CACHE_EXPIRY:
-            print(f"Using cached odds for {sport} (age: {int(age_seconds)}s)")
-            return cached_data
-        else:
-            print(f"Cache expired for {sport} (age: {int(age_seconds)}s)")
+    @staticmethod
+    def _parse_time(value):
+        """ISO commence_time ('...Z') -> naive UTC datetime"""
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return None
+        return parsed.replace(tzinfo=None) - (parsed.utcoffset() or timedelta(0))
     
-    # Fetch fresh data from API
-    try:
-        print(f"Fetching fresh odds for {sport} from API...")
-        url = f"{ODDS_API_BASE_URL}/sports/{sport}/odds"
-        params = {
-            'apiKey': ODDS_API_KEY,
-            'regions': 'uk,us,eu',  # UK, US, and European bookmakers (includes Betfair)
-            'markets': 'h2h,spreads,totals,h2h_lay',  # All match-specific markets
-            'oddsFormat': 'decimal',
-            'dateFormat': 'iso'
+    def event_interval(self, commence_time, now):
+        """Refresh interval for one event, or None once it is long finished"""
+        kickoff = self._parse_time(commence_time)
+        if kickoff is None:
+            return self.max_interval
+        seconds_to_kickoff = (kickoff - now).total_seconds()
+        if seconds_to_kickoff < -3 * 3600:
+            return None
+        for horizon, interval in self.tiers:
+            if seconds_to_kickoff <= horizon:
+                return interval
+        return self.max_interval
+    
+    def league_interval(self, league, data, now=None):
+        """Kickoff-based interval for a league's cached events (before quota stretching)"""
+        now = now or datetime.utcnow()
+        intervals = []
+        kickoffs = []
+        for event in data or []:
+            interval = self.event_interval(event.get('commence_time'), now)
+            if interval is not None:
+                intervals.append(interval)
+                kickoffs.append(event.get('commence_time'))
+        interval = min(intervals) if intervals else self.max_interval
+        with self._lock:
+            self._base_intervals[league] = interval
+            self._nearest_kickoff[league] = min(kickoffs) if kickoffs else None
+        return interval
+    
+    def record_quota(self, headers):
+        """Store the quota headers from an Odds API response"""
+        try:
+            remaining = int(float(headers['x-requests-remaining']))
+        except (KeyError, TypeError, ValueError):
+            return
+        used = headers.get('x-requests-used')
+        cost = headers.get('x-requests-last')
+        quota = {
+            'requests_remaining': remaining,
+            'requests_used': int(float(used)) if used is not None else None,
+            'last_cost': int(float(cost)) if cost is not None else None,
+            'updated_at': datetime.utcnow().isoformat()
+        }
+        db = sqlite3.connect(DATABASE, timeout=10)
+        try:
+            db.execute('''
+                INSERT OR REPLACE INTO odds_api_quota (id, requests_remaining, requests_used, last_cost, updated_at)
+                VALUES (1, ?, ?, ?, ?)
+            ''', (quota['requests_remaining'], quota['requests_used'], quota['last_cost'], quota['updated_at']))
+            db.commit()
+        except sqlite3.Error as e:
+            print(f"Odds quota record error: {e}")
+        finally:
+            db.close()
+        with self._lock:
+            self._quota = quota
+            self._quota_read_at = time.time()
+    
+    def quota(self):
+        """Latest shared quota reading (re-read at most every 5 seconds)"""
+        if time.time() - self._quota_read_at < 5:
+            return self._quota
+        db = sqlite3.connect(DATABASE, timeout=10)
+        db.row_factory = sqlite3.Row
+        try:
+            row = db.execute('SELECT * FROM odds_api_quota WHERE id = 1').fetchone()
+        except sqlite3.Error:
+            row = None
+        finally:
+            db.close()
+        with self._lock:
+            self._quota = {k: row[k] for k in row.keys() if k != 'id'} if row else None
+            self._quota_read_at = time.time()
+            return self._quota
+    
+    def seconds_until_reset(self, now=None):
+        now = now or datetime.utcnow()
+        reset = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0) + timedelta(days=self.reset_day - 1)
+        if reset <= now:
+            next_month = (now.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            reset = next_month + timedelta(days=self.reset_day - 1)
+        return (reset - now).total_seconds()
+    
+    def quota_factor(self):
+        """How much to stretch intervals so the planned calls fit the remaining quota"""
+        quota = self.quota()
+        if not quota or quota['requests_remaining'] is None:
+            return 1.0
+        usable = quota['requests_remaining'] - self.reserve
+        if usable <= 0:
+            return float('inf')
+        with self._lock:
+            planned_rate = sum(1 / interval for interval in self._base_intervals.values())
+        cost = max(quota['last_cost'] or 1, 1)
+        affordable_rate = usable / cost / max(self.seconds_until_reset(), 1)
+        return max(1.0, planned_rate / affordable_rate) if affordable_rate > 0 else float('inf')
+    
+    def interval_for(self, league, data):
+        """Effective refresh interval: kickoff tier stretched by the quota factor"""
+        base = self.league_interval(league, data)
+        factor = self.quota_factor()
+        if factor == float('inf'):
+            # Out of quota: hold what we have until the reset
+            return max(base, self.seconds_until_reset())
+        return min(base * factor, max(self.max_interval, base) * 4)
+    
+    def schedule(self, league, due_ts, interval):
+        with self._lock:
+            self._due[league] = due_ts
+            heapq.heappush(self._heap, (due_ts, interval, league))
+    
+    def unschedule(self, league):
+        with self._lock:
+            self._due.pop(league, None)
+    
+    def is_scheduled(self, league):
+        with self._lock:
+            return league in self._due
+    
+    def seconds_until_next(self):
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+                heapq.heappop(self._heap)  # superseded entry
+            return self._heap[0][0] - time.time() if self._heap else None
+    
+    def pop_due(self):
+        """Leagues due now, most urgent first"""
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_ts, _, league = heapq.heappop(self._heap)
+                if self._due.get(league) == due_ts:
+                    del self._due[league]
+                    due.append(league)
+        return due
+    
+    def status(self):
+        quota = self.quota()
+        factor = self.quota_factor()
+        with self._lock:
+            leagues = {
+                league: {
+                    'base_interval_seconds': interval,
+                    'next_refresh_at': datetime.utcfromtimestamp(self._due[league]).isoformat() if league in self._due else None,
+                    'nearest_kickoff': self._nearest_kickoff.get(league)
+                }
+                for league, interval in self._base_intervals.items()
+            }
+        return {
+            'quota': quota,
+            'quota_factor': None if factor == float('inf') else round(factor, 2),
+            'quota_exhausted': factor == float('inf'),
+            'seconds_until_quota_reset': int(self.seconds_until_reset()),
+            'leagues': leagues
         }
-        
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Cache the data
-        ODDS_CACHE[cache_key] = (data, current_time)
-        ODDS_LAST_FETCH = current_time
-        print(f"Cached {len(data)} matches for {sport}")
-        
-        return data
-        
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching odds for {sport}: {e}")
-        
-        # Return stale cache if available
-        if cache_key in ODDS_CACHE:
-            print(f"Returning stale cache for {sport}")
-            return ODDS_CACHE[cache_key][0]
-        
-        return None
 
-def fetch_premier_league_odds():
-    """Fetch Premier League odds - wrapper for backwards compatibility"""
-    return fetch_league_odds('soccer_epl')
 
-def format_odds_data(odds_data):
-    """Format odds data for frontend display"""
-    if not odds_data:
-        return []
+ODDS_SCHEDULER = OddsRefreshScheduler()
+HTTP_CLIENT.add_quota_listener('odds', ODDS_SCHEDULER.record_quota)
+
+
+class SharedOddsCache:
+    """
+    Odds cache shared by every worker process through SQLite.
     
-    formatted_matches = []
+    Responses live in the odds_cache table as zlib-compressed JSON; each
+    process keeps its last decoded copy per league and only re-reads the
+    payload when the stored fetched_at changes. Fetching is single-flight
+    across processes: a worker must hold the league's row in
+    odds_fetch_leases (taken with BEGIN IMMEDIATE) to call the API, and
+    the other workers wait for its result instead of spending quota.
     
-    for match in odds_data:
-        home_team = match.get('home_team', '')
-        away_team = match.get('away_team', '')
-        commence_time = match.get('commence_time', '')
-        bookmakers = match.get('bookmakers', [])
-        
-        # Organize bookmakers by region
-        uk_bookmakers = []
-        us_bookmakers = []
-        
-        for bookmaker in bookmakers:
-            bm_name = bookmaker.get('key', '')
-            bm_title = bookmaker.get('title', '')
-            markets = bookmaker.get('markets', [])
+    Stale-while-revalidate: an expired entry is returned immediately while a
+    background thread refreshes it, and a refresher thread re-fetches
+    recently requested leagues ahead of expiry, so requests only block on
+    the API for a league's very first fetch. After a failed fetch no worker
+    calls the API for that league again until a backoff (exponential in
+    the shared consecutive_failures) has passed. Expiry is per league from the
+    OddsRefreshScheduler (kickoff proximity and quota) when one is given,
+    otherwise the flat `expiry`.
+    
+    Supports the dict-style reads the routes use: `league in cache`,
+    `cache[league]` -> (data, fetched_at), `del cache[league]`, items().
+    """
+    
+    def __init__(self, loader, expiry=ODDS_CACHE_EXPIRY, lease_seconds=30, wait_timeout=20, poll_interval=0.25,
+                 background_refresh=ODDS_BACKGROUND_REFRESH, scheduler=None, fetch_concurrency=ODDS_FETCH_CONCURRENCY):
+        self.loader = loader  # loader(league) -> data, raises on failure
+        self.expiry = expiry
+        self.scheduler = scheduler
+        self.lease_seconds = lease_seconds  # A crashed fetcher's lease lapses after this (keep above HTTP_DEADLINES['odds'])
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._memo = {}  # league -> (fetched_at, data)
+        self._lock = threading.Lock()
+        self._league_locks = defaultdict(threading.Lock)
+        self.stats = {'hits': 0, 'stale_hits': 0, 'fetches': 0, 'waits': 0, 'failures': 0}
+        self.background_refresh = background_refresh
+        self._requested = {}  # league -> last request time (this process)
+        self._refresher = None
+        self._listeners = []
+        # Multi-league reads and due refreshes run their fetches concurrently
+        self._executor = ThreadPoolExecutor(max_workers=fetch_concurrency, thread_name_prefix='odds-fetch')
+    
+    def _connect(self):
+        # Autocommit mode so lease transactions are explicit
+        db = sqlite3.connect(DATABASE, timeout=10, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+    
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def get(self, league):
+        """(data, fetched_at datetime) from the shared table, or None"""
+        db = self._connect()
+        try:
+            row = db.execute('SELECT fetched_at FROM odds_cache WHERE league = ?', (league,)).fetchone()
+            if not row:
+                self._memo.pop(league, None)
+                return None
             
-            # Extract all market types
-            h2h_market = next((m for m in markets if m.get('key') == 'h2h'), None)
-            totals_market = next((m for m in markets if m.get('key') == 'totals'), None)
-            spreads_market = next((m for m in markets if m.get('key') == 'spreads'), None)
-            h2h_lay_market = next((m for m in markets if m.get('key') == 'h2h_lay'), None)
+            fetched_at = row['fetched_at']
+            memo = self._memo.get(league)
+            if memo and memo[0] == fetched_at:
+                return memo[1], datetime.fromisoformat(fetched_at)
             
-            bm_data = {
-                'name': bm_title,
-                'key': bm_name,
-                'h2h': {},
+            row = db.execute('SELECT fetched_at, payload FROM odds_cache WHERE league = ?', (league,)).fetchone()
+        finally:
+            db.close()
+        if not row:
+            return None
+        
+        data = json.loads(zlib.decompress(row['payload']))
+        self._memo[league] = (row['fetched_at'], data)
+        return data, datetime.fromisoformat(row['fetched_at'])
+    
+    def set(self, league, data, fetched_at=None):
+        fetched_at = (fetched_at or datetime.utcnow()).isoformat()
+        payload = zlib.compress(json.dumps(data).encode('utf-8'))
+        db = self._connect()
+        try:
+            db.execute('''
+                INSERT INTO odds_cache (league, fetched_at, match_count, payload) VALUES (?, ?, ?, ?)
+                ON CONFLICT(league) DO UPDATE SET
+                    fetched_at = excluded.fetched_at, match_count = excluded.match_count, payload = excluded.payload
+            ''', (league, fetched_at, len(data), payload))
+        finally:
+            db.close()
+        self._memo[league] = (fetched_at, data)
+    
+    def __contains__(self, league):
+        return self.get(league) is not None
+    
+    def __getitem__(self, league):
+        entry = self.get(league)
+        if entry is None:
+            raise KeyError(league)
+        return entry
+    
+    def __delitem__(self, league):
+        db = self._connect()
+        try:
+            db.execute('DELETE FROM odds_cache WHERE league = ?', (league,))
+        finally:
+            db.close()
+        self._memo.pop(league, None)
+    
+    def items(self):
+        db = self._connect()
+        try:
+            leagues = [row['league'] for row in db.execute('SELECT league FROM odds_cache ORDER BY league')]
+        finally:
+            db.close()
+        for league in leagues:
+            entry = self.get(league)
+            if entry is not None:
+                yield league, entry
+    
+    def max_age(self, league, entry):
+        """Seconds a league's cached entry stays fresh"""
+        if self.scheduler is None or entry is None:
+            return self.expiry
+        return self.scheduler.interval_for(league, entry[0])
+    
+    def is_fresh(self, entry, max_age=None, league=None):
+        if entry is None:
+            return False
+        max_age = self.max_age(league, entry) if max_age is None else max_age
+        return (datetime.utcnow() - entry[1]).total_seconds() < max_age
+    
+    def _acquire_lease(self, league):
+        db = self._connect()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute('SELECT owner, expires_at FROM odds_fetch_leases WHERE league = ?', (league,)).fetchone()
+            if row and row['owner'] != self.owner and row['expires_at'] > time.time():
+                db.execute('ROLLBACK')
+                return False
+            db.execute('''
+                INSERT INTO odds_fetch_leases (league, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(league) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            ''', (league, self.owner, time.time() + self.lease_seconds))
+            db.execute('COMMIT')
+            return True
+        except sqlite3.Error as e:
+            print(f"Odds lease error for {league}: {e}")
+            try:
+                db.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            return False
+        finally:
+            db.close()
+    
+    def _release_lease(self, league):
+        db = self._connect()
+        try:
+            db.execute('DELETE FROM odds_fetch_leases WHERE league = ? AND owner = ?', (league, self.owner))
+        finally:
+            db.close()
+    
+    def get_or_fetch(self, league, max_age=None):
+        """
+        Cached data for `league`. A fresh entry is returned as-is; a stale
+        one is returned immediately and refreshed in the background; only a
+        league with nothing cached blocks on the fetch.
+        """
+        self._requested[league] = time.time()
+        self._ensure_refresher()
+        
+        entry = self.get(league)
+        if self.is_fresh(entry, max_age, league):
+            self._count('hits')
+            return entry[0]
+        
+        if entry is not None and self.background_refresh:
+            self._count('stale_hits')
+            if not self.retry_at(league):
+                self.refresh_async(league, max_age)
+            return entry[0]
+        
+        return self.refresh(league, max_age)
+    
+    def get_many(self, leagues, max_age=None):
+        """get_or_fetch for several leagues at once. Returns {league: data or None}"""
+        leagues = list(dict.fromkeys(leagues))
+        if len(leagues) == 1:
+            return {leagues[0]: self.get_or_fetch(leagues[0], max_age)}
+        
+        def fetch(league):
+            try:
+                return self.get_or_fetch(league, max_age)
+            except Exception as e:
+                print(f"Odds fetch error for {league}: {e}")
+                return None
+        
+        return dict(zip(leagues, self._executor.map(fetch, leagues)))
+    
+    def refresh_async(self, league, max_age=None):
+        """Refresh in a daemon thread unless this process is already fetching the league"""
+        if self._league_locks[league].locked():
+            return
+        threading.Thread(target=self.refresh, args=(league, max_age), daemon=True,
+                         name=f'odds-refresh-{league}').start()
+    
+    def refresh(self, league, max_age=None):
+        """
+        Fetch `league` unless a fresh copy exists, at most once across all
+        workers. While another worker holds the lease this waits for its
+        result; on timeout or fetch failure the stale copy (if any) is
+        returned.
+        """
+        # Threads of this process queue here; other processes on the lease row
+        with self._league_locks[league]:
+            entry = self.get(league)
+            if self.is_fresh(entry, max_age, league):
+                return entry[0]
+            if self.retry_at(league):
+                # Recent failures (seen by any worker) - don't spend quota until the backoff passes
+                return entry[0] if entry else None
+            
+            deadline = time.monotonic() + self.wait_timeout
+            waited = False
+            while not self._acquire_lease(league):
+                if not waited:
+                    self._count('waits')
+                    waited = True
+                    print(f"Waiting for another worker to fetch {league}...")
+                if time.monotonic() > deadline:
+                    print(f"Timed out waiting for {league} fetch")
+                    return entry[0] if entry else None
+                time.sleep(self.poll_interval)
+                latest = self.get(league)
+                if self.is_fresh(latest, max_age, league):
+                    return latest[0]
+            
+            try:
+                # Another worker may have finished between our check and the lease
+                latest = self.get(league)
+                if self.is_fresh(latest, max_age, league):
+                    return latest[0]
+                
+                self._count('fetches')
+                started = time.monotonic()
+                try:
+                    data = self.loader(league)
+                except Exception as e:
+                    self._count('failures')
+                    self._record_attempt(league, (time.monotonic() - started) * 1000, error=e)
+                    print(f"Error fetching odds for {league}: {e}")
+                    if entry:
+                        print(f"Returning stale cache for {league}")
+                        return entry[0]
+                    return None
+                
+                self.set(league, data)
+                self._record_attempt(league, (time.monotonic() - started) * 1000)
+                self._notify(league, data)
+                return data
+            finally:
+                self._release_lease(league)
+    
+    def add_listener(self, callback):
+        """callback(league, data) runs after this process stores a freshly fetched payload"""
+        self._listeners.append(callback)
+    
+    def _notify(self, league, data):
+        for callback in self._listeners:
+            try:
+                callback(league, data)
+            except Exception as e:
+                print(f"Odds listener error for {league}: {e}")
+    
+    def _record_attempt(self, league, latency_ms, error=None):
+        """Update the shared per-league refresh stats"""
+        now = datetime.utcnow().isoformat()
+        db = self._connect()
+        try:
+            if error is None:
+                db.execute('''
+                    INSERT INTO odds_refresh_stats (league, refreshes, last_success_at, last_latency_ms, total_latency_ms)
+                    VALUES (?, 1, ?, ?, ?)
+                    ON CONFLICT(league) DO UPDATE SET
+                        refreshes = refreshes + 1, consecutive_failures = 0, last_success_at = excluded.last_success_at,
+                        last_latency_ms = excluded.last_latency_ms, total_latency_ms = total_latency_ms + excluded.last_latency_ms
+                ''', (league, now, latency_ms, latency_ms))
+            else:
+                db.execute('''
+                    INSERT INTO odds_refresh_stats (league, failures, consecutive_failures, last_failure_at, last_error)
+                    VALUES (?, 1, 1, ?, ?)
+                    ON CONFLICT(league) DO UPDATE SET
+                        failures = failures + 1, consecutive_failures = consecutive_failures + 1,
+                        last_failure_at = excluded.last_failure_at, last_error = excluded.last_error
+                ''', (league, now, re.sub(r'apiKey=[^&\s)]+', 'apiKey=***', str(error))[:500]))
+        except sqlite3.Error as e:
+            print(f"Odds refresh stats error: {e}")
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _retry_time(consecutive_failures, last_failure_at):
+        """Epoch seconds before which a league with these failures isn't fetched (0 if none)"""
+        if not consecutive_failures or not last_failure_at:
+            return 0
+        delay = min(ODDS_RETRY_MAX, ODDS_RETRY_BASE * 2 ** (consecutive_failures - 1))
+        return (datetime.fromisoformat(last_failure_at) - datetime(1970, 1, 1)).total_seconds() + delay
+    
+    def retry_at(self, league):
+        """Epoch seconds the league's failure backoff ends, or None if it may be fetched now"""
+        db = self._connect()
+        try:
+            row = db.execute('''
+                SELECT consecutive_failures, last_failure_at FROM odds_refresh_stats WHERE league = ?
+            ''', (league,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Odds refresh stats error: {e}")
+            return None
+        finally:
+            db.close()
+        retry_time = self._retry_time(row['consecutive_failures'], row['last_failure_at']) if row else 0
+        return retry_time if retry_time > time.time() else None
+    
+    def refresh_stats(self):
+        """Shared per-league refresh health: {league: {...}}"""
+        db = self._connect()
+        try:
+            rows = db.execute('SELECT * FROM odds_refresh_stats').fetchall()
+        finally:
+            db.close()
+        stats = {}
+        for row in rows:
+            row = dict(row)
+            league = row.pop('league')
+            total_latency = row.pop('total_latency_ms')
+            row['avg_latency_ms'] = round(total_latency / row['refreshes'], 1) if row['refreshes'] else None
+            if row['last_latency_ms'] is not None:
+                row['last_latency_ms'] = round(row['last_latency_ms'], 1)
+            retry_time = self._retry_time(row['consecutive_failures'], row['last_failure_at'])
+            row['next_retry_at'] = datetime.utcfromtimestamp(retry_time).isoformat() if retry_time > time.time() else None
+            stats[league] = row
+        return stats
+    
+    def _ensure_refresher(self):
+        if self.background_refresh and (self._refresher is None or not self._refresher.is_alive()):
+            with self._lock:
+                if self._refresher is None or not self._refresher.is_alive():
+                    self._refresher = threading.Thread(target=self._refresh_loop, daemon=True, name='odds-refresher')
+                    self._refresher.start()
+    
+    def _refresh_loop(self):
+        """
+        Re-fetch recently requested leagues once they pass ODDS_REFRESH_AHEAD
+        of their interval. With a scheduler the loop sleeps until the next
+        league is due and fetches the due leagues concurrently; without one
+        it checks every ODDS_REFRESH_INTERVAL seconds.
+        """
+        while True:
+            if self.scheduler is None:
+                time.sleep(ODDS_REFRESH_INTERVAL)
+                due = list(self._requested)
+            else:
+                for league in list(self._requested):
+                    if not self.scheduler.is_scheduled(league):
+                        self._schedule(league)
+                wait = self.scheduler.seconds_until_next()
+                time.sleep(min(ODDS_REFRESH_INTERVAL, max(1, wait)) if wait is not None else ODDS_REFRESH_INTERVAL)
+                due = self.scheduler.pop_due()
+            
+            now = time.time()
+            idle = [league for league in due if now - self._requested.get(league, 0) > ODDS_REFRESH_IDLE]
+            for league in idle:
+                self._requested.pop(league, None)
+            due = [league for league in due if league not in idle]
+            # Leagues that come due together are fetched concurrently
+            list(self._executor.map(self._refresh_due, due))
+    
+    def _refresh_due(self, league):
+        try:
+            entry = self.get(league)
+            refresh_age = self.max_age(league, entry) * ODDS_REFRESH_AHEAD
+            if not self.is_fresh(entry, refresh_age):
+                self.refresh(league, max_age=refresh_age)
+        except Exception as e:
+            print(f"Odds refresher error for {league}: {e}")
+        if self.scheduler is not None:
+            self._schedule(league)
+    
+    def _schedule(self, league):
+        """Queue the league's next proactive refresh from its cached kickoffs"""
+        entry = self.get(league)
+        if entry is None:
+            self.scheduler.schedule(league, time.time() + 60, self.expiry)
+            return
+        interval = self.max_age(league, entry)
+        fetched_ts = (entry[1] - datetime(1970, 1, 1)).total_seconds()
+        # A refresh that just failed leaves the entry overdue - retry in a minute
+        due = max(fetched_ts + interval * ODDS_REFRESH_AHEAD, time.time() + min(60, interval))
+        self.scheduler.schedule(league, due, interval)
+    
+    def status(self):
+        with self._lock:
+            return dict(self.stats, owner=self.owner, tracked_leagues=sorted(self._requested),
+                        background_refresh=self.background_refresh)
+
+
+class OddsHistoryStore:
+    """
+    Normalized, delta-encoded history of every Odds API payload.
+    
+    Each fetch is flattened to (event, bookmaker, market, outcome, point,
+    price) rows, but a row is only written when the price differs from the
+    last one stored for that key - unchanged prices are implied by the
+    odds_fetches row for the payload, and a line that disappears is closed
+    with a NULL price. The primary key orders rows per event/market/outcome,
+    so time series, closing lines and steam moves are all index range reads.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _timestamp(value):
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%dT%H:%M:%S')
+        return str(value).replace('Z', '')[:19]
+    
+    @staticmethod
+    def flatten(data):
+        """Payload -> {(event_id, market, outcome, point, bookmaker): price}"""
+        prices = {}
+        for event in data or []:
+            event_id = event.get('id')
+            if not event_id:
+                continue
+            for bookmaker in event.get('bookmakers', []):
+                bm_key = bookmaker.get('key', '')
+                for market in bookmaker.get('markets', []):
+                    market_key = market.get('key', '')
+                    for outcome in market.get('outcomes', []):
+                        price = outcome.get('price')
+                        if price is None:
+                            continue
+                        point = float(outcome.get('point') or 0)
+                        prices[(event_id, market_key, outcome.get('name', ''), point, bm_key)] = float(price)
+        return prices
+    
+    def record(self, league, data, fetched_at=None):
+        """Store the price changes in one payload. Returns the number of rows written."""
+        if not data:
+            return 0
+        key = self._timestamp(fetched_at or datetime.utcnow())
+        prices = self.flatten(data)
+        event_ids = sorted({e['id'] for e in data if e.get('id')})
+        
+        with self._lock:
+            db = get_db()
+            try:
+                db.execute('BEGIN IMMEDIATE')
+                db.executemany('''
+                    INSERT INTO odds_events (event_id, league, home_team, away_team, commence_time)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(event_id) DO UPDATE SET commence_time = excluded.commence_time
+                ''', [(e['id'], league, e.get('home_team'), e.get('away_team'), e.get('commence_time'))
+                      for e in data if e.get('id')])
+                
+                # Latest stored price per key (bare columns come from the MAX row)
+                last = {}
+                for start in range(0, len(event_ids), 500):
+                    chunk = event_ids[start:start + 500]
+                    cursor = db.execute(f'''
+                        SELECT event_id, market, outcome, point, bookmaker, price, MAX(fetched_at)
+                        FROM odds_history WHERE event_id IN ({','.join('?' * len(chunk))})
+                        GROUP BY event_id, market, outcome, point, bookmaker
+                    ''', chunk)
+                    for row in cursor:
+                        last[tuple(row[:5])] = row[5]
+                
+                changes = [k + (key, price) for k, price in prices.items() if last.get(k) != price]
+                # Lines present last time but missing from this payload were withdrawn
+                changes += [k + (key, None) for k, price in last.items()
+                            if price is not None and k not in prices]
+                
+                db.executemany('''
+                    INSERT OR REPLACE INTO odds_history (event_id, market, outcome, point, bookmaker, fetched_at, price)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', changes)
+                db.execute('''
+                    INSERT OR REPLACE INTO odds_fetches (league, fetched_at, events, prices_seen, rows_written)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (league, key, len(event_ids), len(prices), len(changes)))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        
+        print(f"Odds history for {league}: {len(changes)} changed of {len(prices)} prices")
+        return len(changes)
+    
+    def series(self, event_id, market=None, outcome=None):
+        """
+        Price changes for one event, oldest first:
+        {'event': {...}, 'lines': [{market, outcome, point, bookmaker, points: [[fetched_at, price], ...]}]}
+        """
+        db = get_db()
+        try:
+            event = db.execute('SELECT * FROM odds_events WHERE event_id = ?', (event_id,)).fetchone()
+            if event is None:
+                return None
+            sql = 'SELECT market, outcome, point, bookmaker, fetched_at, price FROM odds_history WHERE event_id = ?'
+            params = [event_id]
+            if market:
+                sql += ' AND market = ?'
+                params.append(market)
+                if outcome:
+                    sql += ' AND outcome = ?'
+                    params.append(outcome)
+            sql += ' ORDER BY market, outcome, point, bookmaker, fetched_at'
+            
+            lines = {}
+            for row in db.execute(sql, params):
+                line = lines.setdefault(tuple(row[:4]), {
+                    'market': row['market'], 'outcome': row['outcome'],
+                    'point': row['point'], 'bookmaker': row['bookmaker'], 'points': []
+                })
+                line['points'].append([row['fetched_at'], row['price']])
+            return {'event': dict(event), 'lines': list(lines.values())}
+        finally:
+            db.close()
+    
+    def closing_prices(self, event_id, market, outcome, point=0):
+        """Last price each bookmaker offered at or before kickoff ({bookmaker: price})"""
+        db = get_db()
+        try:
+            event = db.execute('SELECT commence_time FROM odds_events WHERE event_id = ?', (event_id,)).fetchone()
+            if event is None:
+                return {}
+            kickoff = self._timestamp(event['commence_time'] or '9999')
+            cursor = db.execute('''
+                SELECT bookmaker, price, MAX(fetched_at) FROM odds_history
+                WHERE event_id = ? AND market = ? AND outcome = ? AND point = ? AND fetched_at <= ?
+                GROUP BY bookmaker
+            ''', (event_id, market, outcome, float(point or 0), kickoff))
+            # A NULL last price means the bookmaker pulled the line before kickoff
+            return {row['bookmaker']: row['price'] for row in cursor if row['price'] is not None}
+        finally:
+            db.close()
+    
+    def closing_line_value(self, event_id, market, outcome, price, point=0):
+        """CLV of taking `price`, against the best and the average closing price"""
+        closing = self.closing_prices(event_id, market, outcome, point)
+        if not closing:
+            return None
+        best = max(closing.values())
+        average = sum(closing.values()) / len(closing)
+        return {
+            'price': price,
+            'closing_best': best,
+            'closing_average': round(average, 4),
+            'clv_vs_best': round(price / best - 1, 4),
+            'clv_vs_average': round(price / average - 1, 4),
+            'closing_prices': closing
+        }
+    
+    def steam_moves(self, since=None, league=None, min_drop=0.05, min_bookmakers=3, window_minutes=30):
+        """
+        Steam moves: at least min_bookmakers shortening the same outcome by
+        min_drop or more within window_minutes of each other.
+        """
+        since = self._timestamp(since or datetime.utcnow() - timedelta(days=1))
+        db = get_db()
+        try:
+            sql = '''
+                SELECT h.event_id, h.market, h.outcome, h.point, h.bookmaker, h.fetched_at, h.price, h.prev_price,
+                       e.league, e.home_team, e.away_team, e.commence_time
+                FROM (
+                    SELECT *, LAG(price) OVER (
+                        PARTITION BY event_id, market, outcome, point, bookmaker ORDER BY fetched_at
+                    ) AS prev_price
+                    FROM odds_history
+                    WHERE event_id IN (SELECT event_id FROM odds_history WHERE fetched_at >= ?)
+                ) h JOIN odds_events e ON e.event_id = h.event_id
+                WHERE h.fetched_at >= ? AND h.price IS NOT NULL AND h.prev_price IS NOT NULL
+                  AND h.price <= h.prev_price * ?
+            '''
+            params = [since, since, 1 - min_drop]
+            if league:
+                sql += ' AND e.league = ?'
+                params.append(league)
+            sql += ' ORDER BY h.event_id, h.market, h.outcome, h.point, h.fetched_at'
+            rows = [dict(row) for row in db.execute(sql, params)]
+        finally:
+            db.close()
+        
+        window = timedelta(minutes=window_minutes)
+        groups = {}
+        for row in rows:
+            groups.setdefault((row['event_id'], row['market'], row['outcome'], row['point']), []).append(row)
+        
+        moves = []
+        for drops in groups.values():
+            times = [datetime.fromisoformat(d['fetched_at']) for d in drops]
+            start = 0
+            for end in range(len(drops)):
+                while times[end] - times[start] > window:
+                    start += 1
+                books = {d['bookmaker'] for d in drops[start:end + 1]}
+                if len(books) < min_bookmakers:
+                    continue
+                in_window = drops[start:end + 1]
+                first = in_window[0]
+                move = {
+                    'event_id': first['event_id'], 'league': first['league'],
+                    'match': f"{first['home_team']} vs {first['away_team']}",
+                    'commence_time': first['commence_time'],
+                    'market': first['market'], 'outcome': first['outcome'], 'point': first['point'],
+                    'started_at': first['fetched_at'], 'detected_at': drops[end]['fetched_at'],
+                    'bookmakers': sorted(books),
+                    'average_drop': round(sum(1 - d['price'] / d['prev_price'] for d in in_window) / len(in_window), 4)
+                }
+                # Extend an ongoing move rather than reporting every step of it
+                if moves and moves[-1]['event_id'] == move['event_id'] and moves[-1]['outcome'] == move['outcome'] \
+                        and moves[-1]['market'] == move['market'] and moves[-1]['point'] == move['point'] \
+                        and moves[-1]['started_at'] <= move['started_at'] <= moves[-1]['detected_at']:
+                    moves[-1].update(detected_at=move['detected_at'],
+                                     bookmakers=sorted(set(moves[-1]['bookmakers']) | books),
+                                     average_drop=move['average_drop'])
+                else:
+                    moves.append(move)
+        
+        moves.sort(key=lambda m: m['detected_at'], reverse=True)
+        return moves
+    
+    def status(self):
+        """Storage efficiency of the delta encoding"""
+        db = get_db()
+        try:
+            row = db.execute('''
+                SELECT COUNT(*) AS fetches, COALESCE(SUM(prices_seen), 0) AS prices_seen,
+                       COALESCE(SUM(rows_written), 0) AS rows_written, MAX(fetched_at) AS last_recorded
+                FROM odds_fetches
+            ''').fetchone()
+            stats = dict(row)
+            stats['events'] = db.execute('SELECT COUNT(*) FROM odds_events').fetchone()[0]
+            stats['compression_ratio'] = round(stats['prices_seen'] / stats['rows_written'], 2) if stats['rows_written'] else None
+            return stats
+        finally:
+            db.close()
+
+
+ODDS_HISTORY = OddsHistoryStore()
+
+
+def fetch_odds_from_api(sport):
+    """One uncached Odds API call for a league (includes Betfair data). Raises on failure."""
+    global ODDS_LAST_FETCH
+    print(f"Fetching fresh odds for {sport} from API...")
+    url = f"{ODDS_API_BASE_URL}/sports/{sport}/odds"
+    params = {
+        'apiKey': ODDS_API_KEY,
+        'regions': 'uk,us,eu',  # UK, US, and European bookmakers (includes Betfair)
+        'markets': 'h2h,spreads,totals,h2h_lay',  # All match-specific markets
+        'oddsFormat': 'decimal',
+        'dateFormat': 'iso'
+    }
+    
+    # Quota headers reach ODDS_SCHEDULER through the client's quota listener
+    data = HTTP_CLIENT.get_json(url, endpoint='odds', params=params)
+    ODDS_LAST_FETCH = datetime.utcnow()
+    try:
+        ODDS_HISTORY.record(sport, data, ODDS_LAST_FETCH)
+    except Exception as e:
+        print(f"Error recording odds history for {sport}: {e}")
+    print(f"Cached {len(data)} matches for {sport}")
+    return data
+
+
+ODDS_CACHE = SharedOddsCache(fetch_odds_from_api, scheduler=ODDS_SCHEDULER)
+
+
+def parse_leagues(value):
+    """
+    'soccer_epl', 'soccer_epl,soccer_efl_champ' or 'all' -> list of sport
+    keys (deduplicated, malformed keys dropped)
+    """
+    if not value or value == 'all':
+        return list(ODDS_LEAGUES)
+    leagues = [s.strip() for s in value.split(',')]
+    return list(dict.fromkeys(s for s in leagues if re.fullmatch(r'[a-z0-9_]+', s)))
+
+
+# Prices several leagues' fixtures at once for multi-league scans
+LEAGUE_PRICING_EXECUTOR = ThreadPoolExecutor(max_workers=ODDS_FETCH_CONCURRENCY, thread_name_prefix='league-pricing')
+
+
+def fetch_league_odds(sport='soccer_epl'):
+    """
+    Odds for any league from the shared cache. Only the first request for a
+    league waits on The Odds API; after that entries are refreshed in the
+    background before they expire.
+    """
+    return ODDS_CACHE.get_or_fetch(sport)
+
+def fetch_premier_league_odds():
+    """Fetch Premier League odds - wrapper for backwards compatibility"""
+    return fetch_league_odds('soccer_epl')
+
+def format_odds_data(odds_data):
+    """Format odds data for frontend display"""
+    if not odds_data:
+        return []
+    
+    formatted_matches = []
+    
+    for match in odds_data:
+        home_team = match.get('home_team', '')
+        away_team = match.get('away_team', '')
+        commence_time = match.get('commence_time', '')
+        bookmakers = match.get('bookmakers', [])
+        
+        # Organize bookmakers by region
+        uk_bookmakers = []
+        us_bookmakers = []
+        
+        for bookmaker in bookmakers:
+            bm_name = bookmaker.get('key', '')
+            bm_title = bookmaker.get('title', '')
+            markets = bookmaker.get('markets', [])
+            
+            # Extract all market types
+            h2h_market = next((m for m in markets if m.get('key') == 'h2h'), None)
+            totals_market = next((m for m in markets if m.get('key') == 'totals'), None)
+            spreads_market = next((m for m in markets if m.get('key') == 'spreads'), None)
+            h2h_lay_market = next((m for m in markets if m.get('key') == 'h2h_lay'), None)
+            
+            bm_data = {
+                'name': bm_title,
+                'key': bm_name,
+                'h2h': {},
                 'totals': {},
                 'spreads': {},
                 'h2h_lay': {}
@@ -2102,18 +4835,16 @@ def format_odds_data(odds_data):
                     bm_data['h2h_lay'][team_name] = price
             
             # Categorize by region (rough classification based on common bookmakers)
-            uk_bookmakers_list = ['williamhill', 'skybet', 'paddypower', 'betfair', 'coral', 'ladbrokes', 'unibet']
-            us_bookmakers_list = ['fanduel', 'draftkings', 'betmgm', 'pointsbet', 'caesars', 'barstool']
-            
-            if bm_name in uk_bookmakers_list:
+            if bm_name in UK_BOOKMAKERS:
                 uk_bookmakers.append(bm_data)
-            elif bm_name in us_bookmakers_list:
+            elif bm_name in US_BOOKMAKERS:
                 us_bookmakers.append(bm_data)
             else:
                 # Default to UK if unknown
                 uk_bookmakers.append(bm_data)
         
         formatted_matches.append({
+            'id': odds_event_key(match),
             'home_team': home_team,
             'away_team': away_team,
             'commence_time': commence_time,
@@ -2123,68 +4854,675 @@ def format_odds_data(odds_data):
     
     return formatted_matches
 
-# Authentication decorator
-def require_auth(f):
-    """Decorator to require authentication"""
-    def decorated_function(*args, **kwargs):
-        if not session.get('authenticated'):
-            return redirect(url_for('login'))
-        return f(*args, **kwargs)
-    decorated_function.__name__ = f.__name__
-    return decorated_function
+# Rough region classification of common bookmaker keys
+UK_BOOKMAKERS = ('williamhill', 'skybet', 'paddypower', 'betfair', 'coral', 'ladbrokes', 'unibet')
+US_BOOKMAKERS = ('fanduel', 'draftkings', 'betmgm', 'pointsbet', 'caesars', 'barstool')
 
-# Routes
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    """Login page"""
-    if request.method == 'POST':
-        password = request.form.get('password')
-        if password == APP_PASSWORD:
-            session['authenticated'] = True
-            return redirect(url_for('index'))
-        else:
-            return render_template('login.html', error='Incorrect password')
-    return render_template('login.html')
 
-@app.route('/logout')
-def logout():
-    """Logout"""
-    session.clear()
-    return redirect(url_for('login'))
+# Moneyline markets -> h2h outcome side
+MONEYLINE_SIDES = {'home_win': 'home', 'draw': 'draw', 'away_win': 'away'}
 
-@app.route('/')
-@require_auth
-def index():
-    """Main page"""
-    return render_template('index.html')
 
-@app.route('/api/fixtures')
-def get_fixtures():
-    """Get upcoming fixtures"""
-    # In production, this would fetch from an API
-    # For now, return sample fixtures
-    fixtures = [
-        {
-            'id': 1,
-            'date': '2025-11-01',
-            'time': '15:00',
-            'home_team': 'Manchester City',
-            'away_team': 'Arsenal',
-            'venue': 'Etihad Stadium'
-        },
-        {
-            'id': 2,
-            'date': '2025-11-01',
-            'time': '15:00',
-            'home_team': 'Liverpool',
-            'away_team': 'Chelsea',
-            'venue': 'Anfield'
-        },
-        {
-            'id': 3,
-            'date': '2025-11-02',
-            'time': '16:30',
-            'home_team': 'Manchester United',
+def bookmaker_region(bookmaker_key):
+    return 'UK' if bookmaker_key in UK_BOOKMAKERS else 'US' if bookmaker_key in US_BOOKMAKERS else 'Other'
+
+
+def odds_event_key(match):
+    """Stable id of a fixture in an Odds API payload"""
+    return match.get('id') or f"{match.get('home_team', '')}|{match.get('away_team', '')}|{match.get('commence_time', '')}"
+
+
+class OddsTensor:
+    """
+    One Odds API payload parsed once into dense NumPy arrays.
+    
+    prices[e, b, s] is bookmaker b's decimal price for outcome slot s of
+    event e (NaN when not offered). A slot is (market, side, point) with
+    the side relative to the fixture - 'home'/'draw'/'away' for h2h,
+    h2h_lay and spreads, 'over'/'under' for totals - so a slot is the same
+    bet in every event. seq[e, b, s] is the quote's position in the raw
+    payload; it breaks price ties and orders lines exactly as a walk over
+    the JSON would. Best price, average, dispersion and arbitrage are
+    reductions over the bookmaker axis under a region mask.
+    """
+    
+    MARKETS = ('h2h', 'totals', 'spreads', 'h2h_lay')
+    NO_QUOTE = np.iinfo(np.int32).max
+    _cache = {}  # league -> (payload, tensor); payloads are shared objects from ODDS_CACHE
+    
+    def __init__(self, data):
+        self.events = []
+        self.bookmakers = []  # bookmaker keys, indexed by b
+        self.titles = []
+        self.slots = []  # (market, side, point), indexed by s
+        self._bookmaker_index = {}
+        self._slot_index = {}
+        quotes = []  # (e, b, s, price, seq)
+        
+        for e, event in enumerate(data or []):
+            home_team = event.get('home_team', '')
+            away_team = event.get('away_team', '')
+            self.events.append({
+                'id': event.get('id'),
+                'home_team': home_team,
+                'away_team': away_team,
+                'commence_time': event.get('commence_time', '')
+            })
+            seq = 0
+            for bookmaker in event.get('bookmakers', []):
+                b = self._index_bookmaker(bookmaker)
+                for market in bookmaker.get('markets', []):
+                    market_key = market.get('key')
+                    if market_key not in self.MARKETS:
+                        continue
+                    for outcome in market.get('outcomes', []):
+                        price = outcome.get('price')
+                        side = self._side(market_key, outcome.get('name', ''), home_team, away_team)
+                        point = outcome.get('point')
+                        if price is None or side is None:
+                            continue
+                        if market_key in ('totals', 'spreads'):
+                            if point is None:
+                                continue
+                            point = float(point)
+                        else:
+                            point = None
+                        quotes.append((e, b, self._index_slot((market_key, side, point)), float(price), seq))
+                        seq += 1
+        
+        shape = (len(self.events), len(self.bookmakers), len(self.slots))
+        self.prices = np.full(shape, np.nan)
+        self.seq = np.full(shape, self.NO_QUOTE, dtype=np.int32)
+        if quotes:
+            q = np.array(quotes)
+            # A repeated quote keeps its best price (and the earliest position at that price)
+            q = q[np.lexsort((-q[:, 4], q[:, 3]))]
+            e, b, s = q[:, 0].astype(int), q[:, 1].astype(int), q[:, 2].astype(int)
+            self.prices[e, b, s] = q[:, 3]
+            self.seq[e, b, s] = q[:, 4].astype(np.int32)
+        self.regions = np.array([bookmaker_region(key) for key in self.bookmakers], dtype=object)
+        self.groups = self._outcome_groups()
+    
+    @classmethod
+    def for_payload(cls, league, data):
+        """Tensor for a league's cached payload, parsed once per refresh"""
+        cached = cls._cache.get(league)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        tensor = cls(data)
+        cls._cache[league] = (data, tensor)
+        return tensor
+    
+    @staticmethod
+    def _side(market_key, name, home_team, away_team):
+        if market_key == 'totals':
+            side = name.lower()
+            return side if side in ('over', 'under') else None
+        if name == home_team:
+            return 'home'
+        if name == away_team:
+            return 'away'
+        if name == 'Draw' and market_key != 'spreads':
+            return 'draw'
+        return None
+    
+    def _index_bookmaker(self, bookmaker):
+        key = bookmaker.get('key', '')
+        b = self._bookmaker_index.get(key)
+        if b is None:
+            b = self._bookmaker_index[key] = len(self.bookmakers)
+            self.bookmakers.append(key)
+            self.titles.append(bookmaker.get('title'))
+        return b
+    
+    def _index_slot(self, slot):
+        s = self._slot_index.get(slot)
+        if s is None:
+            s = self._slot_index[slot] = len(self.slots)
+            self.slots.append(slot)
+        return s
+    
+    def _outcome_groups(self):
+        """Mutually exclusive outcome sets: [(market, point, [slot indices])]"""
+        groups = []
+        h2h = [self._slot_index.get(('h2h', side, None)) for side in ('home', 'draw', 'away')]
+        if None not in h2h:
+            groups.append(('h2h', None, h2h))
+        for (market, side, point), s in self._slot_index.items():
+            if market == 'totals' and side == 'over' and ('totals', 'under', point) in self._slot_index:
+                groups.append(('totals', point, [s, self._slot_index[('totals', 'under', point)]]))
+            elif market == 'spreads' and side == 'home' and ('spreads', 'away', -point) in self._slot_index:
+                groups.append(('spreads', point, [s, self._slot_index[('spreads', 'away', -point)]]))
+        return groups
+    
+    def slot(self, market, side, point=None):
+        return self._slot_index.get((market, side, point))
+    
+    def region_mask(self, region_filter='both'):
+        """Boolean mask over bookmakers for a 'uk' / 'us' / 'both' filter"""
+        if region_filter == 'uk':
+            return self.regions == 'UK'
+        if region_filter == 'us':
+            return self.regions == 'US'
+        return np.ones(len(self.bookmakers), dtype=bool)
+    
+    def summary(self, mask):
+        """
+        Per event and slot over the masked bookmakers: best price and its
+        bookmaker index (-1 if none), count, mean and standard deviation.
+        """
+        present = ~np.isnan(self.prices) & mask[None, :, None]
+        count = present.sum(axis=1)
+        quoted = count > 0
+        
+        filled = np.where(present, self.prices, -np.inf)
+        best = filled.max(axis=1) if filled.size else np.full(count.shape, -np.inf)
+        at_best = present & (filled == best[:, None, :])
+        best_bookmaker = np.where(at_best, self.seq, self.NO_QUOTE).argmin(axis=1) if filled.size else count - 1
+        
+        values = np.where(present, self.prices, 0.0)
+        mean = values.sum(axis=1) / np.maximum(count, 1)
+        variance = np.where(present, (self.prices - mean[:, None, :]) ** 2, 0.0).sum(axis=1) / np.maximum(count, 1)
+        return {
+            'mask': mask,
+            'count': count,
+            'best': np.where(quoted, best, np.nan),
+            'best_bookmaker': np.where(quoted, best_bookmaker, -1),
+            'mean': np.where(quoted, mean, np.nan),
+            'std': np.where(quoted, np.sqrt(variance), np.nan),
+            # Position of each line's first quote, for payload ordering
+            'first_seq': np.where(present, self.seq, self.NO_QUOTE).min(axis=1) if filled.size else count
+        }
+    
+    def best_quote(self, summary, e, s):
+        """{'odds', 'bookmaker', 'region'} for the best masked price, or None"""
+        if s is None or summary['count'][e, s] == 0:
+            return None
+        b = summary['best_bookmaker'][e, s]
+        return {'odds': float(summary['best'][e, s]), 'bookmaker': self.titles[b], 'region': self.regions[b]}
+    
+    def event_slots(self, summary, e, market):
+        """Quoted slots of one market for an event, in payload order"""
+        quoted = [s for s, slot in enumerate(self.slots) if slot[0] == market and summary['count'][e, s] > 0]
+        return sorted(quoted, key=lambda s: summary['first_seq'][e, s])
+    
+    def quotes(self, e, s, mask):
+        """[{'bookmaker': title, 'odds': price}] for the masked bookmakers, in payload order"""
+        present = np.nonzero(~np.isnan(self.prices[e, :, s]) & mask)[0]
+        order = present[np.argsort(self.seq[e, present, s], kind='stable')]
+        return [{'bookmaker': self.titles[b], 'odds': float(self.prices[e, b, s])} for b in order]
+    
+    def arbitrage(self, summary, lay_commission=0.0):
+        """
+        Implied-probability totals of the best prices for every complete
+        outcome set of every event, in one pass over the reductions.
+        
+        Back sets are the outcome groups (h2h, and totals / spreads per
+        line), padded to three legs. Back/lay sets pair each h2h side's best
+        back price B with its lowest lay price L (after `lay_commission` on
+        lay winnings), as total (L - c) / (B (1 - c)). Either way a total
+        below 1 is an arbitrage.
+        
+        Returns (sets, total_implied, lay_best, lay_bookmaker): sets is
+        [(market, point, slots)] with ('h2h_lay', None, [back, lay]) for
+        back/lay pairs, total_implied is events x sets (NaN where a leg is
+        missing), and lay_best / lay_bookmaker are the lowest masked lay
+        price and its bookmaker per event and slot.
+        """
+        # Lowest (best for the layer) masked lay price per event and slot
+        present = ~np.isnan(self.prices) & summary['mask'][None, :, None]
+        lay_filled = np.where(present, self.prices, np.inf)
+        lay_best = lay_filled.min(axis=1) if lay_filled.size else np.full(summary['best'].shape, np.inf)
+        lay_bookmaker = lay_filled.argmin(axis=1) if lay_filled.size else np.zeros(summary['best'].shape, dtype=int)
+        lay_best = np.where(np.isinf(lay_best), np.nan, lay_best)
+        
+        sets = list(self.groups)
+        totals = []
+        if self.groups:
+            legs = np.array([slots + [slots[0]] * (3 - len(slots)) for _, _, slots in self.groups])
+            used = np.array([[leg < len(slots) for leg in range(3)] for _, _, slots in self.groups])
+            best = summary['best'][:, legs]  # events x groups x 3
+            with np.errstate(divide='ignore', invalid='ignore'):
+                totals.append(np.where(used, 1.0 / best, 0.0).sum(axis=2))
+        
+        pairs = [(self._slot_index[('h2h', side, None)], self._slot_index[('h2h_lay', side, None)])
+                 for side in ('home', 'draw', 'away')
+                 if ('h2h', side, None) in self._slot_index and ('h2h_lay', side, None) in self._slot_index]
+        if pairs:
+            back = summary['best'][:, [b for b, _ in pairs]]
+            lay = lay_best[:, [l for _, l in pairs]]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                totals.append((lay - lay_commission) / (back * (1 - lay_commission)))
+            sets += [('h2h_lay', None, [b, l]) for b, l in pairs]
+        
+        total_implied = np.hstack(totals) if totals else np.empty((len(self.events), 0))
+        return sets, total_implied, lay_best, lay_bookmaker
+
+
+class OddsAnomalyEngine:
+    """
+    Robust bookmaker outliers for every outcome of every market.
+    
+    Each bookmaker's prices become margin-adjusted (fair) implied
+    probabilities over its own complete book for the outcome set - h2h,
+    h2h_lay, and totals and spreads per line - and are compared with the
+    median across the masked bookmakers, scaled by the median absolute
+    deviation, so one mispriced bookmaker can neither drag the consensus
+    nor hide behind it. An outcome's anomaly is its most favourable
+    outlier: a robust z of at least ODDS_ANOMALY_Z among at least
+    ODDS_ANOMALY_MIN_BOOKMAKERS bookmakers, at a price with positive
+    expected value against the consensus probability. Lay outcomes are
+    mirrored (a higher implied probability favours the layer).
+    
+    One NumPy pass per payload and region, kept until the payload changes;
+    the 'both' region is scanned as soon as the odds cache refreshes.
+    """
+    
+    MAD_SCALE = 1.4826  # MAD -> standard deviation for normally distributed prices
+    
+    def __init__(self, cache=None, z_threshold=ODDS_ANOMALY_Z, min_bookmakers=ODDS_ANOMALY_MIN_BOOKMAKERS,
+                 mad_floor=ODDS_ANOMALY_MAD_FLOOR):
+        self.z_threshold = z_threshold
+        self.min_bookmakers = min_bookmakers
+        self.mad_floor = mad_floor
+        self._lock = threading.Lock()
+        self._results = {}  # (league, region) -> (payload, result)
+        self.stats = {'scans': 0, 'hits': 0, 'last_scan_ms': None}
+        if cache is not None:
+            cache.add_listener(lambda league, data: self.get(league, data))
+    
+    @property
+    def version(self):
+        """Settings the results depend on, for stored value-bet versions"""
+        return f"{self.z_threshold}/{self.min_bookmakers}/{self.mad_floor}"
+    
+    def get(self, league, data, region='both'):
+        """Scan result for a league's payload (see scan)"""
+        with self._lock:
+            cached = self._results.get((league, region))
+            if cached is not None and cached[0] is data:
+                self.stats['hits'] += 1
+                return cached[1]
+        
+        started = time.monotonic()
+        tensor = OddsTensor.for_payload(league, data)
+        result = self.scan(tensor, tensor.region_mask(region))
+        with self._lock:
+            self._results[(league, region)] = (data, result)
+            self.stats['scans'] += 1
+            self.stats['last_scan_ms'] = round((time.monotonic() - started) * 1000, 1)
+        return result
+    
+    @staticmethod
+    def outcome_sets(tensor):
+        """The tensor's outcome groups plus the h2h lay book"""
+        sets = list(tensor.groups)
+        lay = [tensor.slot('h2h_lay', side) for side in ('home', 'draw', 'away')]
+        if None not in lay:
+            sets.append(('h2h_lay', None, lay))
+        return sets
+    
+    def scan(self, tensor, mask):
+        """
+        Per event and slot (events x slots arrays): consensus fair
+        probability, bookmakers priced, and the most favourable outlier's
+        bookmaker index, price, fair probability, robust z and edge, plus
+        the is_anomaly flag.
+        """
+        shape = (len(tensor.events), len(tensor.slots))
+        if not tensor.prices.size:
+            empty = np.zeros(shape)
+            return {'tensor': tensor, 'consensus': empty, 'count': empty.astype(int), 'outlier': empty.astype(int),
+                    'odds': empty, 'fair': empty, 'robust_z': empty, 'edge': empty, 'is_anomaly': empty.astype(bool)}
+        
+        present = ~np.isnan(tensor.prices) & (np.nan_to_num(tensor.prices) > 0) & mask[None, :, None]
+        inverse = np.where(present, 1.0 / np.where(present, tensor.prices, 1.0), 0.0)
+        
+        # Each bookmaker's overround for each outcome set it prices completely
+        sets = self.outcome_sets(tensor)
+        membership = np.zeros((len(tensor.slots), len(sets)))
+        for g, (_, _, slots) in enumerate(sets):
+            membership[slots, g] = 1
+        book = inverse @ membership
+        complete = (present @ membership) == membership.sum(axis=0)
+        
+        # Slots outside any outcome set keep their raw implied probability
+        in_set = membership.any(axis=1)
+        set_of = membership.argmax(axis=1)
+        slot_complete = complete[:, :, set_of] & in_set
+        usable = present & (slot_complete | ~in_set)
+        fair = np.where(usable, inverse / np.where(slot_complete, book[:, :, set_of], 1.0), np.nan)
+        
+        count = usable.sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN slices for unpriced slots
+            consensus = np.nanmedian(fair, axis=1)
+            mad = np.nanmedian(np.abs(fair - consensus[:, None, :]), axis=1)
+        scale = np.maximum(self.MAD_SCALE * np.nan_to_num(mad), self.mad_floor)
+        
+        direction = np.array([-1.0 if market == 'h2h_lay' else 1.0 for market, _, _ in tensor.slots])
+        z = np.where(usable, direction * (consensus[:, None, :] - fair) / scale[:, None, :], -np.inf)
+        
+        # Most favourable bookmaker per outcome, ties to the first in the payload
+        robust_z = z.max(axis=1)
+        at_best = usable & (z == robust_z[:, None, :])
+        outlier = np.where(at_best, tensor.seq, tensor.NO_QUOTE).argmin(axis=1)
+        odds = np.take_along_axis(tensor.prices, outlier[:, None, :], axis=1)[:, 0, :]
+        outlier_fair = np.take_along_axis(fair, outlier[:, None, :], axis=1)[:, 0, :]
+        edge = direction * (consensus * odds - 1)
+        
+        with np.errstate(invalid='ignore'):
+            is_anomaly = (count >= self.min_bookmakers) & (robust_z >= self.z_threshold) & (edge > 0)
+        return {'tensor': tensor, 'consensus': consensus, 'count': count, 'outlier': outlier, 'odds': odds,
+                'fair': outlier_fair, 'robust_z': robust_z, 'edge': edge, 'is_anomaly': is_anomaly}
+    
+    def record(self, result, e, s):
+        """The outcome's most favourable outlier as a dict, or None if unpriced"""
+        if result is None or s is None or result['count'][e, s] == 0:
+            return None
+        tensor = result['tensor']
+        b = result['outlier'][e, s]
+        consensus = float(result['consensus'][e, s])
+        return {
+            'bookmaker': tensor.titles[b],
+            'region': tensor.regions[b],
+            'odds': float(result['odds'][e, s]),
+            'fair_probability': round(float(result['fair'][e, s]), 4),
+            'consensus_probability': consensus,
+            'consensus_odds': round(1 / consensus, 2),
+            'robust_z': round(float(result['robust_z'][e, s]), 2),
+            'edge_percentage': round(float(result['edge'][e, s]) * 100, 1),
+            'bookmakers': int(result['count'][e, s]),
+            'is_anomaly': bool(result['is_anomaly'][e, s])
+        }
+    
+    def status(self):
+        with self._lock:
+            return dict(self.stats, z_threshold=self.z_threshold, min_bookmakers=self.min_bookmakers,
+                        anomalies={f"{league}:{region}": int(result['is_anomaly'].sum())
+                                   for (league, region), (_, result) in self._results.items()})
+
+
+ODDS_ANOMALIES = OddsAnomalyEngine(ODDS_CACHE)
+
+
+class PreparedOddsResponses:
+    """
+    /api/live-odds bodies built once per cache refresh.
+    
+    The formatted matches are serialized (and gzipped) the first time a
+    league's cached payload is served with a given fetched_at, and the bytes
+    are reused until the cache refreshes. The strong ETag is a digest of the
+    body, so a client polling with If-None-Match gets a 304 from a dict
+    lookup without the payload being read.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._league_locks = defaultdict(threading.Lock)
+        self._prepared = {}  # league -> dict(fetched_at, etag, body, gzip_body, ...)
+        self.stats = {'builds': 0, 'served': 0, 'not_modified': 0}
+    
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    @staticmethod
+    def build(odds_data, fetched_at=None, max_age=None):
+        """Serialize the formatted payload. Returns (etag, body bytes)."""
+        cache_info = {'is_cached': fetched_at is not None}
+        if fetched_at is not None:
+            cache_info.update({
+                'cached_at': fetched_at.isoformat(),
+                'refresh_interval_seconds': int(max_age),
+                'expires_at': (fetched_at + timedelta(seconds=max_age)).isoformat()
+            })
+        body = json.dumps({
+            'matches': format_odds_data(odds_data),
+            'last_updated': (fetched_at or datetime.utcnow()).isoformat(),
+            'cache': cache_info
+        }, separators=(',', ':')).encode('utf-8')
+        return hashlib.blake2b(body, digest_size=16).hexdigest(), body
+    
+    def get(self, league, entry, max_age):
+        """Prepared response for a cache entry ((data, fetched_at)), building it on first use"""
+        data, fetched_at = entry
+        prepared = self._prepared.get(league)
+        if prepared is not None and prepared['fetched_at'] == fetched_at:
+            return prepared
+        
+        with self._league_locks[league]:
+            prepared = self._prepared.get(league)
+            if prepared is not None and prepared['fetched_at'] == fetched_at:
+                return prepared
+            etag, body = self.build(data, fetched_at, max_age)
+            prepared = {
+                'fetched_at': fetched_at,
+                'etag': etag,
+                'gzip_etag': etag + '-gzip',
+                'body': body,
+                'gzip_body': gzip.compress(body, 6)
+            }
+            self._prepared[league] = prepared
+            self._count('builds')
+        return prepared
+    
+    def respond(self, prepared):
+        """Flask response for a prepared body, honouring If-None-Match and Accept-Encoding"""
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            etag, body = prepared['gzip_etag'], prepared['gzip_body']
+        else:
+            etag, body = prepared['etag'], prepared['body']
+        
+        if request.if_none_match.contains(prepared['etag']) or request.if_none_match.contains(prepared['gzip_etag']):
+            self._count('not_modified')
+            response = Response(status=304)
+        else:
+            self._count('served')
+            response = Response(body, mimetype='application/json')
+            if body is prepared['gzip_body']:
+                response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Age'] = str(max(0, int((datetime.utcnow() - prepared['fetched_at']).total_seconds())))
+        return response
+    
+    def status(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['leagues'] = {
+            league: {'fetched_at': p['fetched_at'].isoformat(), 'etag': p['etag'],
+                     'bytes': len(p['body']), 'gzip_bytes': len(p['gzip_body'])}
+            for league, p in list(self._prepared.items())
+        }
+        return stats
+
+
+LIVE_ODDS_RESPONSES = PreparedOddsResponses()
+
+
+class ArbitrageScanner:
+    """
+    Arbitrage and near-arbitrage opportunities across every event, market
+    (h2h, totals and spreads per line, h2h back/lay) and bookmaker of a
+    league's cached odds.
+    
+    One vectorized pass (OddsTensor.arbitrage) prices every outcome set at
+    its best bookmakers; every complete set becomes a record, with the
+    stake split that pays out the same whatever the result (the live odds
+    cards show the best prices of all of them). ARBITRAGE_NEAR_MARGIN is
+    only /api/arbitrage's default cut-off. Scans are kept per (league,
+    region) until the cache's fetched_at moves, so they are redone once
+    per odds refresh.
+    """
+    
+    def __init__(self, near_margin=ARBITRAGE_NEAR_MARGIN, stake=ARBITRAGE_STAKE, commission=EXCHANGE_COMMISSION):
+        self.near_margin = near_margin
+        self.stake = stake
+        self.commission = commission
+        self._lock = threading.Lock()
+        self._scans = {}  # (league, region) -> (fetched_at, opportunities)
+        self.stats = {'scans': 0, 'served': 0, 'last_scan_ms': None}
+    
+    def get(self, league, entry, region='both'):
+        """Opportunities for a cache entry ((data, fetched_at)), best margin first"""
+        data, fetched_at = entry
+        with self._lock:
+            cached = self._scans.get((league, region))
+            self.stats['served'] += 1
+        if cached is not None and cached[0] == fetched_at:
+            return cached[1]
+        
+        started = time.monotonic()
+        opportunities = self.scan(league, data, region)
+        with self._lock:
+            self._scans[(league, region)] = (fetched_at, opportunities)
+            self.stats['scans'] += 1
+            self.stats['last_scan_ms'] = round((time.monotonic() - started) * 1000, 1)
+        return opportunities
+    
+    def scan(self, league, data, region='both'):
+        tensor = OddsTensor.for_payload(league, data)
+        # Same split as the live odds columns (format_odds_data): unknown bookmakers count as UK
+        mask = tensor.regions != 'US' if region == 'uk' else tensor.region_mask(region)
+        summary = tensor.summary(mask)
+        sets, total_implied, lay_best, lay_bookmaker = tensor.arbitrage(summary, self.commission)
+        
+        with np.errstate(invalid='ignore'):
+            hits = np.argwhere(np.isfinite(total_implied) & (total_implied > 0))
+        opportunities = [self._record(league, tensor, summary, sets[g], e, float(total_implied[e, g]),
+                                      lay_best, lay_bookmaker)
+                         for e, g in hits]
+        opportunities.sort(key=lambda x: x['margin_percentage'], reverse=True)
+        return opportunities
+    
+    def _label(self, event, market, side, point):
+        if market == 'totals':
+            return f"{side.title()} {point}"
+        name = {'home': event['home_team'], 'away': event['away_team'], 'draw': 'Draw'}[side]
+        return f"{name} {point:+.1f}" if market == 'spreads' else name
+    
+    def _record(self, league, tensor, summary, outcome_set, e, total, lay_best, lay_bookmaker):
+        market, point, slots = outcome_set
+        event = tensor.events[e]
+        
+        if market == 'h2h_lay':
+            # Back stake S at B, lay S * B / (L - c) at L: the same profit either way
+            back_slot, lay_slot = slots
+            back = tensor.best_quote(summary, e, back_slot)
+            lay_odds = float(lay_best[e, lay_slot])
+            b = lay_bookmaker[e, lay_slot]
+            lay_stake = self.stake * back['odds'] / (lay_odds - self.commission)
+            side = tensor.slots[back_slot][1]
+            legs = [
+                dict(back, side=side, label=self._label(event, 'h2h', side, None), type='back',
+                     stake=round(self.stake, 2), payout=round(self.stake * back['odds'], 2)),
+                {'odds': lay_odds, 'bookmaker': tensor.titles[b], 'region': tensor.regions[b], 'side': side,
+                 'label': self._label(event, 'h2h', side, None), 'type': 'lay', 'stake': round(lay_stake, 2),
+                 'liability': round(lay_stake * (lay_odds - 1), 2)}
+            ]
+            profit = lay_stake * (1 - self.commission) - self.stake
+            staked = self.stake + lay_stake * (lay_odds - 1)
+        else:
+            # Dutching: stake each leg in proportion to its implied probability
+            legs = []
+            for s in slots:
+                quote = tensor.best_quote(summary, e, s)
+                side = tensor.slots[s][1]
+                leg_stake = self.stake / quote['odds'] / total
+                legs.append(dict(quote, side=side, label=self._label(event, market, side, tensor.slots[s][2]),
+                                 type='back', stake=round(leg_stake, 2), payout=round(leg_stake * quote['odds'], 2)))
+            profit = self.stake / total - self.stake
+            staked = self.stake
+        
+        return {
+            'league': league,
+            'event_id': event['id'] or odds_event_key(event),
+            'match': f"{event['home_team']} vs {event['away_team']}",
+            'home_team': event['home_team'],
+            'away_team': event['away_team'],
+            'commence_time': event['commence_time'],
+            'market': market,
+            'point': point,
+            'legs': legs,
+            'total_implied': round(total, 4),
+            'is_arbitrage': total < 1,
+            'margin_percentage': round((1 - total) * 100, 2),
+            'total_staked': round(staked, 2),
+            'guaranteed_profit': round(profit, 2)
+        }
+    
+    def status(self):
+        with self._lock:
+            return dict(self.stats, cached={f"{league}:{region}": fetched_at.isoformat()
+                                            for (league, region), (fetched_at, _) in self._scans.items()})
+
+
+ARBITRAGE_SCANNER = ArbitrageScanner()
+
+# Authentication decorator
+def require_auth(f):
+    """Decorator to require authentication"""
+    def decorated_function(*args, **kwargs):
+        if not session.get('authenticated'):
+            return redirect(url_for('login'))
+        return f(*args, **kwargs)
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+# Routes
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    """Login page"""
+    if request.method == 'POST':
+        password = request.form.get('password')
+        if password == APP_PASSWORD:
+            session['authenticated'] = True
+            return redirect(url_for('index'))
+        else:
+            return render_template('login.html', error='Incorrect password')
+    return render_template('login.html')
+
+@app.route('/logout')
+def logout():
+    """Logout"""
+    session.clear()
+    return redirect(url_for('login'))
+
+@app.route('/')
+@require_auth
+def index():
+    """Main page"""
+    return render_template('index.html')
+
+@app.route('/api/fixtures')
+def get_fixtures():
+    """Get upcoming fixtures"""
+    # In production, this would fetch from an API
+    # For now, return sample fixtures
+    fixtures = [
+        {
+            'id': 1,
+            'date': '2025-11-01',
+            'time': '15:00',
+            'home_team': 'Manchester City',
+            'away_team': 'Arsenal',
+            'venue': 'Etihad Stadium'
+        },
+        {
+            'id': 2,
+            'date': '2025-11-01',
+            'time': '15:00',
+            'home_team': 'Liverpool',
+            'away_team': 'Chelsea',
+            'venue': 'Anfield'
+        },
+        {
+            'id': 3,
+            'date': '2025-11-02',
+            'time': '16:30',
+            'home_team': 'Manchester United',
             'away_team': 'Tottenham',
             'venue': 'Old Trafford'
         },
@@ -2549,37 +5887,24 @@ def live_odds():
         league = request.args.get('league', 'soccer_epl')
         force_refresh = request.args.get('refresh', 'false').lower() == 'true'
         
-        # Force refresh if requested
-        if force_refresh and league in ODDS_CACHE:
-            del ODDS_CACHE[league]
+        # Force refresh if requested (falls back to the cached copy if the API fails)
+        if force_refresh:
             print(f"Force refresh requested for {league}")
-        
-        odds_data = fetch_league_odds(league)
+            odds_data = ODDS_CACHE.refresh(league, max_age=5)
+        else:
+            odds_data = fetch_league_odds(league)
         
         if odds_data is None:
             return jsonify({'error': 'Unable to fetch odds from API'}), 500
         
-        formatted_data = format_odds_data(odds_data)
-        
-        # Get cache info
-        cache_info = {}
-        if league in ODDS_CACHE:
-            cached_time = ODDS_CACHE[league][1]
-            age_seconds = (datetime.utcnow() - cached_time).total_seconds()
-            cache_info = {
-                'cached_at': cached_time.isoformat(),
-                'age_seconds': int(age_seconds),
-                'expires_in_seconds': max(0, int(ODDS_CACHE_EXPIRY - age_seconds)),
-                'is_cached': True
-            }
-        else:
-            cache_info = {'is_cached': False}
+        entry = ODDS_CACHE.get(league)
+        if entry is None:
+            # Not cached (the store failed) - serialize this payload directly
+            etag, body = PreparedOddsResponses.build(odds_data)
+            return Response(body, mimetype='application/json')
         
-        return jsonify({
-            'matches': formatted_data,
-            'last_updated': datetime.utcnow().isoformat(),
-            'cache': cache_info
-        })
+        prepared = LIVE_ODDS_RESPONSES.get(league, entry, ODDS_CACHE.max_age(league, entry))
+        return LIVE_ODDS_RESPONSES.respond(prepared)
         
     except Exception as e:
         print(f"Error in live_odds endpoint: {e}")
@@ -2591,418 +5916,1283 @@ def odds_cache_status():
     """Get the status of the odds cache"""
     current_time = datetime.utcnow()
     cache_status = {}
+    refresh_stats = ODDS_CACHE.refresh_stats()
     
     for league, (data, cached_time) in ODDS_CACHE.items():
         age_seconds = (current_time - cached_time).total_seconds()
+        max_age = ODDS_CACHE.max_age(league, (data, cached_time))
         cache_status[league] = {
             'matches_cached': len(data),
             'cached_at': cached_time.isoformat(),
             'age_seconds': int(age_seconds),
-            'expires_in_seconds': max(0, int(ODDS_CACHE_EXPIRY - age_seconds)),
-            'is_stale': age_seconds >= ODDS_CACHE_EXPIRY
+            'refresh_interval_seconds': int(max_age),
+            'expires_in_seconds': max(0, int(max_age - age_seconds)),
+            'is_stale': age_seconds >= max_age,
+            'refresh': refresh_stats.pop(league, None)
         }
     
+    # Leagues whose fetches have only failed so far
+    for league, stats in refresh_stats.items():
+        cache_status[league] = {'matches_cached': 0, 'refresh': stats}
+    
     return jsonify({
         'cache_expiry_seconds': ODDS_CACHE_EXPIRY,
         'leagues': cache_status,
+        'worker': ODDS_CACHE.status(),
+        'schedule': ODDS_SCHEDULER.status(),
+        'api_client': HTTP_CLIENT.status()['endpoints'].get('odds'),
+        'prepared_responses': LIVE_ODDS_RESPONSES.status(),
         'current_time': current_time.isoformat()
     })
 
-@app.route('/api/value-bets')
+@app.route('/api/fpl-cache-status')
+def fpl_cache_status():
+    """Get the status of the shared FPL bootstrap cache"""
+    return jsonify(dict(FPL_BOOTSTRAP_CACHE.status(), detail_fetcher=FPL_DETAIL_FETCHER.status(),
+                        api_client=HTTP_CLIENT.status()))
+
+@app.route('/api/value-bets-status')
 @require_auth
-def value_bets():
-    """Get value bets with EV calculations"""
-    try:
-        # Get filters from query params
-        region_filter = request.args.get('region', 'both')  # 'uk', 'us', or 'both'
-        ai_model = request.args.get('model', 'complex')  # 'simple', 'opponent', 'complex', 'anomaly', 'form_momentum', 'sentiment_external'
-        league = request.args.get('league', 'soccer_epl')  # Which league to analyze
+def value_bets_status():
+    """Stored value-bet results and the precompute pipeline's state"""
+    return jsonify(dict(VALUE_BET_PIPELINE.status(), explainer=dict(VALUE_BET_EXPLAINER.stats),
+                        pricing=PRICING_EXECUTOR.status(), anomalies=ODDS_ANOMALIES.status()))
+
+@app.route('/api/model-weights')
+def model_weights():
+    """Version and values of the ensemble weights currently in use"""
+    return jsonify(MODEL_WEIGHTS)
+
+@app.route('/api/fpl-history/<team_name>')
+@require_auth
+def fpl_history(team_name):
+    """Recorded FPL aggregates for a team over time"""
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    since = datetime.utcnow() - timedelta(days=days)
+    return jsonify({
+        'team': team_name,
+        'history': FPL_SNAPSHOT_STORE.team_history(team_name, since=since)
+    })
+
+@app.route('/api/odds-history/<event_id>')
+@require_auth
+def odds_history(event_id):
+    """Recorded price changes for one event, with CLV when a taken price is given"""
+    market = request.args.get('market')
+    outcome = request.args.get('outcome')
+    history = ODDS_HISTORY.series(event_id, market=market, outcome=outcome)
+    if history is None:
+        return jsonify({'error': 'Unknown event'}), 404
+    
+    price = request.args.get('price', type=float)
+    if price and market and outcome:
+        history['clv'] = ODDS_HISTORY.closing_line_value(
+            event_id, market, outcome, price, point=request.args.get('point', 0, type=float))
+    return jsonify(history)
+
+@app.route('/api/steam-moves')
+@require_auth
+def steam_moves():
+    """Coordinated price drops across bookmakers in the recorded odds history"""
+    hours = min(max(request.args.get('hours', 24, type=float), 1), 7 * 24)
+    window = min(max(request.args.get('window', 30, type=int), 1), 240)
+    return jsonify({
+        'moves': ODDS_HISTORY.steam_moves(
+            since=datetime.utcnow() - timedelta(hours=hours),
+            league=request.args.get('league'),
+            min_drop=request.args.get('min_drop', 0.05, type=float),
+            min_bookmakers=max(request.args.get('min_bookmakers', 3, type=int), 2),
+            window_minutes=window
+        ),
+        'history': ODDS_HISTORY.status()
+    })
+
+class ValueBetExplainer:
+    """
+    Explanations for value-bet rows, built on demand from their
+    explanation_key rather than for every priced row.
+    
+    Each pricing run leaves its analyzers (team stats, form features, FPL
+    components, ensemble fixture contexts) here per (league, model, region)
+    along with the odds payload it priced, so explaining a row reuses them
+    instead of re-running the models. Rows priced in another worker process
+    are explained from freshly built analyzers, once per batch.
+    """
+    
+    def __init__(self, max_contexts=64):
+        self.max_contexts = max_contexts
+        self._contexts = OrderedDict()  # (league, model, region) -> (odds_data, context)
+        self._lock = threading.Lock()
+        self.stats = {'explained': 0, 'context_hits': 0, 'context_misses': 0}
+    
+    @staticmethod
+    def make_key(league, model, region, event_id, market_type, market):
+        return '|'.join((league, model, region, event_id, market_type, market))
+    
+    @staticmethod
+    def parse_key(key):
+        """(league, model, region, event_id, market_type, market). Raises ValueError if malformed."""
+        parts = key.split('|')
+        if len(parts) < 6 or parts[-2] not in ('moneyline', 'goals', 'spreads'):
+            raise ValueError(f"Invalid explanation key: {key}")
+        # Fallback event keys contain '|' themselves
+        return parts[0], parts[1], parts[2], '|'.join(parts[3:-2]), parts[-2], parts[-1]
+    
+    def remember(self, league, model, region, odds_data, context):
+        with self._lock:
+            self._contexts[(league, model, region)] = (odds_data, context)
+            self._contexts.move_to_end((league, model, region))
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+    
+    def context(self, league, model, region, odds_data):
+        """The pricing run's analyzers for this payload, or new ones"""
+        with self._lock:
+            cached = self._contexts.get((league, model, region))
+        if cached is not None and cached[0] is odds_data:
+            self.stats['context_hits'] += 1
+            return cached[1]
+        
+        self.stats['context_misses'] += 1
+        context = dict(new_pricing_analyzers(model), form_features=None)
+        if context['form_analyzer']:
+            context['form_features'] = context['form_analyzer'].features_for_fixtures(odds_data)
+        self.remember(league, model, region, odds_data, context)
+        return context
+    
+    def explain(self, keys):
+        """
+        {key: explanation} for a batch of explanation keys. Keys whose
+        league has no cached odds, or whose fixture has since dropped out of
+        them, map to None.
+        """
+        groups = defaultdict(list)
+        for key in dict.fromkeys(keys):
+            league, model, region, event_id, market_type, market = self.parse_key(key)
+            groups[(league, model, region)].append((key, event_id, market_type, market))
+        
+        explanations = {}
+        for (league, model, region), rows in groups.items():
+            entry = ODDS_CACHE.get(league)
+            if entry is None:
+                explanations.update((row[0], None) for row in rows)
+                continue
+            odds_data = entry[0]
+            context = self.context(league, model, region, odds_data)
+            tensor = OddsTensor.for_payload(league, odds_data)
+            anomalies = ODDS_ANOMALIES.get(league, odds_data, region) if model in ('anomaly', 'overall') else None
+            event_index = {odds_event_key(match): i for i, match in enumerate(odds_data)}
+            
+            for key, event_id, market_type, market in rows:
+                match_index = event_index.get(event_id)
+                if match_index is None:
+                    explanations[key] = None
+                    continue
+                explanations[key] = self._explain_row(context, tensor, anomalies, model, odds_data[match_index],
+                                                      match_index, market_type, market)
+                self.stats['explained'] += 1
+        return explanations
+    
+    @staticmethod
+    def _slot(tensor, market_type, market):
+        """The odds tensor slot a value-bet row priced"""
+        if market_type == 'moneyline':
+            return tensor.slot('h2h', MONEYLINE_SIDES[market])
+        if market_type == 'spreads':
+            side, point = market.split(':')
+            return tensor.slot('spreads', side, float(point))
+        _, over_under, point = market.split('_')
+        return tensor.slot('totals', over_under, float(point))
+    
+    def _explain_row(self, context, tensor, anomalies, model, match, match_index, market_type, market):
+        home_team = match.get('home_team', '')
+        away_team = match.get('away_team', '')
+        anomaly_info = ODDS_ANOMALIES.record(anomalies, match_index, self._slot(tensor, market_type, market))
         
-        # Fetch live odds for selected league
-        odds_data = fetch_league_odds(league)
+        if model == 'anomaly':
+            if anomaly_info:
+                return (f"📊 {anomaly_info['bookmaker']}: {anomaly_info['odds']} | Consensus fair odds: "
+                        f"{anomaly_info['consensus_odds']} across {anomaly_info['bookmakers']} bookmakers "
+                        f"({anomaly_info['edge_percentage']:+.1f}% edge, {anomaly_info['robust_z']} robust deviations)")
+            return ""
         
-        if odds_data is None:
-            return jsonify({'error': 'Unable to fetch odds from API'}), 500
+        if market_type == 'spreads':
+            side, point = market.split(':')
+            team = home_team if side == 'home' else away_team
+            return f"Handicap betting: {team} with {float(point):+.1f} goal handicap"
         
-        # Initialize the appropriate analyzer(s)
-        analyzer = AdvancedBettingAnalyzer()
-        form_analyzer = None
-        sentiment_analyzer = None
-        combined_analyzer = None
-        
-        if ai_model == 'form_momentum':
-            form_analyzer = FormMomentumAnalyzer()
-        elif ai_model == 'sentiment_external':
-            sentiment_analyzer = SentimentExternalAnalyzer()
-        elif ai_model == 'overall':
-            combined_analyzer = CombinedAIAnalyzer()
-        
-        value_bets_list = []
-        
-        # Markets to analyze
-        moneyline_markets = ['home_win', 'draw', 'away_win']
-        goals_markets = [
-            'full_over_2.5', 'full_under_2.5', 'full_over_3.5', 'full_under_3.5',
-            '1h_over_0.5', '1h_under_0.5', '1h_over_1.5', '1h_under_1.5',
-            '2h_over_1.5', '2h_under_1.5'
-        ]
-        corners_markets = [
-            'full_over_9.5', 'full_under_9.5', 'full_over_10.5', 'full_under_10.5',
-            '1h_over_4.5', '1h_under_4.5', '1h_over_5.5', '1h_under_5.5',
-            '2h_over_5.5', '2h_under_5.5'
-        ]
+        home_stats = away_stats = None
+        if model in ('simple', 'opponent'):
+            analyzer = context['analyzer']
+            home_stats = analyzer.get_team_historical_stats(home_team, seasons=1)
+            away_stats = analyzer.get_team_historical_stats(away_team, seasons=1)
         
-        for match in odds_data:
-            home_team = match.get('home_team', '')
-            away_team = match.get('away_team', '')
-            commence_time = match.get('commence_time', '')
-            bookmakers = match.get('bookmakers', [])
-            
-            if not bookmakers:
-                continue
-            
-            # Filter bookmakers by region
-            filtered_bookmakers = []
-            uk_bookmakers_list = ['williamhill', 'skybet', 'paddypower', 'betfair', 'coral', 'ladbrokes', 'unibet']
-            us_bookmakers_list = ['fanduel', 'draftkings', 'betmgm', 'pointsbet', 'caesars', 'barstool']
-            
-            for bookmaker in bookmakers:
-                bm_key = bookmaker.get('key', '')
-                if region_filter == 'uk' and bm_key in uk_bookmakers_list:
-                    filtered_bookmakers.append(bookmaker)
-                elif region_filter == 'us' and bm_key in us_bookmakers_list:
-                    filtered_bookmakers.append(bookmaker)
-                elif region_filter == 'both':
-                    filtered_bookmakers.append(bookmaker)
-            
-            # Analyze Moneyline bets
-            h2h_odds = {}
-            for bookmaker in filtered_bookmakers:
-                bm_key = bookmaker.get('key', '')
-                bm_region = 'UK' if bm_key in uk_bookmakers_list else 'US' if bm_key in us_bookmakers_list else 'Other'
-                
-                for market in bookmaker.get('markets', []):
-                    if market.get('key') == 'h2h':
-                        for outcome in market.get('outcomes', []):
-                            team = outcome.get('name')
-                            price = outcome.get('price')
-                            
-                            if team == home_team:
-                                if 'home_win' not in h2h_odds or price > h2h_odds['home_win']['odds']:
-                                    h2h_odds['home_win'] = {'odds': price, 'bookmaker': bookmaker.get('title'), 'region': bm_region}
-                            elif team == away_team:
-                                if 'away_win' not in h2h_odds or price > h2h_odds['away_win']['odds']:
-                                    h2h_odds['away_win'] = {'odds': price, 'bookmaker': bookmaker.get('title'), 'region': bm_region}
-                            elif team == 'Draw':
-                                if 'draw' not in h2h_odds or price > h2h_odds['draw']['odds']:
-                                    h2h_odds['draw'] = {'odds': price, 'bookmaker': bookmaker.get('title'), 'region': bm_region}
-            
-            # Fetch team stats once per match (skip for anomaly model)
-            home_stats = None
-            away_stats = None
-            if ai_model not in ['anomaly', 'form_momentum', 'sentiment_external', 'overall']:
-                home_stats = analyzer.get_team_historical_stats(home_team, seasons=1)
-                away_stats = analyzer.get_team_historical_stats(away_team, seasons=1)
-            
-            # For anomaly model, collect all bookmaker odds for each market
-            if ai_model == 'anomaly':
-                # Collect all bookmaker odds for moneyline markets
-                moneyline_all_odds = {'home_win': [], 'draw': [], 'away_win': []}
-                for bookmaker in filtered_bookmakers:
-                    for market in bookmaker.get('markets', []):
-                        if market.get('key') == 'h2h':
-                            for outcome in market.get('outcomes', []):
-                                team = outcome.get('name')
-                                price = outcome.get('price')
-                                bm_data = {'bookmaker': bookmaker.get('title'), 'odds': price}
-                                
-                                if team == home_team:
-                                    moneyline_all_odds['home_win'].append(bm_data)
-                                elif team == away_team:
-                                    moneyline_all_odds['away_win'].append(bm_data)
-                                elif team == 'Draw':
-                                    moneyline_all_odds['draw'].append(bm_data)
-            
-            # Create value bets for moneyline
-            for market in moneyline_markets:
-                if market in h2h_odds:
-                    # Anomaly model uses different logic
-                    if ai_model == 'anomaly':
-                        anomaly_data = analyzer.detect_bookmaker_anomalies(moneyline_all_odds[market])
-                        if anomaly_data and anomaly_data['is_anomaly']:
-                            # Use average odds as "implied probability"
-                            ai_prob = analyzer.calculate_implied_probability(anomaly_data['average_odds'])
-                            best_odds = anomaly_data['best_odds']
-                            implied_prob = analyzer.calculate_implied_probability(best_odds)
-                            ev = analyzer.calculate_ev(ai_prob, best_odds)
-                        else:
-                            ai_prob = None
-                    elif ai_model == 'form_momentum':
-                        try:
-                            ai_prob = form_analyzer.calculate_probability(home_team, away_team, 'moneyline', market)
-                        except Exception as e:
-                            print(f"Error calculating form_momentum probability for {home_team} vs {away_team}: {e}")
-                            ai_prob = None
-                    elif ai_model == 'sentiment_external':
-                        try:
-                            ai_prob = sentiment_analyzer.calculate_probability(home_team, away_team, 'moneyline', market)
-                        except Exception as e:
-                            print(f"Error calculating sentiment probability for {home_team} vs {away_team}: {e}")
-                            ai_prob = None
-                    elif ai_model == 'overall':
-                        try:
-                            # Pass bookmaker odds for anomaly detection
-                            ai_prob = combined_analyzer.calculate_probability(
-                                home_team, away_team, 'moneyline', market, 
-                                moneyline_all_odds.get(market) if 'moneyline_all_odds' in dir() else None
-                            )
-                        except Exception as e:
-                            print(f"Error calculating overall probability for {home_team} vs {away_team}: {e}")
-                            ai_prob = None
-                    else:
-                        try:
-                            ai_prob = analyzer.calculate_ai_probability(home_team, away_team, 'moneyline', market, ai_model)
-                        except Exception as e:
-                            print(f"Error calculating moneyline probability for {home_team} vs {away_team}: {e}")
-                            ai_prob = None
-                    
-                    if ai_prob:
-                        # For anomaly model, we already calculated these
-                        if ai_model != 'anomaly':
-                            best_odds = h2h_odds[market]['odds']
-                            implied_prob = analyzer.calculate_implied_probability(best_odds)
-                            ev = analyzer.calculate_ev(ai_prob, best_odds)
-                        
-                        # Calculate historical probability
-                        hist_prob = 0
-                        if home_stats and away_stats:
-                            if market == 'home_win':
-                                hist_prob = home_stats['home']['wins'] / max(home_stats['home']['total'], 1)
-                            elif market == 'away_win':
-                                hist_prob = away_stats['away']['wins'] / max(away_stats['away']['total'], 1)
-                            else:  # draw
-                                home_draws = home_stats['home']['draws'] / max(home_stats['home']['total'], 1)
-                                away_draws = away_stats['away']['draws'] / max(away_stats['away']['total'], 1)
-                                hist_prob = (home_draws + away_draws) / 2
-                        
-                        # Include all bets (positive and negative EV)
-                        market_label = market.replace('_', ' ').title()
-                        if market == 'home_win':
-                            bet_description = f"{home_team} to Win"
-                        elif market == 'away_win':
-                            bet_description = f"{away_team} to Win"
-                        else:
-                            bet_description = "Draw"
-                        
-                        # Generate explanation using already-fetched stats
-                        explanation = ""
-                        if ai_model == 'anomaly':
-                            anomaly_info = analyzer.detect_bookmaker_anomalies(moneyline_all_odds[market])
-                            if anomaly_info:
-                                explanation = f"📊 {anomaly_info['best_bookmaker']}: {anomaly_info['best_odds']} | Market avg: {anomaly_info['average_odds']} ({anomaly_info['percentage_better']}% better than average)"
-                        elif ai_model == 'simple' and home_stats and away_stats:
-                            if market == 'home_win':
-                                explanation = f"{home_team} won {home_stats['home']['wins']} of {home_stats['home']['total']} home games this season ({round(home_stats['home']['wins']/max(home_stats['home']['total'],1)*100, 1)}%)"
-                            elif market == 'away_win':
-                                explanation = f"{away_team} won {away_stats['away']['wins']} of {away_stats['away']['total']} away games this season ({round(away_stats['away']['wins']/max(away_stats['away']['total'],1)*100, 1)}%)"
-                            else:
-                                home_draw_pct = round(home_stats['home']['draws']/max(home_stats['home']['total'],1)*100, 1)
-                                away_draw_pct = round(away_stats['away']['draws']/max(away_stats['away']['total'],1)*100, 1)
-                                explanation = f"{home_team} drew {home_draw_pct}% at home, {away_team} drew {away_draw_pct}% away this season"
-                        elif ai_model == 'opponent' and home_stats and away_stats:
-                            home_gd = (statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0) - (statistics.mean(home_stats['goals_conceded_home']) if home_stats['goals_conceded_home'] else 0)
-                            away_gd = (statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0) - (statistics.mean(away_stats['goals_conceded_away']) if away_stats['goals_conceded_away'] else 0)
-                            explanation = f"{home_team} avg goal diff: {round(home_gd, 2)} (home), {away_team}: {round(away_gd, 2)} (away). Adjusted for relative strength"
-                        elif ai_model == 'complex':
-                            explanation = f"Multi-factor model: home advantage +15%, weighted form (70% current/30% historical), team strength metrics"
-                        elif ai_model == 'form_momentum':
-                            try:
-                                explanation = form_analyzer.get_explanation(home_team, away_team, 'moneyline', market)
-                            except:
-                                explanation = "Form & Momentum model: ELO ratings, recent form (5 games), head-to-head, momentum trends"
-                        elif ai_model == 'sentiment_external':
-                            try:
-                                explanation = sentiment_analyzer.get_explanation(home_team, away_team, 'moneyline', market)
-                            except:
-                                explanation = "Sentiment model: FPL data, injury impact, transfer momentum, team strength index"
-                        elif ai_model == 'overall':
-                            try:
-                                explanation = combined_analyzer.get_explanation(home_team, away_team, 'moneyline', market)
-                            except:
-                                explanation = "🤖 Overall AI: Combined analysis from ELO, Form, Sentiment & Anomaly detection"
-                        
-                        value_bets_list.append({
-                            'match': f"{home_team} vs {away_team}",
-                            'home_team': home_team,
-                            'away_team': away_team,
-                            'commence_time': commence_time,
-                            'bet_type': 'Moneyline',
-                            'market': bet_description,
-                            'ai_probability': round(ai_prob * 100, 2),
-                            'implied_probability': round(implied_prob * 100, 2),
-                            'historical_probability': round(hist_prob * 100, 2),
-                            'ev': round(ev, 2),
-                            'best_odds': round(best_odds, 2),
-                            'bookmaker': h2h_odds[market]['bookmaker'],
-                            'region': h2h_odds[market]['region'],
-                            'explanation': explanation
-                        })
-            
-            # Analyze Goals over/under
-            totals_odds = {}
-            for bookmaker in filtered_bookmakers:
-                bm_key = bookmaker.get('key', '')
-                bm_region = 'UK' if bm_key in uk_bookmakers_list else 'US' if bm_key in us_bookmakers_list else 'Other'
-                
-                for market in bookmaker.get('markets', []):
-                    if market.get('key') == 'totals':
-                        for outcome in market.get('outcomes', []):
-                            over_under = outcome.get('name', '').lower()  # 'Over' or 'Under'
-                            point = outcome.get('point', 0)
-                            price = outcome.get('price')
-                            
-                            market_key = f"{over_under}_{point}"
-                            if market_key not in totals_odds or price > totals_odds[market_key]['odds']:
-                                totals_odds[market_key] = {'odds': price, 'bookmaker': bookmaker.get('title'), 'point': point, 'region': bm_region}
-            
-            # Create value bets for goals (using full match totals for now)
-            for market_key, odds_data in totals_odds.items():
-                over_under, point = market_key.split('_')
-                point = float(point)
-                
-                # Map to our market format
-                goals_market = f"full_{over_under}_{point}"
-                
+        if market_type == 'moneyline':
+            if model == 'simple' and home_stats and away_stats:
+                if market == 'home_win':
+                    return f"{home_team} won {home_stats['home']['wins']} of {home_stats['home']['total']} home games this season ({round(home_stats['home']['wins']/max(home_stats['home']['total'],1)*100, 1)}%)"
+                elif market == 'away_win':
+                    return f"{away_team} won {away_stats['away']['wins']} of {away_stats['away']['total']} away games this season ({round(away_stats['away']['wins']/max(away_stats['away']['total'],1)*100, 1)}%)"
+                home_draw_pct = round(home_stats['home']['draws']/max(home_stats['home']['total'],1)*100, 1)
+                away_draw_pct = round(away_stats['away']['draws']/max(away_stats['away']['total'],1)*100, 1)
+                return f"{home_team} drew {home_draw_pct}% at home, {away_team} drew {away_draw_pct}% away this season"
+            elif model == 'opponent' and home_stats and away_stats:
+                home_gd = (statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0) - (statistics.mean(home_stats['goals_conceded_home']) if home_stats['goals_conceded_home'] else 0)
+                away_gd = (statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0) - (statistics.mean(away_stats['goals_conceded_away']) if away_stats['goals_conceded_away'] else 0)
+                return f"{home_team} avg goal diff: {round(home_gd, 2)} (home), {away_team}: {round(away_gd, 2)} (away). Adjusted for relative strength"
+            elif model == 'complex':
+                return "Multi-factor model: home advantage +15%, weighted form (70% current/30% historical), team strength metrics"
+            elif model == 'form_momentum':
+                try:
+                    return context['form_analyzer'].explanation_from_features(context['form_features'], match_index)
+                except:
+                    return "Form & Momentum model: ELO ratings, recent form (5 games), head-to-head, momentum trends"
+            elif model == 'sentiment_external':
+                try:
+                    return context['sentiment_analyzer'].get_explanation(home_team, away_team, 'moneyline', market)
+                except:
+                    return "Sentiment model: FPL data, injury impact, transfer momentum, team strength index"
+            elif model == 'overall':
                 try:
-                    if ai_model == 'form_momentum':
-                        ai_prob = form_analyzer.calculate_probability(home_team, away_team, 'goals', goals_market)
-                    elif ai_model == 'sentiment_external':
-                        ai_prob = sentiment_analyzer.calculate_probability(home_team, away_team, 'goals', goals_market)
-                    elif ai_model == 'overall':
-                        ai_prob = combined_analyzer.calculate_probability(home_team, away_team, 'goals', goals_market)
+                    combined_analyzer = context['combined_analyzer']
+                    return combined_analyzer.explanation_from_evaluation(
+                        combined_analyzer.evaluate(home_team, away_team, 'moneyline', market, anomaly_info))
+                except:
+                    return "🤖 Overall AI: Combined analysis from ELO, Form, Sentiment & Anomaly detection"
+            return ""
+        
+        # Goals
+        if model == 'simple' and home_stats and away_stats:
+            home_avg = statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0
+            away_avg = statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0
+            return f"Historical avg: {home_team} scores {round(home_avg, 1)} at home, {away_team} scores {round(away_avg, 1)} away"
+        elif model == 'opponent' and home_stats and away_stats:
+            home_attack = statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0
+            away_attack = statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0
+            home_defense = statistics.mean(home_stats['goals_conceded_home']) if home_stats['goals_conceded_home'] else 0
+            away_defense = statistics.mean(away_stats['goals_conceded_away']) if away_stats['goals_conceded_away'] else 0
+            expected_total = ((home_attack + away_defense) / 2) + ((away_attack + home_defense) / 2)
+            return f"Expected goals: {round(expected_total, 2)} (based on attack vs defense matchup)"
+        elif model == 'complex':
+            return "Multi-factor model with form weighting, confidence adjustments, and historical patterns"
+        elif model == 'form_momentum':
+            try:
+                return context['form_analyzer'].explanation_from_features(context['form_features'], match_index)
+            except:
+                return "Form & Momentum: Goals prediction based on recent scoring trends, momentum, and matchup history"
+        elif model == 'sentiment_external':
+            try:
+                return context['sentiment_analyzer'].get_explanation(home_team, away_team, 'goals', market)
+            except:
+                return "Sentiment model: Goals prediction using FPL data, injury impact, and team strength metrics"
+        elif model == 'overall':
+            try:
+                combined_analyzer = context['combined_analyzer']
+                return combined_analyzer.explanation_from_evaluation(
+                    combined_analyzer.evaluate(home_team, away_team, 'goals', market, anomaly_info))
+            except:
+                return "🤖 Overall AI: Combined goals analysis from multiple models"
+        return ""
+
+
+VALUE_BET_EXPLAINER = ValueBetExplainer()
+
+
+def new_pricing_analyzers(ai_model):
+    """The analyzer(s) price_league_value_bets needs for a model"""
+    return {
+        'analyzer': AdvancedBettingAnalyzer(),
+        'form_analyzer': FormMomentumAnalyzer() if ai_model == 'form_momentum' else None,
+        'sentiment_analyzer': SentimentExternalAnalyzer() if ai_model == 'sentiment_external' else None,
+        'combined_analyzer': CombinedAIAnalyzer() if ai_model == 'overall' else None
+    }
+
+
+def price_league_value_bets(league, odds_data, ai_model='complex', region_filter='both', only=None, analyzers=None):
+    """
+    Price every fixture and market of one league's odds payload with the
+    chosen model. Returns the value bets, highest EV first. `only`
+    ({event key: {'h2h', 'totals', 'spreads'}}) restricts pricing to those
+    fixtures and markets; `analyzers` (see new_pricing_analyzers) reuses
+    warm analyzers instead of creating new ones.
+    """
+    # Every price lookup below is a reduction over the parsed odds tensor
+    tensor = OddsTensor.for_payload(league, odds_data)
+    odds_summary = tensor.summary(tensor.region_mask(region_filter))
+    # Robust bookmaker outliers for every outcome, scanned once per payload
+    anomalies = ODDS_ANOMALIES.get(league, odds_data, region_filter) if ai_model in ('anomaly', 'overall') else None
+    
+    # Initialize the appropriate analyzer(s)
+    analyzers = analyzers or new_pricing_analyzers(ai_model)
+    analyzer = analyzers['analyzer']
+    form_analyzer = analyzers['form_analyzer']
+    sentiment_analyzer = analyzers['sentiment_analyzer']
+    combined_analyzer = analyzers['combined_analyzer']
+    
+    form_features = None
+    if form_analyzer:
+        # Compute ELO/form/H2H/momentum for every fixture in one batch
+        form_features = form_analyzer.features_for_fixtures(odds_data)
+    
+    # Fetch per-player FPL details for the whole slate concurrently up front
+    slate_sentiment = sentiment_analyzer or (combined_analyzer.sentiment_analyzer if combined_analyzer else None)
+    if slate_sentiment:
+        slate_teams = {m.get(side) for m in odds_data for side in ('home_team', 'away_team')}
+        slate_sentiment.prefetch_player_details([t for t in slate_teams if t])
+    
+    value_bets_list = []
+    
+    # Markets to analyze
+    moneyline_markets = ['home_win', 'draw', 'away_win']
+    goals_markets = [
+        'full_over_2.5', 'full_under_2.5', 'full_over_3.5', 'full_under_3.5',
+        '1h_over_0.5', '1h_under_0.5', '1h_over_1.5', '1h_under_1.5',
+        '2h_over_1.5', '2h_under_1.5'
+    ]
+    corners_markets = [
+        'full_over_9.5', 'full_under_9.5', 'full_over_10.5', 'full_under_10.5',
+        '1h_over_4.5', '1h_under_4.5', '1h_over_5.5', '1h_under_5.5',
+        '2h_over_5.5', '2h_under_5.5'
+    ]
+    
+    for match_index, match in enumerate(odds_data):
+        home_team = match.get('home_team', '')
+        away_team = match.get('away_team', '')
+        commence_time = match.get('commence_time', '')
+        bookmakers = match.get('bookmakers', [])
+        event_id = odds_event_key(match)
+        
+        if not bookmakers:
+            continue
+        priced_markets = ('h2h', 'totals', 'spreads') if only is None else only.get(event_id)
+        if not priced_markets:
+            continue
+        
+        # Best moneyline prices for the selected region
+        h2h_odds = {}
+        for market, side in MONEYLINE_SIDES.items() if 'h2h' in priced_markets else ():
+            quote = tensor.best_quote(odds_summary, match_index, tensor.slot('h2h', side))
+            if quote is not None:
+                h2h_odds[market] = quote
+        
+        # Fetch team stats once per match (skip for anomaly model)
+        home_stats = None
+        away_stats = None
+        if ai_model not in ['anomaly', 'form_momentum', 'sentiment_external', 'overall']:
+            home_stats = analyzer.get_team_historical_stats(home_team, seasons=1)
+            away_stats = analyzer.get_team_historical_stats(away_team, seasons=1)
+        
+        # Create value bets for moneyline
+        for market in moneyline_markets:
+            if market in h2h_odds:
+                quote = h2h_odds[market]
+                anomaly_data = ODDS_ANOMALIES.record(anomalies, match_index, tensor.slot('h2h', MONEYLINE_SIDES[market]))
+                # Anomaly model uses different logic
+                if ai_model == 'anomaly':
+                    if anomaly_data and anomaly_data['is_anomaly']:
+                        # Consensus fair probability, priced at the outlying bookmaker
+                        ai_prob = anomaly_data['consensus_probability']
+                        quote = anomaly_data
                     else:
-                        ai_prob = analyzer.calculate_ai_probability(home_team, away_team, 'goals', goals_market, ai_model)
-                except Exception as e:
-                    print(f"Error calculating goals probability for {home_team} vs {away_team}: {e}")
-                    ai_prob = None
+                        ai_prob = None
+                elif ai_model == 'form_momentum':
+                    try:
+                        ai_prob = form_analyzer.probability_from_features(form_features, match_index, 'moneyline', market)
+                    except Exception as e:
+                        print(f"Error calculating form_momentum probability for {home_team} vs {away_team}: {e}")
+                        ai_prob = None
+                elif ai_model == 'sentiment_external':
+                    try:
+                        ai_prob = sentiment_analyzer.calculate_probability(home_team, away_team, 'moneyline', market)
+                    except Exception as e:
+                        print(f"Error calculating sentiment probability for {home_team} vs {away_team}: {e}")
+                        ai_prob = None
+                elif ai_model == 'overall':
+                    try:
+                        # One ensemble pass gives the probability and the explanation inputs
+                        evaluation = combined_analyzer.evaluate(home_team, away_team, 'moneyline', market, anomaly_data)
+                        ai_prob = evaluation['probability']
+                    except Exception as e:
+                        print(f"Error calculating overall probability for {home_team} vs {away_team}: {e}")
+                        ai_prob = None
+                else:
+                    try:
+                        ai_prob = analyzer.calculate_ai_probability(home_team, away_team, 'moneyline', market, ai_model)
+                    except Exception as e:
+                        print(f"Error calculating moneyline probability for {home_team} vs {away_team}: {e}")
+                        ai_prob = None
                 
                 if ai_prob:
-                    best_odds = odds_data['odds']
+                    best_odds = quote['odds']
                     implied_prob = analyzer.calculate_implied_probability(best_odds)
                     ev = analyzer.calculate_ev(ai_prob, best_odds)
                     
-                    # Include all bets (positive and negative EV)
-                    bet_description = f"{'Over' if over_under == 'over' else 'Under'} {point} Goals"
+                    # Calculate historical probability
+                    hist_prob = 0
+                    if home_stats and away_stats:
+                        if market == 'home_win':
+                            hist_prob = home_stats['home']['wins'] / max(home_stats['home']['total'], 1)
+                        elif market == 'away_win':
+                            hist_prob = away_stats['away']['wins'] / max(away_stats['away']['total'], 1)
+                        else:  # draw
+                            home_draws = home_stats['home']['draws'] / max(home_stats['home']['total'], 1)
+                            away_draws = away_stats['away']['draws'] / max(away_stats['away']['total'], 1)
+                            hist_prob = (home_draws + away_draws) / 2
                     
-                    # Generate explanation inline to avoid extra DB queries
-                    explanation = ""
-                    if ai_model == 'simple' and home_stats and away_stats:
-                        home_avg = statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0
-                        away_avg = statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0
-                        explanation = f"Historical avg: {home_team} scores {round(home_avg, 1)} at home, {away_team} scores {round(away_avg, 1)} away"
-                    elif ai_model == 'opponent' and home_stats and away_stats:
-                        home_attack = statistics.mean(home_stats['goals_scored_home']) if home_stats['goals_scored_home'] else 0
-                        away_attack = statistics.mean(away_stats['goals_scored_away']) if away_stats['goals_scored_away'] else 0
-                        home_defense = statistics.mean(home_stats['goals_conceded_home']) if home_stats['goals_conceded_home'] else 0
-                        away_defense = statistics.mean(away_stats['goals_conceded_away']) if away_stats['goals_conceded_away'] else 0
-                        expected_total = ((home_attack + away_defense) / 2) + ((away_attack + home_defense) / 2)
-                        explanation = f"Expected goals: {round(expected_total, 2)} (based on attack vs defense matchup)"
-                    elif ai_model == 'complex':
-                        explanation = f"Multi-factor model with form weighting, confidence adjustments, and historical patterns"
-                    elif ai_model == 'form_momentum':
-                        try:
-                            explanation = form_analyzer.get_explanation(home_team, away_team, 'goals', goals_market)
-                        except:
-                            explanation = "Form & Momentum: Goals prediction based on recent scoring trends, momentum, and matchup history"
-                    elif ai_model == 'sentiment_external':
-                        try:
-                            explanation = sentiment_analyzer.get_explanation(home_team, away_team, 'goals', goals_market)
-                        except:
-                            explanation = "Sentiment model: Goals prediction using FPL data, injury impact, and team strength metrics"
-                    elif ai_model == 'overall':
-                        try:
-                            explanation = combined_analyzer.get_explanation(home_team, away_team, 'goals', goals_market)
-                        except:
-                            explanation = "🤖 Overall AI: Combined goals analysis from multiple models"
+                    # Include all bets (positive and negative EV)
+                    market_label = market.replace('_', ' ').title()
+                    if market == 'home_win':
+                        bet_description = f"{home_team} to Win"
+                    elif market == 'away_win':
+                        bet_description = f"{away_team} to Win"
+                    else:
+                        bet_description = "Draw"
                     
                     value_bets_list.append({
+                        'league': league,
+                        'event_id': event_id,
                         'match': f"{home_team} vs {away_team}",
                         'home_team': home_team,
                         'away_team': away_team,
                         'commence_time': commence_time,
-                        'bet_type': 'Goals',
+                        'bet_type': 'Moneyline',
                         'market': bet_description,
                         'ai_probability': round(ai_prob * 100, 2),
                         'implied_probability': round(implied_prob * 100, 2),
-                        'historical_probability': round(ai_prob * 100, 2),  # Using AI prob as proxy
+                        'historical_probability': round(hist_prob * 100, 2),
                         'ev': round(ev, 2),
                         'best_odds': round(best_odds, 2),
-                        'bookmaker': odds_data['bookmaker'],
-                        'region': odds_data['region'],
-                        'explanation': explanation
+                        'bookmaker': quote['bookmaker'],
+                        'region': quote['region'],
+                        'is_anomaly': bool(anomaly_data and anomaly_data['is_anomaly']),
+                        'explanation_key': ValueBetExplainer.make_key(league, ai_model, region_filter, event_id, 'moneyline', market)
                     })
+                    if ai_model == 'overall':
+                        value_bets_list[-1]['models_used'] = evaluation['models_used']
         
-            # Analyze Spreads (Handicaps)
-            spreads_odds = {}
-            for bookmaker in filtered_bookmakers:
-                bm_key = bookmaker.get('key', '')
-                bm_region = 'UK' if bm_key in uk_bookmakers_list else 'US' if bm_key in us_bookmakers_list else 'Other'
-                
-                for market in bookmaker.get('markets', []):
-                    if market.get('key') == 'spreads':
-                        for outcome in market.get('outcomes', []):
-                            team = outcome.get('name', '')
-                            point = outcome.get('point', 0)
-                            price = outcome.get('price', 0)
-                            
-                            market_key = f"{team}_{point}"
-                            if market_key not in spreads_odds or price > spreads_odds[market_key]['odds']:
-                                spreads_odds[market_key] = {
-                                    'odds': price,
-                                    'bookmaker': bookmaker.get('title'),
-                                    'point': point,
-                                    'team': team,
-                                    'region': bm_region
-                                }
-            
-            # Create value bets for spreads (simplified - no AI model for spreads yet)
-            for market_key, odds_data in spreads_odds.items():
-                team = odds_data['team']
-                point = odds_data['point']
-                
-                # Use 50% probability as baseline for spreads (neutral)
-                ai_prob = 0.5
-                best_odds = odds_data['odds']
+        # Analyze Goals over/under (using full match totals for now)
+        for s in tensor.event_slots(odds_summary, match_index, 'totals') if 'totals' in priced_markets else ():
+            _, over_under, point = tensor.slots[s]
+            line = tensor.best_quote(odds_summary, match_index, s)
+            
+            # Map to our market format
+            goals_market = f"full_{over_under}_{point}"
+            anomaly_data = ODDS_ANOMALIES.record(anomalies, match_index, s)
+            
+            try:
+                if ai_model == 'anomaly':
+                    ai_prob = None
+                    if anomaly_data and anomaly_data['is_anomaly']:
+                        ai_prob = anomaly_data['consensus_probability']
+                        line = anomaly_data
+                elif ai_model == 'form_momentum':
+                    ai_prob = form_analyzer.probability_from_features(form_features, match_index, 'goals', goals_market)
+                elif ai_model == 'sentiment_external':
+                    ai_prob = sentiment_analyzer.calculate_probability(home_team, away_team, 'goals', goals_market)
+                elif ai_model == 'overall':
+                    evaluation = combined_analyzer.evaluate(home_team, away_team, 'goals', goals_market, anomaly_data)
+                    ai_prob = evaluation['probability']
+                else:
+                    ai_prob = analyzer.calculate_ai_probability(home_team, away_team, 'goals', goals_market, ai_model)
+            except Exception as e:
+                print(f"Error calculating goals probability for {home_team} vs {away_team}: {e}")
+                ai_prob = None
+            
+            if ai_prob:
+                best_odds = line['odds']
                 implied_prob = analyzer.calculate_implied_probability(best_odds)
                 ev = analyzer.calculate_ev(ai_prob, best_odds)
                 
-                bet_description = f"{team} {point:+.1f}"
+                # Include all bets (positive and negative EV)
+                bet_description = f"{'Over' if over_under == 'over' else 'Under'} {point} Goals"
                 
                 value_bets_list.append({
+                    'league': league,
+                    'event_id': event_id,
                     'match': f"{home_team} vs {away_team}",
                     'home_team': home_team,
                     'away_team': away_team,
                     'commence_time': commence_time,
-                    'bet_type': 'Spreads',
+                    'bet_type': 'Goals',
                     'market': bet_description,
                     'ai_probability': round(ai_prob * 100, 2),
                     'implied_probability': round(implied_prob * 100, 2),
-                    'historical_probability': 50.0,
+                    'historical_probability': round(ai_prob * 100, 2),  # Using AI prob as proxy
                     'ev': round(ev, 2),
                     'best_odds': round(best_odds, 2),
-                    'bookmaker': odds_data['bookmaker'],
-                    'region': odds_data['region'],
-                    'explanation': f"Handicap betting: {team} with {point:+.1f} goal handicap"
+                    'bookmaker': line['bookmaker'],
+                    'region': line['region'],
+                    'is_anomaly': bool(anomaly_data and anomaly_data['is_anomaly']),
+                    'explanation_key': ValueBetExplainer.make_key(league, ai_model, region_filter, event_id, 'goals', goals_market)
                 })
+                if ai_model == 'overall':
+                    value_bets_list[-1]['models_used'] = evaluation['models_used']
+    
+        # Analyze Spreads (Handicaps) - simplified, no AI model for spreads yet
+        for s in tensor.event_slots(odds_summary, match_index, 'spreads') if 'spreads' in priced_markets else ():
+            _, side, point = tensor.slots[s]
+            team = home_team if side == 'home' else away_team
+            line = tensor.best_quote(odds_summary, match_index, s)
+            
+            # Use 50% probability as baseline for spreads (neutral)
+            ai_prob = 0.5
+            if ai_model == 'anomaly':
+                anomaly_data = ODDS_ANOMALIES.record(anomalies, match_index, s)
+                if not anomaly_data or not anomaly_data['is_anomaly']:
+                    continue
+                ai_prob = anomaly_data['consensus_probability']
+                line = anomaly_data
+            best_odds = line['odds']
+            implied_prob = analyzer.calculate_implied_probability(best_odds)
+            ev = analyzer.calculate_ev(ai_prob, best_odds)
+            
+            bet_description = f"{team} {point:+.1f}"
+            
+            value_bets_list.append({
+                'league': league,
+                'event_id': event_id,
+                'match': f"{home_team} vs {away_team}",
+                'home_team': home_team,
+                'away_team': away_team,
+                'commence_time': commence_time,
+                'bet_type': 'Spreads',
+                'market': bet_description,
+                'ai_probability': round(ai_prob * 100, 2),
+                'implied_probability': round(implied_prob * 100, 2),
+                'historical_probability': round(ai_prob * 100, 2),
+                'ev': round(ev, 2),
+                'best_odds': round(best_odds, 2),
+                'bookmaker': line['bookmaker'],
+                'region': line['region'],
+                'is_anomaly': ai_model == 'anomaly',  # Only the anomaly model prices spreads from an outlier
+                'explanation_key': ValueBetExplainer.make_key(league, ai_model, region_filter, event_id, 'spreads', f"{side}:{point}")
+            })
+    
+    # Explanations are built on demand (/api/value-bets/explain) from what this run computed
+    VALUE_BET_EXPLAINER.remember(league, ai_model, region_filter, odds_data, {
+        'analyzer': analyzer, 'form_analyzer': form_analyzer, 'form_features': form_features,
+        'sentiment_analyzer': sentiment_analyzer, 'combined_analyzer': combined_analyzer
+    })
+    
+    # Sort by EV (highest first)
+    value_bets_list.sort(key=value_bet_order)
+    return value_bets_list
+
+
+# Per pricing worker process: model -> (generation, analyzers), kept warm
+# (with their caches) between tasks until the model's inputs change
+_PRICING_WORKER_ANALYZERS = {}
+
+
+def _init_pricing_worker():
+    """PricingExecutor worker initializer: weights are refit by the parent only"""
+    global MODEL_WEIGHTS_AUTO_REFIT
+    MODEL_WEIGHTS_AUTO_REFIT = False
+
+
+def _price_fixture_chunk(league, fixtures, ai_model, region_filter, generation, weights_version,
+                         fpl_components=None):
+    """
+    PricingExecutor task: price a contiguous chunk of one league's fixtures.
+    `fpl_components` (SentimentExternalAnalyzer.slate_components from the
+    parent) stands in for FPL data, which workers never fetch.
+    """
+    if MODEL_WEIGHTS.get('version') != weights_version:
+        # The parent has refit the weights since this process started
+        reload_model_weights()
+    if generation is None:
+        analyzers = new_pricing_analyzers(ai_model)
+    else:
+        warm = _PRICING_WORKER_ANALYZERS.get(ai_model)
+        if warm is None or warm[0] != generation:
+            warm = _PRICING_WORKER_ANALYZERS[ai_model] = (generation, new_pricing_analyzers(ai_model))
+        analyzers = warm[1]
+    if fpl_components is not None:
+        sentiment = analyzers['sentiment_analyzer'] or analyzers['combined_analyzer'].sentiment_analyzer
+        sentiment.preload_components(fpl_components)
+    return price_league_value_bets(league, fixtures, ai_model, region_filter, analyzers=analyzers)
+
+
+class PricingExecutor:
+    """
+    Prices a league's fixtures across a process pool.
+    
+    Fixtures are split into contiguous chunks, priced in worker processes
+    that keep their analyzers warm between tasks, and sorted with the same
+    key as serial pricing (value_bet_order), so the result is identical. Small slates, models outside PRICING_PROCESS_MODELS
+    and restricted (incremental) repricing stay in the calling thread, as
+    does everything when this process's share of PRICING_PROCESSES is 0.
+    `generation` identifies the model inputs (see
+    ValueBetPipeline.model_inputs); workers drop their warm analyzers when
+    it changes, and don't keep any without one.
+    
+    For the FPL models the parent computes every slate team's FPL
+    components once and sends them with each chunk, so workers price
+    offline from the same data serial pricing would use.
+    """
+    
+    FPL_MODELS = ('sentiment_external', 'overall')
+    
+    def __init__(self, processes=PRICING_PROCESSES, min_fixtures=PRICING_PROCESS_MIN_FIXTURES,
+                 models=PRICING_PROCESS_MODELS, start_method=PRICING_START_METHOD, web_workers=WEB_CONCURRENCY):
+        # `processes` is the host's budget, split between the web workers
+        self.host_processes = processes
+        self.processes = processes // max(1, web_workers)
+        self.min_fixtures = min_fixtures
+        self.models = list(models)
+        self.start_method = start_method
+        self._pool = None
+        self._lock = threading.Lock()
+        self.stats = {'parallel': 0, 'serial': 0, 'chunks': 0, 'failures': 0, 'last_parallel_ms': None}
+    
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context(self.start_method),
+                                                 initializer=_init_pricing_worker)
+            return self._pool
+    
+    def shutdown(self):
+        """Stop the worker processes (a later parallel price starts new ones)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def chunks(self, fixtures):
+        """Contiguous chunks, about two per process so a slow chunk doesn't idle the rest"""
+        size = max(self.min_fixtures // 2, math.ceil(len(fixtures) / (self.processes * 2)), 1)
+        return [fixtures[i:i + size] for i in range(0, len(fixtures), size)]
+    
+    @staticmethod
+    def fpl_components(odds_data):
+        """FPL components of every team in the slate, computed here for the workers"""
+        teams = list(dict.fromkeys(m.get(side) for m in odds_data for side in ('home_team', 'away_team') if m.get(side)))
+        sentiment = SentimentExternalAnalyzer()
+        sentiment.prefetch_player_details(teams)
+        return sentiment.slate_components(teams)
+    
+    def price(self, league, odds_data, ai_model='complex', region_filter='both', only=None, generation=None):
+        """Same result as price_league_value_bets(league, odds_data, ai_model, region_filter, only)"""
+        if (only is not None or not self.processes or ai_model not in self.models
+                or len(odds_data) < self.min_fixtures):
+            with self._lock:
+                self.stats['serial'] += 1
+            return price_league_value_bets(league, odds_data, ai_model, region_filter, only=only)
+        
+        started = time.monotonic()
+        chunks = self.chunks(odds_data)
+        fpl_components = self.fpl_components(odds_data) if ai_model in self.FPL_MODELS else None
+        try:
+            pool = self._get_pool()
+            futures = [pool.submit(_price_fixture_chunk, league, chunk, ai_model, region_filter, generation,
+                                   MODEL_WEIGHTS.get('version'), fpl_components)
+                       for chunk in chunks]
+            value_bets_list = [bet for future in futures for bet in future.result()]
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed): start a fresh pool next time, price this one here
+            print(f"Pricing pool failed for {league}: {e}")
+            self.shutdown()
+            with self._lock:
+                self.stats['failures'] += 1
+            return price_league_value_bets(league, odds_data, ai_model, region_filter)
+        
+        value_bets_list.sort(key=value_bet_order)
+        with self._lock:
+            self.stats['parallel'] += 1
+            self.stats['chunks'] += len(chunks)
+            self.stats['last_parallel_ms'] = int((time.monotonic() - started) * 1000)
+        return value_bets_list
+    
+    def status(self):
+        with self._lock:
+            return dict(self.stats, processes=self.processes, host_processes=self.host_processes,
+                        min_fixtures=self.min_fixtures, models=self.models, pool_started=self._pool is not None)
+
+
+PRICING_EXECUTOR = PricingExecutor()
+
+
+class ValueBetPipeline:
+    """
+    Precomputed /api/value-bets results for every (league, model, region).
+    
+    Results are stored in value_bet_results with a version stamp of their
+    inputs: the odds payload's fetched_at, the match table (row count and
+    latest date), the model weights version and, for FPL-driven models, the
+    FPL snapshot time. A background thread recomputes a league whenever this
+    process stores freshly fetched odds for it, and every
+    VALUE_BET_CHECK_INTERVAL seconds re-checks the other inputs (reloading
+    the weights file if a refit in another worker replaced it). Requests
+    are served from the table; results whose inputs have since changed are
+    served marked stale while the league is recomputed. One worker
+    recomputes a league at a time (value_bet_leases).
+    
+    When only the odds moved, the new payload is diffed per (event, market,
+    bookmaker) against the one the stored results were priced from
+    (value_bet_snapshots) and only the affected rows are repriced.
+    """
+    
+    REGIONS = ('both', 'uk', 'us')
+    ROW_FORMAT = 3  # Bumped when the shape of a stored row changes, so old results are recomputed
+    BET_TYPE_MARKETS = {'Moneyline': 'h2h', 'Goals': 'totals', 'Spreads': 'spreads'}
+    FPL_MODELS = ('sentiment_external', 'overall')
+    WEIGHTED_MODELS = ('complex', 'form_momentum', 'overall')
+    ANOMALY_MODELS = ('anomaly', 'overall')
+    
+    def __init__(self, cache, models=VALUE_BET_MODELS, enabled=VALUE_BET_PRECOMPUTE,
+                 check_interval=VALUE_BET_CHECK_INTERVAL, lease_seconds=300):
+        self.cache = cache
+        self.models = list(models)
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._pending = []  # leagues waiting for a recompute, in order
+        self._cond = threading.Condition()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._matches_stamp = (0, None)  # (read_at, stamp)
+        self._weights_checked_at = time.time()
+        self.stats = {'served': 0, 'stale_served': 0, 'computed_on_request': 0, 'recomputes': 0,
+                      'failures': 0, 'last_recompute_ms': None, 'rows_repriced': 0, 'rows_reused': 0,
+                      'rows_dropped': 0, 'combinations_incremental': 0, 'combinations_full': 0}
+        self.last_refresh = {}  # league -> what its latest recompute touched
+        if enabled:
+            cache.add_listener(lambda league, data: self.enqueue(league))
+    
+    def _count(self, stat, value=1):
+        with self._lock:
+            self.stats[stat] += value
+    
+    def matches_stamp(self):
+        """Changes whenever matches are imported (re-read at most every 30 seconds)"""
+        read_at, stamp = self._matches_stamp
+        if stamp is None or time.time() - read_at > 30:
+            db = get_db()
+            try:
+                row = db.execute('SELECT COUNT(*) AS n, MAX(match_date) AS latest FROM matches').fetchone()
+                stamp = f"{row['n']}@{row['latest']}"
+            finally:
+                db.close()
+            self._matches_stamp = (time.time(), stamp)
+        return stamp
+    
+    def check_model_weights(self):
+        """Reload MODEL_WEIGHTS if another worker refit them (at most every check_interval)"""
+        if time.time() - self._weights_checked_at >= self.check_interval:
+            self._weights_checked_at = time.time()
+            reload_model_weights_if_changed()
+    
+    def model_inputs(self, model):
+        """Version of everything but the odds that a model's prices depend on"""
+        self.check_model_weights()
+        parts = [f"rows{self.ROW_FORMAT}", self.matches_stamp()]
+        if model in self.WEIGHTED_MODELS:
+            parts.append(MODEL_WEIGHTS.get('version'))
+        if model in self.ANOMALY_MODELS:
+            parts.append(f"anomaly{ODDS_ANOMALIES.version}")
+        if model in self.FPL_MODELS:
+            parts.append(int(FPL_BOOTSTRAP_CACHE.snapshot_time() or 0))
+            # Player details arrive in the background; reprice once they have
+            parts.append(f"d{FPL_DETAIL_FETCHER.generation}")
+        return '|'.join(str(p) for p in parts)
+    
+    def input_version(self, league, model, fetched_at):
+        return f"{fetched_at.isoformat()}|{self.model_inputs(model)}"
+    
+    def load(self, league, model, region):
+        db = get_db()
+        try:
+            row = db.execute('''
+                SELECT * FROM value_bet_results WHERE league = ? AND model = ? AND region = ?
+            ''', (league, model, region)).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        result = dict(row)
+        result['bets'] = json.loads(zlib.decompress(result.pop('payload')))
+        return result
+    
+    def compute(self, league, model, region, data, fetched_at, bets=None, started=None):
+        """Price one combination (unless `bets` is given) and store it. Returns the stored record."""
+        version = self.input_version(league, model, fetched_at)
+        started = started or time.monotonic()
+        if bets is None:
+            bets = PRICING_EXECUTOR.price(league, data, model, region, generation=self.model_inputs(model))
+        record = {
+            'league': league, 'model': model, 'region': region, 'version': version,
+            'odds_fetched_at': fetched_at.isoformat(), 'computed_at': datetime.utcnow().isoformat(),
+            'duration_ms': int((time.monotonic() - started) * 1000), 'bet_count': len(bets)
+        }
+        db = get_db()
+        try:
+            db.execute('''
+                INSERT OR REPLACE INTO value_bet_results (
+                    league, model, region, version, odds_fetched_at, computed_at, duration_ms, bet_count, payload
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (league, model, region, version, record['odds_fetched_at'], record['computed_at'],
+                  record['duration_ms'], len(bets), zlib.compress(json.dumps(bets).encode('utf-8'))))
+            db.commit()
+        finally:
+            db.close()
+        record['bets'] = bets
+        return record
+    
+    def value_bets(self, league, data, model='complex', region='both'):
+        """
+        (bets, meta) for one league, from the stored results when possible.
+        meta reports the source ('precomputed', 'computed' or 'live'),
+        version, computed_at and whether the result is stale.
+        """
+        entry = self.cache.get(league) if self.enabled else None
+        if entry is None or model not in self.models or region not in self.REGIONS:
+            # Nothing cached to version against (e.g. the store failed) - price it directly
+            bets = PRICING_EXECUTOR.price(league, data, model, region, generation=self.model_inputs(model))
+            return bets, {'source': 'live', 'stale': False}
+        data = entry[0]
+        with self._cond:
+            self._ensure_worker()
+        
+        stored = self.load(league, model, region)
+        version = self.input_version(league, model, entry[1])
+        if stored is not None and stored['version'] == version:
+            self._count('served')
+            return stored['bets'], self._meta(stored, 'precomputed', stale=False)
+        if stored is not None:
+            self._count('stale_served')
+            self.enqueue(league)
+            return stored['bets'], self._meta(stored, 'precomputed', stale=True)
+        
+        self._count('computed_on_request')
+        record = self.compute(league, model, region, data, entry[1])
+        return record['bets'], self._meta(record, 'computed', stale=False)
+    
+    @staticmethod
+    def _meta(record, source, stale):
+        return {'source': source, 'stale': stale, 'version': record['version'], 'computed_at': record['computed_at'],
+                'odds_fetched_at': record['odds_fetched_at'], 'compute_ms': record['duration_ms']}
+    
+    def enqueue(self, league):
+        if not self.enabled:
+            return
+        with self._cond:
+            if league not in self._pending:
+                self._pending.append(league)
+            self._ensure_worker()
+            self._cond.notify()
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True, name='value-bet-pipeline')
+            self._worker.start()
+    
+    def _run(self):
+        last_check = time.time()
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait(timeout=max(1, self.check_interval - (time.time() - last_check)))
+                league = self._pending.pop(0) if self._pending else None
+            
+            if league is not None:
+                try:
+                    self.recompute(league)
+                except Exception as e:
+                    self._count('failures')
+                    print(f"Value bet pipeline error for {league}: {e}")
+            
+            if time.time() - last_check >= self.check_interval:
+                last_check = time.time()
+                # Match imports / weight refits change inputs without an odds refresh
+                self._matches_stamp = (0, None)
+                self.check_model_weights()
+                for stale_league in self.stale_leagues():
+                    self.enqueue(stale_league)
+    
+    def stale_leagues(self):
+        """Leagues with a stored result whose inputs have changed"""
+        db = get_db()
+        try:
+            rows = db.execute('SELECT league, model, version FROM value_bet_results').fetchall()
+        finally:
+            db.close()
+        stale = []
+        for row in rows:
+            entry = self.cache.get(row['league'])
+            if entry is not None and row['league'] not in stale and \
+                    row['version'] != self.input_version(row['league'], row['model'], entry[1]):
+                stale.append(row['league'])
+        return stale
+    
+    def _acquire_lease(self, league):
+        db = sqlite3.connect(DATABASE, timeout=10, isolation_level=None)
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute('SELECT owner, expires_at FROM value_bet_leases WHERE league = ?', (league,)).fetchone()
+            if row and row[0] != self.owner and row[1] > time.time():
+                db.execute('ROLLBACK')
+                return False
+            db.execute('INSERT OR REPLACE INTO value_bet_leases (league, owner, expires_at) VALUES (?, ?, ?)',
+                       (league, self.owner, time.time() + self.lease_seconds))
+            db.execute('COMMIT')
+            return True
+        finally:
+            db.close()
+    
+    def _renew_lease(self, league):
+        """Push our lease's expiry out again; False if it lapsed and another worker took it"""
+        db = sqlite3.connect(DATABASE, timeout=10, isolation_level=None)
+        try:
+            cursor = db.execute('UPDATE value_bet_leases SET expires_at = ? WHERE league = ? AND owner = ?',
+                                (time.time() + self.lease_seconds, league, self.owner))
+            return cursor.rowcount > 0
+        finally:
+            db.close()
+    
+    def _release_lease(self, league):
+        db = sqlite3.connect(DATABASE, timeout=10, isolation_level=None)
+        try:
+            db.execute('DELETE FROM value_bet_leases WHERE league = ? AND owner = ?', (league, self.owner))
+        finally:
+            db.close()
+    
+    @staticmethod
+    def odds_digests(data):
+        """
+        {event key: {"market|bookmaker": crc32 of its outcomes}}. The ""
+        entry covers the fixture itself (teams and kick-off).
+        """
+        digests = {}
+        for match in data or []:
+            event = digests.setdefault(odds_event_key(match), {})
+            event[''] = zlib.crc32(repr((match.get('home_team'), match.get('away_team'),
+                                         match.get('commence_time'))).encode('utf-8'))
+            for bookmaker in match.get('bookmakers', []):
+                for market in bookmaker.get('markets', []):
+                    outcomes = sorted((o.get('name', ''), o.get('point'), o.get('price'))
+                                      for o in market.get('outcomes', []))
+                    event[f"{market.get('key', '')}|{bookmaker.get('key', '')}"] = zlib.crc32(repr(outcomes).encode('utf-8'))
+        return digests
+    
+    @staticmethod
+    def diff_digests(previous, current):
+        """
+        {(event, market): regions} for every market with a changed, new or
+        withdrawn bookmaker quote. A changed, new or removed fixture touches
+        all its markets in every region ('*').
+        """
+        touched = defaultdict(set)
+        for event in previous.keys() | current.keys():
+            before, after = previous.get(event, {}), current.get(event, {})
+            if before.get('') != after.get(''):
+                for market in ValueBetPipeline.BET_TYPE_MARKETS.values():
+                    touched[(event, market)].add('*')
+                continue
+            for key in before.keys() | after.keys():
+                if key and before.get(key) != after.get(key):
+                    market, bookmaker = key.split('|', 1)
+                    touched[(event, market)].add(bookmaker_region(bookmaker))
+        return touched
+    
+    def load_snapshot(self, league):
+        db = get_db()
+        try:
+            row = db.execute('SELECT odds_fetched_at, digests FROM value_bet_snapshots WHERE league = ?',
+                             (league,)).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        return row['odds_fetched_at'], json.loads(zlib.decompress(row['digests']))
+    
+    def store_snapshot(self, league, fetched_at, digests):
+        db = get_db()
+        try:
+            db.execute('INSERT OR REPLACE INTO value_bet_snapshots (league, odds_fetched_at, digests) VALUES (?, ?, ?)',
+                       (league, fetched_at.isoformat(), zlib.compress(json.dumps(digests).encode('utf-8'))))
+            db.commit()
+        finally:
+            db.close()
+    
+    def recompute(self, league):
+        """
+        Bring every (model, region) of a league up to date. When only the
+        odds changed since a stored result, just the rows of the
+        (event, market) pairs whose quotes in that region moved are
+        repriced; the rest are carried over. The lease is renewed after
+        each combination, and the run stops if it was lost to another worker.
+        """
+        entry = self.cache.get(league)
+        if entry is None or not self._acquire_lease(league):
+            return 0
+        try:
+            data, fetched_at = entry
+            started = time.monotonic()
+            digests = self.odds_digests(data)
+            snapshot = self.load_snapshot(league)
+            touched = self.diff_digests(snapshot[1], digests) if snapshot else None
+            
+            counts = defaultdict(int)
+            lease_lost = False
+            for model in self.models:
+                if lease_lost:
+                    break
+                inputs = self.model_inputs(model)
+                for region in self.REGIONS:
+                    stored = self.load(league, model, region)
+                    if stored is not None and stored['version'] == f"{fetched_at.isoformat()}|{inputs}":
+                        continue
+                    
+                    incremental = (touched is not None and stored is not None
+                                   and stored['odds_fetched_at'] == snapshot[0]
+                                   and stored['version'] == f"{snapshot[0]}|{inputs}"
+                                   and all('event_id' in bet for bet in stored['bets']))
+                    if not incremental:
+                        record = self.compute(league, model, region, data, fetched_at)
+                        counts['combinations_full'] += 1
+                        counts['rows_repriced'] += record['bet_count']
+                    else:
+                        combo_started = time.monotonic()
+                        region_key = region.upper()
+                        stale = {key for key, regions in touched.items()
+                                 if region == 'both' or '*' in regions or region_key in regions}
+                        kept = [bet for bet in stored['bets']
+                                if (bet.get('event_id'), self.BET_TYPE_MARKETS.get(bet['bet_type'])) not in stale]
+                        only = defaultdict(set)
+                        for event, market in stale:
+                            only[event].add(market)
+                        fresh = price_league_value_bets(league, data, model, region, only=only) if only else []
+                        bets = sorted(kept + fresh, key=value_bet_order)
+                        self.compute(league, model, region, data, fetched_at, bets=bets, started=combo_started)
+                        counts['combinations_incremental'] += 1
+                        counts['rows_repriced'] += len(fresh)
+                        counts['rows_reused'] += len(kept)
+                        counts['rows_dropped'] += len(stored['bets']) - len(kept)
+                    
+                    if not self._renew_lease(league):
+                        print(f"Value bets for {league}: lease lost, leaving the rest to its new owner")
+                        lease_lost = True
+                        break
+            
+            if not lease_lost:
+                self.store_snapshot(league, fetched_at, digests)
+            elapsed = int((time.monotonic() - started) * 1000)
+            computed = counts['combinations_full'] + counts['combinations_incremental']
+            with self._lock:
+                self.stats['recomputes'] += 1
+                self.stats['last_recompute_ms'] = elapsed
+                for stat, value in counts.items():
+                    self.stats[stat] += value
+                self.last_refresh[league] = dict(
+                    counts, odds_fetched_at=fetched_at.isoformat(), duration_ms=elapsed,
+                    quotes_changed=None if touched is None else len(touched),
+                    events_changed=None if touched is None else len({event for event, _ in touched})
+                )
+            if computed:
+                print(f"Value bets for {league}: {computed} combinations recomputed in {elapsed}ms "
+                      f"({counts['rows_repriced']} rows repriced, {counts['rows_reused']} reused)")
+            return computed
+        finally:
+            self._release_lease(league)
+    
+    def status(self):
+        db = get_db()
+        try:
+            rows = db.execute('''
+                SELECT league, model, region, version, computed_at, duration_ms, bet_count
+                FROM value_bet_results ORDER BY league, model, region
+            ''').fetchall()
+        finally:
+            db.close()
+        with self._cond:
+            pending = list(self._pending)
+        with self._lock:
+            stats = dict(self.stats)
+            last_refresh = dict(self.last_refresh)
+        return dict(stats, enabled=self.enabled, pending=pending, last_refresh=last_refresh,
+                    results=[dict(row) for row in rows])
+
+
+VALUE_BET_PIPELINE = ValueBetPipeline(ODDS_CACHE)
+
+
+# Sort orders for /api/value-bets: field and whether highest comes first
+VALUE_BET_SORTS = {
+    'ev-desc': ('ev', True),
+    'ev-asc': ('ev', False),
+    'odds-desc': ('best_odds', True),
+    'odds-asc': ('best_odds', False)
+}
+
+
+def value_bet_row_id(bet):
+    """Unique, stable id of a value-bet row (ties in the sort key are broken on it)"""
+    return f"{bet.get('league', '')}|{bet.get('event_id', '')}|{bet['bet_type']}|{bet['market']}"
+
+
+def value_bet_order(bet):
+    """Sort key of priced rows: highest EV first, ties by row id, so any pricing path gives the same order"""
+    return -bet['ev'], value_bet_row_id(bet)
+
+
+def encode_value_bet_cursor(sort, bet):
+    position = [sort, bet[VALUE_BET_SORTS[sort][0]], value_bet_row_id(bet)]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_value_bet_cursor(cursor, sort):
+    """(sort value, row id) after which the next page starts. Raises ValueError if invalid."""
+    try:
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort:
+        raise ValueError('Cursor belongs to a different sort order')
+    return float(value), str(row_id)
+
+
+def parse_kickoff_bound(value):
+    """ISO datetime query value -> Odds API commence_time string (UTC) for comparison"""
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def value_bet_filter(args):
+    """
+    Row predicate for the /api/value-bets filters: min_ev, bet_type
+    (Moneyline / Goals / Spreads, comma-separated), bookmaker (titles,
+    comma-separated) and a kickoff window (kickoff_from / kickoff_to, ISO
+    datetimes, to exclusive). Returns None when no filter is set; raises
+    ValueError on malformed values.
+    """
+    min_ev = args.get('min_ev', type=float)
+    bet_types = {t for t in args.get('bet_type', 'all').split(',') if t and t != 'all'}
+    bookmakers = {b.strip().lower() for b in args.get('bookmaker', '').split(',') if b.strip()}
+    kickoff_from = parse_kickoff_bound(args.get('kickoff_from'))
+    kickoff_to = parse_kickoff_bound(args.get('kickoff_to'))
+    if min_ev is None and not bet_types and not bookmakers and not kickoff_from and not kickoff_to:
+        return None
+    
+    def matches(bet):
+        if min_ev is not None and bet['ev'] < min_ev:
+            return False
+        if bet_types and bet['bet_type'] not in bet_types:
+            return False
+        if bookmakers and bet['bookmaker'].lower() not in bookmakers:
+            return False
+        if kickoff_from and bet['commence_time'] < kickoff_from:
+            return False
+        if kickoff_to and bet['commence_time'] >= kickoff_to:
+            return False
+        return True
+    return matches
+
+
+def select_value_bets(bets, sort='ev-desc', limit=VALUE_BET_PAGE_SIZE, cursor=None, predicate=None):
+    """
+    One page of value bets: the `limit` best rows in `sort` order that
+    pass `predicate` and come after `cursor` ((sort value, row id) of the
+    previous page's last row). A bounded heap keeps this O(n log limit)
+    instead of sorting every row. Returns (page, matched, has_more), where
+    matched counts every row passing the predicate.
+    """
+    field, descending = VALUE_BET_SORTS[sort]
+    matched = 0
+    candidates = []
+    for bet in bets:
+        if predicate is not None and not predicate(bet):
+            continue
+        matched += 1
+        key = (bet[field], value_bet_row_id(bet))
+        if cursor is not None and (key >= cursor if descending else key <= cursor):
+            continue
+        candidates.append((key, bet))
+    
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, candidates, key=lambda item: item[0])
+    return [bet for _, bet in page[:limit]], matched, len(page) > limit
+
+
+@app.route('/api/value-bets')
+@require_auth
+def value_bets():
+    """
+    Get value bets with EV calculations. `league` may be a single sport key,
+    a comma-separated list or 'all' (ODDS_LEAGUES); several leagues are
+    fetched and priced concurrently and merged into one EV ranking.
+    
+    Rows are filtered server-side (see value_bet_filter) and returned one
+    page at a time: `sort`, `limit` and the previous response's
+    `next_cursor` as `cursor`.
+    """
+    try:
+        # Get filters from query params
+        region_filter = request.args.get('region', 'both')  # 'uk', 'us', or 'both'
+        ai_model = request.args.get('model', 'complex')  # 'simple', 'opponent', 'complex', 'anomaly', 'form_momentum', 'sentiment_external'
+        leagues = parse_leagues(request.args.get('league', 'soccer_epl'))  # Which league(s) to analyze
+        if not leagues:
+            return jsonify({'error': 'Unknown league'}), 400
+        
+        sort = request.args.get('sort', 'ev-desc')
+        if sort not in VALUE_BET_SORTS:
+            return jsonify({'error': f"Unknown sort '{sort}'"}), 400
+        limit = min(max(request.args.get('limit', VALUE_BET_PAGE_SIZE, type=int), 1), VALUE_BET_MAX_PAGE_SIZE)
+        try:
+            predicate = value_bet_filter(request.args)
+            cursor = decode_value_bet_cursor(request.args['cursor'], sort) if request.args.get('cursor') else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Fetch live odds for the selected league(s) concurrently
+        odds_by_league = ODDS_CACHE.get_many(leagues)
+        available = [league for league in leagues if odds_by_league.get(league) is not None]
+        if not available:
+            return jsonify({'error': 'Unable to fetch odds from API'}), 500
+        
+        # Served from the precomputed results when their inputs are unchanged
+        ranked, computed = {}, {}
+        if len(available) == 1:
+            league = available[0]
+            ranked[league], computed[league] = VALUE_BET_PIPELINE.value_bets(league, odds_by_league[league], ai_model, region_filter)
+        else:
+            futures = {league: LEAGUE_PRICING_EXECUTOR.submit(VALUE_BET_PIPELINE.value_bets, league, odds_by_league[league],
+                                                              ai_model, region_filter)
+                       for league in available}
+            for league, future in futures.items():
+                try:
+                    ranked[league], computed[league] = future.result()
+                except Exception as e:
+                    # One league failing to price shouldn't sink the whole scan
+                    print(f"Error pricing {league}: {e}")
         
-        # Sort by EV (highest first)
-        value_bets_list.sort(key=lambda x: x['ev'], reverse=True)
+        # Filter and keep only this page's rows across every league's results
+        page, matched, has_more = select_value_bets(
+            (bet for bets in ranked.values() for bet in bets), sort, limit, cursor, predicate
+        )
         
-        return jsonify({
-            'value_bets': value_bets_list,
-            'total_bets': len(value_bets_list),
-            'last_updated': datetime.utcnow().isoformat()
-        })
+        computed_times = [meta['computed_at'] for meta in computed.values() if meta.get('computed_at')]
+        response = {
+            'value_bets': page,
+            'total_bets': sum(len(bets) for bets in ranked.values()),
+            'matched_bets': matched,
+            'next_cursor': encode_value_bet_cursor(sort, page[-1]) if has_more else None,
+            'last_updated': min(computed_times) if computed_times else datetime.utcnow().isoformat(),
+            'computed': computed[available[0]] if len(leagues) == 1 and computed else None
+        }
+        if len(leagues) > 1:
+            response['leagues'] = {
+                league: dict(computed.get(league, {}), available=league in ranked,
+                             total_bets=len(ranked.get(league, [])))
+                for league in leagues
+            }
+        return jsonify(response)
         
     except Exception as e:
         print(f"Error in value_bets endpoint: {e}")
@@ -3011,6 +7201,81 @@ def value_bets():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@app.route('/api/value-bets/explain', methods=['POST'])
+@require_auth
+def explain_value_bets():
+    """
+    Explanations for the value-bet rows the client expanded. Body:
+    {"keys": [explanation_key, ...]} (at most VALUE_BET_EXPLAIN_BATCH).
+    Returns {"explanations": {key: text or null}}.
+    """
+    keys = (request.get_json(silent=True) or {}).get('keys')
+    if not isinstance(keys, list) or not keys or not all(isinstance(key, str) for key in keys):
+        return jsonify({'error': 'Missing explanation keys'}), 400
+    if len(keys) > VALUE_BET_EXPLAIN_BATCH:
+        return jsonify({'error': f"At most {VALUE_BET_EXPLAIN_BATCH} keys per request"}), 400
+    
+    try:
+        return jsonify({'explanations': VALUE_BET_EXPLAINER.explain(keys)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in explain endpoint: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/arbitrage')
+@require_auth
+def arbitrage_opportunities():
+    """
+    Arbitrage and near-arbitrage opportunities from the cached odds, best
+    margin first. `league` as for /api/value-bets; `region` ('uk', 'us' or
+    'both') limits the bookmakers; `market` (h2h, totals, spreads or
+    h2h_lay) filters the outcome sets; `min_margin` (percent, default
+    -ARBITRAGE_NEAR_MARGIN) drops the worse ones. Each opportunity carries
+    its stake split for ARBITRAGE_STAKE.
+    """
+    try:
+        region_filter = request.args.get('region', 'both')
+        leagues = parse_leagues(request.args.get('league', 'soccer_epl'))
+        if not leagues:
+            return jsonify({'error': 'Unknown league'}), 400
+        markets = set(request.args.get('market', '').split(',')) - {''}
+        if markets - set(OddsTensor.MARKETS):
+            return jsonify({'error': f"Unknown market '{','.join(sorted(markets - set(OddsTensor.MARKETS)))}'"}), 400
+        min_margin = request.args.get('min_margin', -ARBITRAGE_SCANNER.near_margin, type=float)
+        
+        odds_by_league = ODDS_CACHE.get_many(leagues)
+        scans, fetched = [], {}
+        for league in leagues:
+            entry = ODDS_CACHE.get(league) if odds_by_league.get(league) is not None else None
+            if entry is None:
+                continue
+            fetched[league] = entry[1].isoformat()
+            scans.append(ARBITRAGE_SCANNER.get(league, entry, region_filter))
+        if not fetched:
+            return jsonify({'error': 'Unable to fetch odds from API'}), 500
+        
+        # Each league's scan is already ranked; merge them into one ranking
+        opportunities = [
+            opportunity
+            for opportunity in heapq.merge(*scans, key=lambda x: x['margin_percentage'], reverse=True)
+            if opportunity['margin_percentage'] >= min_margin and (not markets or opportunity['market'] in markets)
+        ]
+        return jsonify({
+            'opportunities': opportunities,
+            'arbitrage_count': sum(1 for opportunity in opportunities if opportunity['is_arbitrage']),
+            'total_opportunities': len(opportunities),
+            'stake': ARBITRAGE_SCANNER.stake,
+            'exchange_commission': ARBITRAGE_SCANNER.commission,
+            'fetched_at': fetched
+        })
+        
+    except Exception as e:
+        print(f"Error in arbitrage endpoint: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 # =============================================================================
 # BACKTESTING ENDPOINT - USES ACTUAL HISTORICAL ODDS & PREVENTS LOOKAHEAD BIAS
 # =============================================================================
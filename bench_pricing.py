@@ -0,0 +1,101 @@
+"""
+Benchmark serial vs process-pool fixture pricing for /api/value-bets.
+
+Prices synthetic slates (replay_server's odds payloads over the usual
+Premier League team names, so the models do their real database work) of
+10, 50 and 200 fixtures with each model: once in the calling thread, then
+through PricingExecutor with cold workers (a new inputs generation, as
+after a match import) and warm workers (same generation, as on an odds
+refresh). Checks the pooled results are identical to the serial ones.
+
+Usage: python bench_pricing.py [--fixtures 10,50,200] [--models simple,complex]
+                               [--processes 4] [--repeat 3]
+
+The FPL-driven models (sentiment_external, overall) fetch FPL data in this
+process (the workers get it with each task); point FPL_API_BASE at
+replay_server.py to keep them offline. Speedups need as many free cores as
+--processes: on a single CPU the pool can only add overhead.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs process-pool value-bet pricing')
+    parser.add_argument('--fixtures', default='10,50,200', help='Comma-separated slate sizes')
+    parser.add_argument('--models', default='simple,opponent,complex,form_momentum,sentiment_external,overall',
+                        help='Comma-separated models')
+    parser.add_argument('--processes', type=int, default=max(2, min(4, os.cpu_count() or 1)), help='Pricing processes')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (median reported)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Benchmark the pricing only: no refits, no background precompute
+    os.environ.setdefault('MODEL_WEIGHTS_AUTO_REFIT', 'false')
+    os.environ.setdefault('VALUE_BET_PRECOMPUTE', 'false')
+    os.environ['PRICING_PROCESSES'] = str(args.processes)
+    os.environ['PRICING_PROCESS_MIN_FIXTURES'] = '1'
+
+    import app
+    from replay_server import synthetic_odds
+
+    sizes = [int(n) for n in args.fixtures.split(',') if n]
+    models = [m for m in args.models.split(',') if m]
+    executor = app.PricingExecutor(processes=args.processes, min_fixtures=1, models=models, web_workers=1)
+
+    if any(model in executor.FPL_MODELS for model in models) and app.FPL_DETAIL_FETCH:
+        # Fetch the FPL player details up front: pricing reads only cached ones, so a
+        # background fetch finishing mid-benchmark would change the prices between runs
+        table = app.FPL_BOOTSTRAP_CACHE.team_table()
+        for record in (table.records.values() if table else ()):
+            app.FPL_DETAIL_FETCHER.get_element_summaries(record['top_player_ids'])
+        app.FPL_DETAIL_FETCHER.get_fixtures()
+
+    # Spawn the workers (they import the app) before timing anything
+    started = time.monotonic()
+    warmup = synthetic_odds('soccer_epl', random.Random(args.seed), events=args.processes * 2)
+    executor.price('soccer_epl', warmup, models[0], generation='warmup')
+    print(f"Pool of {args.processes} processes started in {time.monotonic() - started:.2f}s "
+          f"({os.cpu_count()} CPUs available)\n")
+
+    def timed(func):
+        runs = []
+        for _ in range(args.repeat):
+            started = time.monotonic()
+            result = func()
+            runs.append(time.monotonic() - started)
+        return statistics.median(runs), result
+
+    print(f"{'model':<20}{'fixtures':>9}{'serial':>10}{'cold':>10}{'warm':>10}{'speedup':>9}  identical")
+    generation = 0
+    for model in models:
+        for size in sizes:
+            odds_data = synthetic_odds('soccer_epl', random.Random(args.seed + size), events=size)
+
+            serial_time, serial = timed(lambda: app.price_league_value_bets('soccer_epl', odds_data, model, 'both'))
+
+            def cold():
+                nonlocal generation
+                generation += 1
+                return executor.price('soccer_epl', odds_data, model, 'both', generation=f"cold-{generation}")
+            cold_time, pooled_cold = timed(cold)
+
+            executor.price('soccer_epl', odds_data, model, 'both', generation='warm')
+            warm_time, pooled_warm = timed(
+                lambda: executor.price('soccer_epl', odds_data, model, 'both', generation='warm'))
+
+            identical = pooled_cold == serial and pooled_warm == serial
+            print(f"{model:<20}{size:>9}{serial_time * 1000:>8.0f}ms{cold_time * 1000:>8.0f}ms"
+                  f"{warm_time * 1000:>8.0f}ms{serial_time / warm_time:>8.1f}x  {'yes' if identical else 'NO'}")
+
+    executor.shutdown()
+    print(f"\nExecutor stats: {executor.status()}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -30,4 +30,8 @@ with open('schema.sql', 'r') as f:
 echo "Importing historical data..."
 python import_all_data.py
 
+# Refit model weights on the imported history
+echo "Calibrating model weights..."
+python calibrate_weights.py || echo "Calibration failed - app will use default weights"
+
 echo "=== Build Complete ==="
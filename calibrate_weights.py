@@ -0,0 +1,40 @@
+"""
+Refit the model weights from the full match history.
+
+Builds point-in-time predictions for every historical match, fits the
+Form & Momentum component weights, the overall ensemble weights and the
+moneyline calibration map by minimizing log-loss, and writes them to
+model_weights.json (versioned) for the app to load at startup.
+
+Usage: python calibrate_weights.py [--output model_weights.json]
+"""
+
+import argparse
+import os
+import sys
+
+# The explicit run replaces the background refit after the app imports matches itself
+os.environ.setdefault('MODEL_WEIGHTS_AUTO_REFIT', 'false')
+
+from app import ModelWeightCalibrator, MODEL_WEIGHTS_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refit ensemble weights and calibration from match history')
+    parser.add_argument('--output', default=MODEL_WEIGHTS_FILE, help='Path of the weights file to write')
+    parser.add_argument('--holdout', type=float, default=0.2, help='Most recent share of matches used for validation')
+    args = parser.parse_args()
+    
+    weights = ModelWeightCalibrator(holdout=args.holdout).run(args.output)
+    if not weights:
+        print("No new weights - the app keeps its current weights")
+        return 1
+    
+    print(f"Form components: {weights['form_components']}")
+    print(f"Ensemble:        {weights['ensemble']}")
+    print(f"Calibration:     {weights['calibration']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
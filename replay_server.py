@@ -0,0 +1,426 @@
+"""
+Local stand-in for The Odds API and the FPL API, for offline load tests.
+
+Replays payloads recorded from the live APIs (or built-in synthetic ones
+when nothing has been recorded) with configurable latency, error injection
+and payload scaling, and sends x-requests-* quota headers like the real
+Odds API. Point the app at it through its base URL settings:
+
+    python replay_server.py record                  # once, needs network + quota
+    python replay_server.py serve --port 8800 --latency 0.25 --error-rate 0.02 \
+        --scale-events 5 --scale-bookmakers 3
+
+    ODDS_API_BASE_URL=http://127.0.0.1:8800/v4 \
+    FPL_API_BASE=http://127.0.0.1:8800/fpl python app.py
+
+Endpoints: /v4/sports/{sport}/odds, /fpl/bootstrap-static/,
+/fpl/element-summary/{id}/, /fpl/fixtures/, plus /stats and /reset.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_DIR = 'replay_data'
+DEFAULT_SPORTS = ['soccer_epl']
+
+SYNTHETIC_TEAMS = [
+    'Arsenal', 'Aston Villa', 'Bournemouth', 'Brentford', 'Brighton', 'Chelsea', 'Crystal Palace',
+    'Everton', 'Fulham', 'Ipswich', 'Leicester', 'Liverpool', 'Man City', 'Man United',
+    'Newcastle', "Nott'm Forest", 'Southampton', 'Tottenham', 'West Ham', 'Wolves'
+]
+SYNTHETIC_BOOKMAKERS = [
+    ('williamhill', 'William Hill'), ('paddypower', 'Paddy Power'), ('skybet', 'Sky Bet'),
+    ('unibet', 'Unibet'), ('betfair_ex_uk', 'Betfair'), ('fanduel', 'FanDuel'),
+    ('draftkings', 'DraftKings'), ('betmgm', 'BetMGM')
+]
+
+
+# =============================================================================
+# RECORDED / SYNTHETIC PAYLOADS
+# =============================================================================
+
+def record(directory, sports):
+    """Fetch one live payload per endpoint and save it under `directory`"""
+    os.environ.setdefault('MODEL_WEIGHTS_AUTO_REFIT', 'false')
+    os.environ.setdefault('ODDS_BACKGROUND_REFRESH', 'false')
+    from app import HTTP_CLIENT, ODDS_API_KEY, ODDS_API_BASE_URL, FPL_API_BASE
+
+    os.makedirs(os.path.join(directory, 'odds'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'fpl'), exist_ok=True)
+
+    for sport in sports:
+        data = HTTP_CLIENT.get_json(f"{ODDS_API_BASE_URL}/sports/{sport}/odds", endpoint='odds', params={
+            'apiKey': ODDS_API_KEY,
+            'regions': 'uk,us,eu',
+            'markets': 'h2h,spreads,totals,h2h_lay',
+            'oddsFormat': 'decimal',
+            'dateFormat': 'iso'
+        })
+        _save(os.path.join(directory, 'odds', f"{sport}.json"), data)
+        print(f"Recorded {len(data)} events for {sport}")
+
+    for name, path in (('bootstrap-static', 'bootstrap-static/'), ('fixtures', 'fixtures/?future=1')):
+        data = HTTP_CLIENT.get_json(f"{FPL_API_BASE}/{path}", endpoint='fpl_bootstrap')
+        _save(os.path.join(directory, 'fpl', f"{name}.json"), data)
+        print(f"Recorded FPL {name}")
+
+    quota = HTTP_CLIENT.quota('odds')
+    if quota:
+        print(f"Odds API quota remaining: {quota['requests_remaining']}")
+
+
+def _save(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def synthetic_odds(sport, rng, events=10):
+    """Odds API shaped payload with plausible, slightly disagreeing bookmaker prices"""
+    now = datetime.utcnow()
+    teams = SYNTHETIC_TEAMS[:]
+    rng.shuffle(teams)
+    payload = []
+    for i in range(events):
+        home, away = teams[(2 * i) % len(teams)], teams[(2 * i + 1) % len(teams)]
+        strength = rng.uniform(-0.25, 0.25)
+        fair = {home: 0.45 + strength, 'Draw': 0.27, away: 0.28 - strength}
+        bookmakers = []
+        for key, title in SYNTHETIC_BOOKMAKERS:
+            margin = rng.uniform(1.02, 1.08)
+
+            def price(p):
+                return round(max(1.01, 1 / (p * margin) * rng.uniform(0.96, 1.04)), 2)
+
+            over = rng.uniform(0.45, 0.6)
+            handicap = -0.5 if strength > 0 else 0.5
+            bookmakers.append({
+                'key': key,
+                'title': title,
+                'last_update': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'markets': [
+                    {'key': 'h2h', 'outcomes': [{'name': n, 'price': price(p)} for n, p in fair.items()]},
+                    {'key': 'totals', 'outcomes': [
+                        {'name': 'Over', 'price': price(over), 'point': 2.5},
+                        {'name': 'Under', 'price': price(1 - over), 'point': 2.5}
+                    ]},
+                    {'key': 'spreads', 'outcomes': [
+                        {'name': home, 'price': price(0.5), 'point': handicap},
+                        {'name': away, 'price': price(0.5), 'point': -handicap}
+                    ]}
+                ]
+            })
+        payload.append({
+            'id': f"synthetic-{sport}-{i}",
+            'sport_key': sport,
+            'commence_time': (now + timedelta(hours=6 + 20 * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'home_team': home,
+            'away_team': away,
+            'bookmakers': bookmakers
+        })
+    return payload
+
+
+def synthetic_bootstrap(rng, players_per_team=30):
+    teams = [{'id': i + 1, 'name': name, 'short_name': name[:3].upper(), 'strength': rng.randint(2, 5)}
+             for i, name in enumerate(SYNTHETIC_TEAMS)]
+    elements = []
+    for team in teams:
+        for n in range(players_per_team):
+            transfers_in = rng.randint(0, 60000)
+            elements.append({
+                'id': len(elements) + 1,
+                'web_name': f"{team['short_name']}{n}",
+                'team': team['id'],
+                'element_type': rng.randint(1, 4),
+                'status': rng.choice('aaaaaaadi'),
+                'selected_by_percent': f"{rng.uniform(0, 45):.1f}",
+                'form': f"{rng.uniform(0, 9):.1f}",
+                'now_cost': rng.randint(40, 140),
+                'cost_change_event': rng.choice([-1, 0, 0, 0, 1]),
+                'transfers_in_event': transfers_in,
+                'transfers_out_event': rng.randint(0, 60000),
+                'chance_of_playing_next_round': rng.choice([None, None, 100, 75, 50, 0]),
+                'minutes': rng.randint(0, 1200),
+                'total_points': rng.randint(0, 120)
+            })
+    return {'teams': teams, 'elements': elements, 'events': []}
+
+
+def synthetic_fixtures(bootstrap, rng, rounds=5):
+    team_ids = [t['id'] for t in bootstrap.get('teams', [])]
+    fixtures = []
+    start = datetime.utcnow() + timedelta(days=2)
+    for r in range(rounds):
+        rng.shuffle(team_ids)
+        for i in range(0, len(team_ids) - 1, 2):
+            fixtures.append({
+                'id': len(fixtures) + 1,
+                'event': r + 1,
+                'team_h': team_ids[i],
+                'team_a': team_ids[i + 1],
+                'team_h_difficulty': rng.randint(2, 5),
+                'team_a_difficulty': rng.randint(2, 5),
+                'finished': False,
+                'kickoff_time': (start + timedelta(days=7 * r)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            })
+    return fixtures
+
+
+def element_summary(player_id, bootstrap, fixtures):
+    """Deterministic element-summary for a player: recent minutes and their team's next fixtures"""
+    rng = random.Random(player_id)
+    player = next((p for p in bootstrap.get('elements', []) if p.get('id') == player_id), None)
+    if player is None:
+        return None
+    team = player.get('team')
+    history = [{'minutes': rng.choice([0, 20, 45, 90, 90, 90]), 'total_points': rng.randint(0, 10),
+                'kickoff_time': (datetime.utcnow() - timedelta(days=7 * (5 - k))).strftime('%Y-%m-%dT%H:%M:%SZ')}
+               for k in range(5)]
+    upcoming = [{
+        'event': f.get('event'),
+        'is_home': f.get('team_h') == team,
+        'difficulty': f.get('team_h_difficulty') if f.get('team_h') == team else f.get('team_a_difficulty'),
+        'kickoff_time': f.get('kickoff_time')
+    } for f in fixtures if team in (f.get('team_h'), f.get('team_a'))]
+    return {'history': history, 'fixtures': upcoming}
+
+
+def scale_odds(payload, events=1, bookmakers=1, seed=0):
+    """
+    Multiply a payload: `events` copies of every event (new ids, later
+    kickoffs) and `bookmakers` copies of every bookmaker (new keys, prices
+    nudged within +/-3%).
+    """
+    rng = random.Random(seed)
+    scaled = []
+    for copy in range(max(1, events)):
+        for event in payload:
+            event = json.loads(json.dumps(event))
+            if copy:
+                event['id'] = f"{event.get('id')}-x{copy}"
+                try:
+                    kickoff = datetime.strptime(event['commence_time'], '%Y-%m-%dT%H:%M:%SZ') + timedelta(days=copy)
+                    event['commence_time'] = kickoff.strftime('%Y-%m-%dT%H:%M:%SZ')
+                except (KeyError, ValueError):
+                    pass
+            books = []
+            for bookmaker in event.get('bookmakers', []):
+                for b_copy in range(max(1, bookmakers)):
+                    book = json.loads(json.dumps(bookmaker))
+                    if b_copy:
+                        book['key'] = f"{book.get('key')}_{b_copy}"
+                        book['title'] = f"{book.get('title')} {b_copy}"
+                        for market in book.get('markets', []):
+                            for outcome in market.get('outcomes', []):
+                                if outcome.get('price'):
+                                    outcome['price'] = round(max(1.01, outcome['price'] * rng.uniform(0.97, 1.03)), 2)
+                    books.append(book)
+            event['bookmakers'] = books
+            scaled.append(event)
+    return scaled
+
+
+# =============================================================================
+# REPLAY SERVER
+# =============================================================================
+
+class ReplayState:
+    """Payloads (serialized once), quota and counters shared by the handler threads"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self._lock = threading.Lock()
+        self._odds = {}  # sport -> bytes
+        self.quota_remaining = args.quota
+        self.quota_used = 0
+        self.stats = {'requests': 0, 'errors_injected': 0, 'by_path': {}}
+
+        bootstrap = _load(os.path.join(args.dir, 'fpl', 'bootstrap-static.json'))
+        self.bootstrap = bootstrap or synthetic_bootstrap(random.Random(args.seed))
+        fixtures = _load(os.path.join(args.dir, 'fpl', 'fixtures.json'))
+        self.fixtures = fixtures if fixtures is not None else synthetic_fixtures(self.bootstrap, random.Random(args.seed))
+        self.bootstrap_bytes = json.dumps(self.bootstrap).encode('utf-8')
+        self.fixtures_bytes = json.dumps(self.fixtures).encode('utf-8')
+        print(f"FPL: {'recorded' if bootstrap else 'synthetic'} bootstrap ({len(self.bootstrap.get('elements', []))} players), "
+              f"{'recorded' if fixtures is not None else 'synthetic'} fixtures ({len(self.fixtures)})")
+
+    def odds(self, sport):
+        with self._lock:
+            if sport not in self._odds:
+                payload = _load(os.path.join(self.args.dir, 'odds', f"{sport}.json"))
+                source = 'recorded'
+                if payload is None:
+                    payload, source = synthetic_odds(sport, random.Random(f"{self.args.seed}-{sport}")), 'synthetic'
+                payload = scale_odds(payload, self.args.scale_events, self.args.scale_bookmakers, self.args.seed)
+                self._odds[sport] = json.dumps(payload).encode('utf-8')
+                print(f"Odds for {sport}: {source}, {len(payload)} events after scaling")
+            return self._odds[sport]
+
+    def count(self, path):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['by_path'][path] = self.stats['by_path'].get(path, 0) + 1
+
+    def should_fail(self):
+        with self._lock:
+            if self.rng.random() < self.args.error_rate:
+                self.stats['errors_injected'] += 1
+                return self.rng.choice(self.args.error_statuses)
+        return None
+
+    def delay(self):
+        with self._lock:
+            jitter = self.rng.uniform(-self.args.jitter, self.args.jitter)
+        return max(0.0, self.args.latency + jitter)
+
+    def charge(self, params):
+        """Quota cost like the real API: markets x regions"""
+        markets = len(params.get('markets', ['h2h'])[0].split(','))
+        regions = len(params.get('regions', ['uk'])[0].split(','))
+        with self._lock:
+            cost = markets * regions
+            self.quota_used += cost
+            self.quota_remaining = max(0, self.quota_remaining - cost)
+            return cost, self.quota_remaining, self.quota_used
+
+    def reset(self):
+        with self._lock:
+            self.quota_remaining = self.args.quota
+            self.quota_used = 0
+            self.stats = {'requests': 0, 'errors_injected': 0, 'by_path': {}}
+
+
+def make_handler(state):
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+
+        def log_message(self, format, *args):
+            if state.args.verbose:
+                super().log_message(format, *args)
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path.rstrip('/') or '/'
+            params = parse_qs(url.query)
+
+            if path == '/stats':
+                body = dict(state.stats, quota_remaining=state.quota_remaining, quota_used=state.quota_used)
+                return self._send(200, json.dumps(body).encode('utf-8'))
+            if path == '/reset':
+                state.reset()
+                return self._send(200, b'{"reset":true}')
+
+            odds_match = re.fullmatch(r'/v4/sports/([^/]+)/odds', path)
+            summary_match = re.fullmatch(r'/fpl/element-summary/(\d+)', path)
+            if odds_match:
+                route = '/v4/sports/{sport}/odds'
+            elif summary_match:
+                route = '/fpl/element-summary/{id}'
+            elif path in ('/fpl/bootstrap-static', '/fpl/fixtures'):
+                route = path
+            else:
+                return self._send(404, b'{"message":"Unknown replay path"}')
+
+            state.count(route)
+            time.sleep(state.delay())
+            status = state.should_fail()
+            if status:
+                headers = {'Retry-After': 1} if status == 429 else None
+                return self._send(status, json.dumps({'message': 'Injected error'}).encode('utf-8'), headers)
+
+            if odds_match:
+                if state.quota_remaining <= 0:
+                    return self._send(401, b'{"message":"Usage quota has been reached"}',
+                                      {'x-requests-remaining': 0, 'x-requests-used': state.quota_used})
+                cost, remaining, used = state.charge(params)
+                return self._send(200, state.odds(odds_match.group(1)), {
+                    'x-requests-remaining': remaining, 'x-requests-used': used, 'x-requests-last': cost
+                })
+            if summary_match:
+                summary = element_summary(int(summary_match.group(1)), state.bootstrap, state.fixtures)
+                if summary is None:
+                    return self._send(404, b'{"detail":"Not found."}')
+                return self._send(200, json.dumps(summary).encode('utf-8'))
+            if route == '/fpl/bootstrap-static':
+                return self._send(200, state.bootstrap_bytes)
+            return self._send(200, state.fixtures_bytes)
+
+    return ReplayHandler
+
+
+def serve(args):
+    state = ReplayState(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"Replay server on http://{args.host}:{args.port}")
+    print(f"  ODDS_API_BASE_URL=http://{args.host}:{args.port}/v4")
+    print(f"  FPL_API_BASE=http://{args.host}:{args.port}/fpl")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record/replay stand-in for The Odds API and FPL')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='Save live payloads for later replay (uses Odds API quota)')
+    rec.add_argument('--dir', default=DEFAULT_DIR, help='Directory to write recordings to')
+    rec.add_argument('--sports', default=','.join(DEFAULT_SPORTS), help='Comma-separated Odds API sport keys')
+
+    srv = sub.add_parser('serve', help='Serve recorded (or synthetic) payloads')
+    srv.add_argument('--dir', default=DEFAULT_DIR, help='Directory with recordings')
+    srv.add_argument('--host', default='127.0.0.1')
+    srv.add_argument('--port', type=int, default=8800)
+    srv.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    srv.add_argument('--jitter', type=float, default=0.0, help='+/- seconds of random latency')
+    srv.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with an error')
+    srv.add_argument('--error-statuses', default='500,502,503,429', help='Statuses to inject, chosen at random')
+    srv.add_argument('--scale-events', type=int, default=1, help='Copies of every recorded event')
+    srv.add_argument('--scale-bookmakers', type=int, default=1, help='Copies of every bookmaker per event')
+    srv.add_argument('--quota', type=int, default=20000, help='Starting x-requests-remaining')
+    srv.add_argument('--seed', type=int, default=1, help='Seed for latency, errors and synthetic data')
+    srv.add_argument('--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.dir, [s for s in args.sports.split(',') if s])
+        return 0
+
+    args.error_statuses = [int(s) for s in args.error_statuses.split(',') if s]
+    serve(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
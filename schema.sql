@@ -79,3 +79,144 @@ CREATE TABLE IF NOT EXISTS fixtures (
 CREATE INDEX IF NOT EXISTS idx_fixture_date ON fixtures(match_date);
 CREATE INDEX IF NOT EXISTS idx_fixture_status ON fixtures(status);
 
+
+-- FPL bootstrap snapshots (one row per recorded fetch)
+-- Player/team columns are stored column-wise as zlib-compressed JSON
+CREATE TABLE IF NOT EXISTS fpl_snapshots (
+    fetched_at TEXT PRIMARY KEY,
+    players BLOB NOT NULL,
+    teams BLOB NOT NULL,
+    player_count INTEGER,
+    raw_bytes INTEGER,
+    stored_bytes INTEGER
+);
+
+-- Per-team FPL aggregates over time
+CREATE TABLE IF NOT EXISTS fpl_team_history (
+    team_name TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    fpl_team_id INTEGER,
+    avg_ownership REAL,
+    key_player_availability REAL,
+    net_transfers INTEGER,
+    price_rises INTEGER,
+    price_falls INTEGER,
+    avg_form REAL,
+    PRIMARY KEY (team_name, fetched_at)
+) WITHOUT ROWID;
+
+-- Per-player FPL state over time
+CREATE TABLE IF NOT EXISTS fpl_player_history (
+    player_id INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    fpl_team_id INTEGER,
+    selected_by_percent REAL,
+    now_cost INTEGER,
+    form REAL,
+    status TEXT,
+    net_transfers INTEGER,
+    PRIMARY KEY (player_id, fetched_at)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_fpl_player_history_team ON fpl_player_history(fpl_team_id, fetched_at);
+
+-- Odds API responses shared by all worker processes (zlib-compressed JSON)
+CREATE TABLE IF NOT EXISTS odds_cache (
+    league TEXT PRIMARY KEY,
+    fetched_at TEXT NOT NULL,
+    match_count INTEGER,
+    payload BLOB NOT NULL
+);
+
+-- Cross-process single-flight: the worker holding a league's lease fetches it
+CREATE TABLE IF NOT EXISTS odds_fetch_leases (
+    league TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+-- Odds refresh health per league, shared by all workers
+CREATE TABLE IF NOT EXISTS odds_refresh_stats (
+    league TEXT PRIMARY KEY,
+    refreshes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_success_at TEXT,
+    last_failure_at TEXT,
+    last_error TEXT,
+    last_latency_ms REAL,
+    total_latency_ms REAL NOT NULL DEFAULT 0
+);
+
+-- Latest Odds API quota headers (single row), shared so every worker paces refreshes
+CREATE TABLE IF NOT EXISTS odds_api_quota (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    requests_remaining INTEGER,
+    requests_used INTEGER,
+    last_cost INTEGER,
+    updated_at TEXT
+);
+
+-- Events seen in Odds API payloads
+CREATE TABLE IF NOT EXISTS odds_events (
+    event_id TEXT PRIMARY KEY,
+    league TEXT NOT NULL,
+    home_team TEXT,
+    away_team TEXT,
+    commence_time TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_odds_events_league ON odds_events(league, commence_time);
+
+-- Delta-encoded price history: a row is written only when a price changes
+-- (price NULL = the line was withdrawn). point is 0 for markets without one.
+CREATE TABLE IF NOT EXISTS odds_history (
+    event_id TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    point REAL NOT NULL DEFAULT 0,
+    bookmaker TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    price REAL,
+    PRIMARY KEY (event_id, market, outcome, point, bookmaker, fetched_at)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_odds_history_fetched ON odds_history(fetched_at);
+
+-- One row per recorded payload, so unchanged prices can be expanded back out
+CREATE TABLE IF NOT EXISTS odds_fetches (
+    league TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    events INTEGER,
+    prices_seen INTEGER,
+    rows_written INTEGER,
+    PRIMARY KEY (league, fetched_at)
+) WITHOUT ROWID;
+
+-- Precomputed /api/value-bets results; version stamps the inputs they were computed from
+CREATE TABLE IF NOT EXISTS value_bet_results (
+    league TEXT NOT NULL,
+    model TEXT NOT NULL,
+    region TEXT NOT NULL,
+    version TEXT NOT NULL,
+    odds_fetched_at TEXT,
+    computed_at TEXT NOT NULL,
+    duration_ms INTEGER,
+    bet_count INTEGER,
+    payload BLOB NOT NULL,   -- zlib-compressed JSON list of bets
+    PRIMARY KEY (league, model, region)
+);
+
+-- One worker recomputes a league's value bets at a time
+CREATE TABLE IF NOT EXISTS value_bet_leases (
+    league TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+-- Per (event, market, bookmaker) digests of the odds each league's stored value bets were priced from
+CREATE TABLE IF NOT EXISTS value_bet_snapshots (
+    league TEXT PRIMARY KEY,
+    odds_fetched_at TEXT NOT NULL,
+    digests BLOB NOT NULL   -- zlib-compressed JSON {event: {"market|bookmaker": crc32}}
+);
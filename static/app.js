@@ -28,7 +28,9 @@ const state = {
     oddsLoaded: false,
     valueBetsLoaded: false,
     allValueBets: [],
-    filteredValueBets: [],
+    valueBetsCursor: null,
+    valueBetsRequest: 0,
+    explanations: new Map(),
     currentFilter: 'all',
     currentSort: 'ev-desc',
     minEV: -50,
@@ -40,6 +42,8 @@ const state = {
     oddsRegionFilter: 'both',
     selectedMatchId: 'all',
     allOddsData: [],
+    arbitrage: new Map(),
+    arbitrageRequest: 0,
     tableLoaded: false,
     summaryYears: 10
 };
@@ -650,7 +654,9 @@ async function loadLiveOdds() {
     loadingEl.style.display = 'flex';
     
     try {
-        const response = await fetch(`/api/live-odds?league=${state.currentLeague}`);
+        // Live odds show one league at a time
+        const league = state.currentLeague === 'all' ? document.getElementById('league-selector').value : state.currentLeague;
+        const response = await fetch(`/api/live-odds?league=${league}`);
         const data = await response.json();
         
         console.log('Live odds data received:', data);
@@ -673,6 +679,7 @@ async function loadLiveOdds() {
         populateMatchSelector(state.allOddsData);
         
         renderLiveOdds(state.allOddsData);
+        loadArbitrage();
         
         // Update timestamp
         const lastUpdated = new Date(data.last_updated);
@@ -711,72 +718,38 @@ function populateMatchSelector(matches) {
     });
 }
 
-// Calculate arbitrage opportunity for any number of outcomes
-function calculateArbitrage(...odds) {
-    // Filter out null/undefined/zero values
-    const validOdds = odds.filter(o => o && o > 0);
+// Load best prices and arbitrage margins for the live odds league, from the server's scan
+async function loadArbitrage() {
+    const requestId = ++state.arbitrageRequest;
+    const league = state.currentLeague === 'all' ? document.getElementById('league-selector').value : state.currentLeague;
     
-    if (validOdds.length < 2) return null;
-    
-    const totalImplied = validOdds.reduce((sum, odd) => sum + (1 / odd), 0);
-    
-    // If total < 1, there's an arbitrage opportunity
-    const isArbitrage = totalImplied < 1;
-    const percentage = ((1 - totalImplied) * 100);  // Positive = profit, Negative = loss
+    try {
+        // Every complete outcome set, not just the arbitrages, so each card can show its margin
+        const response = await fetch(`/api/arbitrage?league=${league}&region=${state.oddsRegionFilter}&min_margin=-100`);
+        const data = await response.json();
+        if (requestId !== state.arbitrageRequest) return;
+        
+        state.arbitrage = new Map();
+        (data.opportunities || []).forEach(opportunity => {
+            if (!state.arbitrage.has(opportunity.event_id)) state.arbitrage.set(opportunity.event_id, []);
+            state.arbitrage.get(opportunity.event_id).push(opportunity);
+        });
+    } catch (error) {
+        console.error('Error loading arbitrage:', error);
+        if (requestId !== state.arbitrageRequest) return;
+        state.arbitrage = new Map();
+    }
     
-    return {
-        isArbitrage,
-        percentage: percentage.toFixed(2),
-        totalImplied: (totalImplied * 100).toFixed(2)
-    };
+    renderLiveOdds(state.allOddsData);
 }
 
-// Get best odds for over/under markets
-function getBestOverUnderOdds(bookmakers) {
-    const lines = new Map();
-    
-    bookmakers.forEach(bm => {
-        if (bm.totals) {
-            Object.keys(bm.totals).forEach(outcome => {
-                const { point, price } = bm.totals[outcome];
-                const key = `${outcome}_${point}`;
-                
-                if (!lines.has(key) || price > lines.get(key).odds) {
-                    lines.set(key, { 
-                        outcome, 
-                        point, 
-                        odds: price, 
-                        bookmaker: bm.name 
-                    });
-                }
-            });
-        }
-    });
-    
-    return Array.from(lines.values());
-}
-
-// Get best odds across all bookmakers
-function getBestOdds(bookmakers, homeTeam, awayTeam) {
-    let bestHome = { odds: 0, bookmaker: '' };
-    let bestDraw = { odds: 0, bookmaker: '' };
-    let bestAway = { odds: 0, bookmaker: '' };
-    
-    bookmakers.forEach(bm => {
-        if (bm.h2h) {
-            if (bm.h2h[homeTeam] && bm.h2h[homeTeam] > bestHome.odds) {
-                bestHome = { odds: bm.h2h[homeTeam], bookmaker: bm.name };
-            }
-            if (bm.h2h['Draw'] && bm.h2h['Draw'] > bestDraw.odds) {
-                bestDraw = { odds: bm.h2h['Draw'], bookmaker: bm.name };
-            }
-            if (bm.h2h[awayTeam] && bm.h2h[awayTeam] > bestAway.odds) {
-                bestAway = { odds: bm.h2h[awayTeam], bookmaker: bm.name };
-            }
-        }
-    });
-    
-    return { bestHome, bestDraw, bestAway };
+// Arbitrage margin badge for a server outcome set
+function renderArbitrageBadge(opportunity) {
+    if (!opportunity) return '';
+    return `
+                    <div class="arbitrage-alert-compact ${opportunity.is_arbitrage ? 'arb-profit' : 'arb-loss'}">
+                        ${opportunity.is_arbitrage ? '🎯 Arbitrage: +' : '⚠️ '}${opportunity.margin_percentage.toFixed(2)}%
+                    </div>`;
 }
 
 // Render live odds
@@ -827,53 +800,14 @@ function renderLiveOdds(matches) {
             uk_bookmakers = [];
         }
         
-        // Combine all bookmakers for calculations
-        const allBookmakers = [...uk_bookmakers, ...us_bookmakers];
-        const bestOdds = getBestOdds(allBookmakers, match.home_team, match.away_team);
-        
-        // Calculate moneyline arbitrage
-        const moneylineArb = calculateArbitrage(
-            bestOdds.bestHome.odds,
-            bestOdds.bestDraw.odds,
-            bestOdds.bestAway.odds
-        );
-        
-        // Get best over/under odds for common lines
-        let overUnderArb = null;
-        const bestOverUnder = { over: null, under: null, line: null };
-        
-        // Find most common totals line (usually 2.5)
-        const totalsMap = new Map();
-        allBookmakers.forEach(bm => {
-            if (bm.totals) {
-                Object.keys(bm.totals).forEach(outcome => {
-                    const { point, price } = bm.totals[outcome];
-                    const key = point;
-                    if (!totalsMap.has(key)) totalsMap.set(key, { over: null, under: null });
-                    
-                    if (outcome.toLowerCase() === 'over') {
-                        if (!totalsMap.get(key).over || price > totalsMap.get(key).over.odds) {
-                            totalsMap.get(key).over = { odds: price, bookmaker: bm.name };
-                        }
-                    } else if (outcome.toLowerCase() === 'under') {
-                        if (!totalsMap.get(key).under || price > totalsMap.get(key).under.odds) {
-                            totalsMap.get(key).under = { odds: price, bookmaker: bm.name };
-                        }
-                    }
-                });
-            }
-        });
-        
-        // Find the most complete line (both over and under available)
-        for (const [line, data] of totalsMap.entries()) {
-            if (data.over && data.under) {
-                bestOverUnder.over = data.over;
-                bestOverUnder.under = data.under;
-                bestOverUnder.line = line;
-                overUnderArb = calculateArbitrage(data.over.odds, data.under.odds);
-                break; // Use first complete line found
-            }
-        }
+        // Best prices and margins come from the server's arbitrage scan (same region filter)
+        const opportunities = state.arbitrage.get(match.id) || [];
+        const moneyline = opportunities.find(o => o.market === 'h2h');
+        const goalLines = opportunities.filter(o => o.market === 'totals');
+        const overUnder = goalLines.find(o => o.point === 2.5) || goalLines[0];
+        const legs = opportunity => Object.fromEntries(opportunity.legs.map(leg => [leg.side, leg]));
+        const bestOdds = moneyline ? legs(moneyline) : null;
+        const bestOverUnder = overUnder ? legs(overUnder) : null;
         
         html += `
             <div class="odds-card">
@@ -884,54 +818,46 @@ function renderLiveOdds(matches) {
                     </div>
                 </div>
                 
-                ${bestOdds.bestHome.odds > 0 ? `
+                ${bestOdds ? `
                 <div class="best-odds-summary">
                     <h4 style="font-size: 0.8125rem; font-weight: 600; color: var(--gray-700); margin-bottom: 0.5rem;">Moneyline - Best Odds:</h4>
                     <div class="best-odds-grid">
                         <div class="best-odds-item">
                             <div class="outcome-label">${match.home_team}</div>
-                            <div class="outcome-odds">${bestOdds.bestHome.odds.toFixed(2)}</div>
-                            <div class="outcome-bookmaker">${bestOdds.bestHome.bookmaker}</div>
+                            <div class="outcome-odds">${bestOdds.home.odds.toFixed(2)}</div>
+                            <div class="outcome-bookmaker">${bestOdds.home.bookmaker}</div>
                         </div>
                         <div class="best-odds-item">
                             <div class="outcome-label">Draw</div>
-                            <div class="outcome-odds">${bestOdds.bestDraw.odds.toFixed(2)}</div>
-                            <div class="outcome-bookmaker">${bestOdds.bestDraw.bookmaker}</div>
+                            <div class="outcome-odds">${bestOdds.draw.odds.toFixed(2)}</div>
+                            <div class="outcome-bookmaker">${bestOdds.draw.bookmaker}</div>
                         </div>
                         <div class="best-odds-item">
                             <div class="outcome-label">${match.away_team}</div>
-                            <div class="outcome-odds">${bestOdds.bestAway.odds.toFixed(2)}</div>
-                            <div class="outcome-bookmaker">${bestOdds.bestAway.bookmaker}</div>
+                            <div class="outcome-odds">${bestOdds.away.odds.toFixed(2)}</div>
+                            <div class="outcome-bookmaker">${bestOdds.away.bookmaker}</div>
                         </div>
                     </div>
-                    ${moneylineArb ? `
-                    <div class="arbitrage-alert-compact ${moneylineArb.isArbitrage ? 'arb-profit' : 'arb-loss'}">
-                        ${moneylineArb.isArbitrage ? '🎯 Arbitrage: +' : '⚠️ '}${moneylineArb.percentage}%
-                    </div>
-                    ` : ''}
+                    ${renderArbitrageBadge(moneyline)}
                 </div>
                 ` : ''}
                 
-                ${bestOverUnder.over && bestOverUnder.under ? `
+                ${bestOverUnder ? `
                 <div class="best-odds-summary">
-                    <h4 style="font-size: 0.8125rem; font-weight: 600; color: var(--gray-700); margin-bottom: 0.5rem;">Goals O/U ${bestOverUnder.line} - Best Odds:</h4>
+                    <h4 style="font-size: 0.8125rem; font-weight: 600; color: var(--gray-700); margin-bottom: 0.5rem;">Goals O/U ${overUnder.point} - Best Odds:</h4>
                     <div class="best-odds-grid" style="grid-template-columns: repeat(2, 1fr);">
                         <div class="best-odds-item">
-                            <div class="outcome-label">Over ${bestOverUnder.line}</div>
+                            <div class="outcome-label">Over ${overUnder.point}</div>
                             <div class="outcome-odds">${bestOverUnder.over.odds.toFixed(2)}</div>
                             <div class="outcome-bookmaker">${bestOverUnder.over.bookmaker}</div>
                         </div>
                         <div class="best-odds-item">
-                            <div class="outcome-label">Under ${bestOverUnder.line}</div>
+                            <div class="outcome-label">Under ${overUnder.point}</div>
                             <div class="outcome-odds">${bestOverUnder.under.odds.toFixed(2)}</div>
                             <div class="outcome-bookmaker">${bestOverUnder.under.bookmaker}</div>
                         </div>
                     </div>
-                    ${overUnderArb ? `
-                    <div class="arbitrage-alert-compact ${overUnderArb.isArbitrage ? 'arb-profit' : 'arb-loss'}">
-                        ${overUnderArb.isArbitrage ? '🎯 Arbitrage: +' : '⚠️ '}${overUnderArb.percentage}%
-                    </div>
-                    ` : ''}
+                    ${renderArbitrageBadge(overUnder)}
                 </div>
                 ` : ''}
                 
@@ -1245,17 +1171,68 @@ function renderLayBettingTable(homeTeam, awayTeam, bookmakers) {
     return html;
 }
 
-// Load value bets
-async function loadValueBets() {
+// Kickoff window [from, to) for the date filter, or null for all dates
+function kickoffWindow(dateFilter) {
+    const now = new Date();
+    const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
+    const day = 24 * 60 * 60 * 1000;
+    
+    if (dateFilter === 'today') {
+        return [today, new Date(today.getTime() + day)];
+    } else if (dateFilter === 'tomorrow') {
+        return [new Date(today.getTime() + day), new Date(today.getTime() + 2 * day)];
+    } else if (dateFilter === 'weekend') {
+        // The coming Saturday and Sunday (or just today if it's Sunday)
+        if (today.getDay() === 0) {
+            return [today, new Date(today.getTime() + day)];
+        }
+        const saturday = new Date(today.getTime() + (6 - today.getDay()) * day);
+        return [saturday, new Date(saturday.getTime() + 2 * day)];
+    } else if (dateFilter === 'week') {
+        return [today, new Date(today.getTime() + 7 * day)];
+    }
+    return null;
+}
+
+// Query string for the value bets filters; the server filters, sorts and pages
+function valueBetsQuery(cursor) {
+    const params = new URLSearchParams({
+        region: state.currentRegion,
+        model: state.currentAIModel,
+        league: state.currentLeague,
+        sort: state.currentSort,
+        min_ev: state.minEV,
+        bet_type: state.currentFilter
+    });
+    const kickoff = kickoffWindow(state.currentDateFilter);
+    if (kickoff) {
+        params.set('kickoff_from', kickoff[0].toISOString());
+        params.set('kickoff_to', kickoff[1].toISOString());
+    }
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return params.toString();
+}
+
+// Load value bets (the next page when `append` is set)
+async function loadValueBets(append = false) {
     const loadingEl = document.getElementById('value-loading');
     const containerEl = document.getElementById('value-bets-container');
     const timestampEl = document.getElementById('value-timestamp');
     
-    loadingEl.style.display = 'flex';
+    // Only the latest request may render (filters can change mid-flight)
+    const requestId = ++state.valueBetsRequest;
+    if (!append) {
+        loadingEl.style.display = 'flex';
+    }
     
     try {
-        const response = await fetch(`/api/value-bets?region=${state.currentRegion}&model=${state.currentAIModel}&league=${state.currentLeague}`);
+        const response = await fetch(`/api/value-bets?${valueBetsQuery(append ? state.valueBetsCursor : null)}`);
         const data = await response.json();
+        if (requestId !== state.valueBetsRequest) {
+            return;
+        }
         
         if (data.error) {
             loadingEl.style.display = 'none';
@@ -1264,11 +1241,16 @@ async function loadValueBets() {
         }
         
         loadingEl.style.display = 'none';
-        state.allValueBets = data.value_bets || [];
+        const page = data.value_bets || [];
+        state.allValueBets = append ? state.allValueBets.concat(page) : page;
+        state.valueBetsCursor = data.next_cursor;
         state.valueBetsLoaded = true;
         
-        // Apply initial filters and render
-        filterAndRenderValueBets();
+        // Update count
+        document.getElementById('bet-count').textContent = data.matched_bets;
+        document.getElementById('total-bets').textContent = data.total_bets;
+        
+        renderValueBets(state.allValueBets);
         
         // Update timestamp
         const lastUpdated = new Date(data.last_updated);
@@ -1327,7 +1309,7 @@ function setupValueBetsFilters() {
                 'complex': '🧠 Multi-factor AI - Uses historical data, home advantage factor, weighted recent form, and team strength metrics',
                 'form_momentum': '📈 Form & Momentum - ELO-style power ratings, exponentially weighted recent form (last 5 games), head-to-head record, and goal scoring momentum trends',
                 'sentiment_external': '🔥 Sentiment & External Data - Fantasy Premier League ownership & transfers, player injury impact, price momentum, and team strength index combining all external factors',
-                'anomaly': '🎯 Bookmaker Anomaly Detector - Finds bookmakers offering 25%+ better odds than the market average'
+                'anomaly': '🎯 Bookmaker Anomaly Detector - Finds bookmakers whose margin-adjusted odds are robust outliers against the market consensus, in every market'
             };
             
             modelDescription.innerHTML = `<small>${descriptions[state.currentAIModel]}</small>`;
@@ -1362,7 +1344,7 @@ function setupValueBetsFilters() {
         evSlider.addEventListener('input', (e) => {
             state.minEV = parseFloat(e.target.value);
             evValue.textContent = state.minEV + '%';
-            filterAndRenderValueBets();
+            filterAndRenderValueBets(250);
         });
     }
     
@@ -1385,6 +1367,7 @@ function setupValueBetsFilters() {
             chip.classList.add('active');
             state.oddsRegionFilter = chip.dataset.oddsRegion;
             renderLiveOdds(state.allOddsData);
+            loadArbitrage();
         });
     });
     
@@ -1417,70 +1400,78 @@ function setupValueBetsFilters() {
     }
 }
 
-// Filter and render value bets
-function filterAndRenderValueBets() {
-    let filtered = [...state.allValueBets];
-    
-    // Apply date filter
-    if (state.currentDateFilter !== 'all') {
-        const now = new Date();
-        const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
-        const tomorrow = new Date(today.getTime() + 24 * 60 * 60 * 1000);
-        const nextWeek = new Date(today.getTime() + 7 * 24 * 60 * 60 * 1000);
-        
-        filtered = filtered.filter(bet => {
-            const matchDate = new Date(bet.commence_time);
-            const matchDay = new Date(matchDate.getFullYear(), matchDate.getMonth(), matchDate.getDate());
-            
-            if (state.currentDateFilter === 'today') {
-                return matchDay.getTime() === today.getTime();
-            } else if (state.currentDateFilter === 'tomorrow') {
-                return matchDay.getTime() === tomorrow.getTime();
-            } else if (state.currentDateFilter === 'weekend') {
-                const day = matchDay.getDay();
-                return (day === 6 || day === 0) && matchDay >= today && matchDay < nextWeek;
-            } else if (state.currentDateFilter === 'week') {
-                return matchDay >= today && matchDay < nextWeek;
-            }
-            return true;
-        });
+// Re-query the server when a filter changes (debounced for the EV slider)
+let valueBetsFilterTimer = null;
+function filterAndRenderValueBets(delay = 0) {
+    clearTimeout(valueBetsFilterTimer);
+    valueBetsFilterTimer = setTimeout(() => loadValueBets(), delay);
+}
+
+// Explanations are fetched only for the cards the user expands, batched per tick
+let pendingExplanations = new Set();
+let explanationTimer = null;
+
+function toggleExplanation(button) {
+    const key = button.dataset.key;
+    const explanationEl = button.parentElement.querySelector('.bet-explanation');
+    
+    if (explanationEl.style.display !== 'none') {
+        explanationEl.style.display = 'none';
+        button.textContent = 'Why?';
+        return;
     }
+    explanationEl.style.display = 'block';
+    button.textContent = 'Hide';
     
-    // Apply type filter
-    if (state.currentFilter !== 'all') {
-        filtered = filtered.filter(bet => bet.bet_type === state.currentFilter);
+    if (state.explanations.has(key)) {
+        showExplanation(explanationEl, state.explanations.get(key));
+        return;
+    }
+    explanationEl.innerHTML = '<em>Loading explanation...</em>';
+    pendingExplanations.add(key);
+    clearTimeout(explanationTimer);
+    explanationTimer = setTimeout(fetchExplanations, 50);
+}
+
+function showExplanation(el, text) {
+    el.innerHTML = `<em>${text || 'No explanation available for this bet.'}</em>`;
+}
+
+async function fetchExplanations() {
+    const keys = [...pendingExplanations];
+    pendingExplanations = new Set();
+    if (keys.length === 0) {
+        return;
+    }
+    
+    let explanations = {};
+    try {
+        const response = await fetch('/api/value-bets/explain', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ keys })
+        });
+        const data = await response.json();
+        explanations = data.explanations || {};
+        Object.entries(explanations).forEach(([key, text]) => state.explanations.set(key, text));
+    } catch (error) {
+        console.error('Error loading explanations:', error);
     }
     
-    // Apply min EV filter
-    filtered = filtered.filter(bet => bet.ev >= state.minEV);
-    
-    // Apply sorting
-    filtered.sort((a, b) => {
-        switch (state.currentSort) {
-            case 'ev-desc':
-                return b.ev - a.ev;
-            case 'ev-asc':
-                return a.ev - b.ev;
-            case 'odds-desc':
-                return b.best_odds - a.best_odds;
-            case 'odds-asc':
-                return a.best_odds - b.best_odds;
-            default:
-                return b.ev - a.ev;
+    document.querySelectorAll('.bet-explanation').forEach(el => {
+        if (keys.includes(el.dataset.key)) {
+            showExplanation(el, explanations[el.dataset.key]);
         }
     });
-    
-    state.filteredValueBets = filtered;
-    
-    // Update count
-    document.getElementById('bet-count').textContent = filtered.length;
-    document.getElementById('total-bets').textContent = state.allValueBets.length;
-    
-    // Render
-    renderValueBets(filtered);
 }
 
 // Render value bets
+// Display name for a league key (from the league selector, else the key itself)
+function leagueLabel(league) {
+    const option = document.querySelector(`#value-league-selector option[value="${league}"]`);
+    return option ? option.textContent : league.replace(/^soccer_/, '').replace(/_/g, ' ');
+}
+
 function renderValueBets(bets) {
     const containerEl = document.getElementById('value-bets-container');
     
@@ -1510,17 +1501,21 @@ function renderValueBets(bets) {
         const evWidth = bet.ev >= 0 ? Math.min(bet.ev, 100) : 0;
         const evBarClass = bet.ev >= 0 ? 'ev-bar-fill' : 'ev-bar-fill-negative';
         
-        // Check if this is an anomaly bet
-        const isAnomaly = bet.explanation && bet.explanation.includes('Anomaly detected');
+        // Priced at an outlying bookmaker (anomaly model, or the overall model's anomaly bonus)
+        const isAnomaly = bet.is_anomaly === true;
+        const explanationKey = (bet.explanation_key || '').replace(/"/g, '&quot;');
         
         html += `
             <div class="value-bet-card ${isAnomaly ? 'anomaly-bet' : ''}">
                 ${isAnomaly ? '<div class="anomaly-badge">🔥 ANOMALY</div>' : ''}
                 <div class="bet-match-info">
                     <h3>${bet.match}</h3>
-                    <div class="bet-market">${bet.bet_type} | ${bet.market}</div>
+                    <div class="bet-market">${state.currentLeague === 'all' && bet.league ? `${leagueLabel(bet.league)} | ` : ''}${bet.bet_type} | ${bet.market}</div>
                     <div class="bet-time">${matchTimeStr}</div>
-                    ${bet.explanation ? `<div class="bet-explanation"><em>${bet.explanation}</em></div>` : ''}
+                    ${bet.explanation_key ? `
+                    <button class="explain-toggle" data-key="${explanationKey}" onclick="toggleExplanation(this)">Why?</button>
+                    <div class="bet-explanation" data-key="${explanationKey}" style="display: none;"></div>
+                    ` : ''}
                 </div>
                 
                 <div class="bet-stat-col">
@@ -1552,6 +1547,10 @@ function renderValueBets(bets) {
         `;
     });
     
+    if (state.valueBetsCursor) {
+        html += `<div class="load-more"><button class="btn btn-secondary" onclick="loadValueBets(true)">Load more</button></div>`;
+    }
+    
     containerEl.innerHTML = html;
 }
 
@@ -0,0 +1,100 @@
+"""
+Shared setup for the test suite.
+
+app.py opens premier_league.db and its cache files relative to the working
+directory and initializes the database when it is imported, so the suite
+runs in a scratch directory seeded with synthetic matches (no network
+import) before the app module is loaded. External APIs point at a closed
+port and background work is switched off.
+"""
+
+import atexit
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='betting-tests-')
+atexit.register(shutil.rmtree, WORKDIR, True)
+
+os.environ.update({
+    'ODDS_API_KEY': 'test',
+    'ODDS_API_BASE_URL': 'http://127.0.0.1:9/v4',
+    'FPL_API_BASE': 'http://127.0.0.1:9/fpl',
+    'MODEL_WEIGHTS_AUTO_REFIT': 'false',
+    'VALUE_BET_PRECOMPUTE': 'false',
+    'PRICING_PROCESSES': '0',
+})
+
+sys.path.insert(0, ROOT)
+from replay_server import SYNTHETIC_TEAMS  # noqa: E402  (does not import the app)
+
+
+def _seed_matches(path, seed=11, weeks=160):
+    """Weekly rounds between the synthetic teams, ending yesterday"""
+    rng = random.Random(seed)
+    teams = SYNTHETIC_TEAMS[:]
+    db = sqlite3.connect(path)
+    with open(os.path.join(ROOT, 'schema.sql'), 'r') as f:
+        db.executescript(f.read())
+    rows = []
+    day = date.today() - timedelta(days=1 + 7 * weeks)
+    for _ in range(weeks):
+        day += timedelta(days=7)
+        rng.shuffle(teams)
+        season = f"{day.year - (day.month < 8)}-{str(day.year + (day.month >= 8))[2:]}"
+        for home, away in zip(teams[::2], teams[1::2]):
+            home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 3)
+            home_1h, away_1h = rng.randint(0, home_goals), rng.randint(0, away_goals)
+            rows.append((
+                day.isoformat(), season, home, away, home_goals, away_goals, home_1h, away_1h,
+                home_goals - home_1h, away_goals - away_1h, rng.randint(2, 10), rng.randint(1, 8),
+                rng.randint(0, 5), rng.randint(0, 4), 'Referee', 'Stadium',
+                round(rng.uniform(1.5, 4), 2), round(rng.uniform(3, 4), 2), round(rng.uniform(1.8, 6), 2)
+            ))
+    db.executemany('''
+        INSERT INTO matches (match_date, season, home_team, away_team, home_goals_full_time, away_goals_full_time,
+                             home_goals_first_half, away_goals_first_half, home_goals_second_half,
+                             away_goals_second_half, home_corners_total, away_corners_total,
+                             home_corners_first_half, away_corners_first_half, referee, venue,
+                             odds_home_b365, odds_draw_b365, odds_away_b365)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    db.executemany('INSERT OR IGNORE INTO teams (name) VALUES (?)', [(team,) for team in teams])
+    db.commit()
+    db.close()
+
+
+_seed_matches(os.path.join(WORKDIR, 'premier_league.db'))
+os.chdir(WORKDIR)
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    return app_module
+
+
+@pytest.fixture
+def synthetic_odds():
+    """replay_server.synthetic_odds(league, seed, events) with a seeded RNG"""
+    from replay_server import synthetic_odds as build
+
+    def make(league='soccer_epl', seed=1, events=10):
+        return build(league, random.Random(seed), events=events)
+    return make
+
+
+@pytest.fixture
+def client(app):
+    test_client = app.app.test_client()
+    with test_client.session_transaction() as session:
+        session['authenticated'] = True
+    return test_client
@@ -0,0 +1,109 @@
+"""ArbitrageScanner totals and stake splits"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+REGIONS = ('both', 'uk', 'us')
+
+
+@pytest.fixture
+def payload(synthetic_odds):
+    data = synthetic_odds(seed=3, events=20)
+    rng = random.Random(3)
+    # Exchange lay prices for some fixtures, and one fixture with a clear back arbitrage
+    for match in data[:6]:
+        bookmaker = match['bookmakers'][0]
+        h2h = next(market for market in bookmaker['markets'] if market['key'] == 'h2h')
+        bookmaker['markets'].append({'key': 'h2h_lay', 'outcomes': [
+            dict(outcome, price=round(outcome['price'] * rng.uniform(0.9, 1.05), 2)) for outcome in h2h['outcomes']
+        ]})
+    for outcome in data[7]['bookmakers'][0]['markets'][0]['outcomes']:
+        outcome['price'] = round(outcome['price'] * 1.6, 2)
+    return data
+
+
+def best_back_totals(app, data, region):
+    """Implied totals of the best back prices per complete outcome set, by brute force"""
+    totals = {}
+    for match in data:
+        best = {}
+        for bookmaker in match['bookmakers']:
+            if region != 'both' and (app.bookmaker_region(bookmaker['key']) == 'US') != (region == 'us'):
+                continue
+            for market in bookmaker['markets']:
+                for outcome in market['outcomes']:
+                    key = (market['key'], outcome['name'], outcome.get('point'))
+                    best[key] = max(best.get(key, 0), outcome['price'])
+        event = app.odds_event_key(match)
+        h2h = [best.get(('h2h', name, None)) for name in (match['home_team'], 'Draw', match['away_team'])]
+        if all(h2h):
+            totals[(event, 'h2h', None)] = sum(1 / price for price in h2h)
+        for (market, name, point), price in best.items():
+            if market == 'totals' and name == 'Over' and ('totals', 'Under', point) in best:
+                totals[(event, 'totals', point)] = 1 / price + 1 / best[('totals', 'Under', point)]
+            if market == 'spreads' and name == match['home_team'] and ('spreads', match['away_team'], -point) in best:
+                totals[(event, 'spreads', point)] = 1 / price + 1 / best[('spreads', match['away_team'], -point)]
+    return totals
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_scan_covers_every_complete_set(app, payload, region):
+    opportunities = app.ArbitrageScanner().scan('test_arbitrage', payload, region)
+    expected = best_back_totals(app, payload, region)
+    found = {(o['event_id'], o['market'], o['point']): o['total_implied']
+             for o in opportunities if o['market'] != 'h2h_lay'}
+    assert found.keys() == expected.keys()
+    for key, total in found.items():
+        assert total == pytest.approx(expected[key], abs=1e-4)
+    margins = [o['margin_percentage'] for o in opportunities]
+    assert margins == sorted(margins, reverse=True)
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_back_stakes_pay_the_same_whatever_the_result(app, payload, region):
+    scanner = app.ArbitrageScanner(stake=100)
+    for opportunity in scanner.scan('test_arbitrage', payload, region):
+        if opportunity['market'] == 'h2h_lay':
+            continue
+        legs = opportunity['legs']
+        assert sum(leg['stake'] for leg in legs) == pytest.approx(100, abs=0.05)
+        payouts = [leg['payout'] for leg in legs]
+        assert max(payouts) - min(payouts) < 0.05
+        assert opportunity['guaranteed_profit'] == pytest.approx(payouts[0] - 100, abs=0.05)
+        assert opportunity['is_arbitrage'] == (opportunity['guaranteed_profit'] > 0)
+
+
+def test_back_lay_stakes_hedge_after_commission(app, payload):
+    commission = 0.02
+    scanner = app.ArbitrageScanner(stake=100, commission=commission)
+    pairs = [o for o in scanner.scan('test_arbitrage', payload) if o['market'] == 'h2h_lay']
+    assert pairs
+    for opportunity in pairs:
+        back, lay = opportunity['legs']
+        assert (back['type'], lay['type']) == ('back', 'lay')
+        # Selection wins: back pays out, the lay liability is lost; otherwise the lay stake is won less commission
+        if_wins = back['payout'] - back['stake'] - lay['liability']
+        if_loses = lay['stake'] * (1 - commission) - back['stake']
+        assert if_wins == pytest.approx(if_loses, abs=0.05)
+        assert opportunity['guaranteed_profit'] == pytest.approx(if_wins, abs=0.05)
+
+
+def test_scans_are_cached_per_fetch(app, payload):
+    scanner = app.ArbitrageScanner()
+    fetched_at = datetime.utcnow()
+    first = scanner.get('test_arbitrage', (payload, fetched_at))
+    assert scanner.get('test_arbitrage', (payload, fetched_at)) is first
+    assert scanner.get('test_arbitrage', (payload, fetched_at + timedelta(seconds=1))) is not first
+
+
+def test_endpoint_requires_login_and_defaults_to_near_margin(app, client, payload):
+    app.ODDS_CACHE.set('soccer_epl', payload)
+    assert app.app.test_client().get('/api/arbitrage').status_code == 302
+
+    body = client.get('/api/arbitrage?league=soccer_epl').get_json()
+    assert body['total_opportunities'] > 0
+    assert all(o['margin_percentage'] >= -app.ARBITRAGE_SCANNER.near_margin for o in body['opportunities'])
+    everything = client.get('/api/arbitrage?league=soccer_epl&min_margin=-100').get_json()
+    assert everything['total_opportunities'] > body['total_opportunities']
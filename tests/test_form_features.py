@@ -0,0 +1,51 @@
+"""FormMomentumAnalyzer.features_for_fixtures against the per-fixture methods"""
+
+import numpy as np
+import pytest
+
+FIXTURES = [('Arsenal', 'Chelsea'), ('Liverpool', 'Man City'), ('Everton', 'Arsenal'), ('Wolves', 'Fulham')]
+# Teams without any history price from the defaults (moneyline only; goals need form)
+NEW_TEAM_FIXTURES = [('Chelsea', 'Unknown FC'), ('Unknown FC', 'Brighton')]
+
+
+@pytest.fixture(scope='module')
+def form(app):
+    analyzer = app.FormMomentumAnalyzer()
+    return analyzer, analyzer.features_for_fixtures(FIXTURES + NEW_TEAM_FIXTURES)
+
+
+def test_batch_probabilities_match_per_fixture(form):
+    analyzer, features = form
+    markets = [('moneyline', 'home_win'), ('moneyline', 'draw'), ('moneyline', 'away_win'),
+               ('goals', 'full_over_2.5'), ('goals', 'full_under_3.5'), ('goals', '1h_over_0.5')]
+    for index, (home, away) in enumerate(FIXTURES + NEW_TEAM_FIXTURES):
+        for bet_type, market in markets:
+            if bet_type == 'goals' and index >= len(FIXTURES):
+                continue
+            batch = analyzer.probability_from_features(features, index, bet_type, market)
+            single = analyzer.calculate_probability(home, away, bet_type, market)
+            assert batch == pytest.approx(single, abs=1e-9), (home, away, market)
+
+
+def test_batch_explanations_match_per_fixture(form):
+    analyzer, features = form
+    for index, (home, away) in enumerate(FIXTURES + NEW_TEAM_FIXTURES):
+        assert (analyzer.explanation_from_features(features, index)
+                == analyzer.get_explanation(home, away, 'moneyline', 'home_win'))
+
+
+def test_moneyline_components_match_calculate_moneyline(app, form):
+    analyzer, features = form
+    components, draw = analyzer.moneyline_components(features)
+    weights = np.array([app.MODEL_WEIGHTS['form_components'][name] for name in analyzer.MONEYLINE_COMPONENTS])
+    home_win = (components @ weights) * (1 - draw)
+    for index in range(len(features['fixtures'])):
+        assert home_win[index] == pytest.approx(
+            analyzer.probability_from_features(features, index, 'moneyline', 'home_win'), abs=1e-9)
+        assert draw[index] == pytest.approx(
+            analyzer.probability_from_features(features, index, 'moneyline', 'draw'), abs=1e-9)
+
+
+def test_empty_slate(app):
+    features = app.FormMomentumAnalyzer().features_for_fixtures([])
+    assert features['matrix'].shape == (0, len(features['columns']))
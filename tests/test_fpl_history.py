@@ -0,0 +1,8 @@
+"""FPL snapshot history endpoint"""
+
+
+def test_fpl_history_requires_login(app, client):
+    assert app.app.test_client().get('/api/fpl-history/Arsenal').status_code == 302
+
+    body = client.get('/api/fpl-history/Arsenal?days=100000').get_json()
+    assert body['team'] == 'Arsenal' and body['history'] == []
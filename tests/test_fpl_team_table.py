@@ -0,0 +1,30 @@
+"""FPLTeamTable records shared between threads"""
+
+import random
+
+import pytest
+
+from replay_server import synthetic_bootstrap
+
+
+@pytest.fixture
+def table(app):
+    return app.FPLTeamTable(synthetic_bootstrap(random.Random(5)))
+
+
+def test_lookups_return_the_shared_read_only_record(table):
+    record = table.get('Arsenal')
+    assert record is table.get('Arsenal')
+    assert len(record['top_players']) == 5 and record['top_player_ids'] == tuple(record['top_player_ids'])
+    with pytest.raises(TypeError):
+        record['net_transfers'] = 0
+    assert table.get('Unknown FC') is None
+
+
+def test_sentiment_model_reads_the_record(app, table, monkeypatch):
+    monkeypatch.setattr(app, 'FPL_DETAIL_FETCH', False)
+    monkeypatch.setattr(app.FPL_BOOTSTRAP_CACHE, 'team_table', lambda: table)
+    analyzer = app.SentimentExternalAnalyzer()
+    record = table.get('Chelsea')
+    assert analyzer.get_team_fpl_metrics('Chelsea') is record
+    assert analyzer.get_injury_impact('Chelsea')['impact'] == round((record['key_player_availability'] - 0.8) * 0.5, 3)
@@ -0,0 +1,127 @@
+"""HeadToHeadIndex and MatchStore against the head-to-head SQL query they replaced"""
+
+import random
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+PAIRS = [('Arsenal', 'Chelsea'), ('Chelsea', 'Arsenal'), ('Liverpool', 'Man City'), ('Wolves', 'Fulham'),
+         ('Arsenal', 'Unknown FC')]
+
+
+def sql_summary(app, home_team, away_team, num_matches=10, as_of_date=None):
+    """The OR query get_head_to_head used to run, with an optional point-in-time cutoff"""
+    query = '''
+        SELECT * FROM matches
+        WHERE ((home_team = ? AND away_team = ?) OR (home_team = ? AND away_team = ?))
+    '''
+    params = [home_team, away_team, away_team, home_team]
+    if as_of_date:
+        query += ' AND match_date < ?'
+        params.append(as_of_date)
+    query += ' ORDER BY match_date DESC LIMIT ?'
+    params.append(num_matches)
+    with closing(sqlite3.connect(app.DATABASE)) as db:
+        db.row_factory = sqlite3.Row
+        matches = db.execute(query, params).fetchall()
+    if not matches:
+        return None
+
+    home_wins = away_wins = draws = home_goals = away_goals = 0
+    for match in matches:
+        if match['home_team'] == home_team:
+            hg, ag = match['home_goals_full_time'], match['away_goals_full_time']
+        else:
+            hg, ag = match['away_goals_full_time'], match['home_goals_full_time']
+        home_goals += hg
+        away_goals += ag
+        home_wins += hg > ag
+        away_wins += hg < ag
+        draws += hg == ag
+    total = len(matches)
+    return {
+        'matches': total, 'home_wins': home_wins, 'away_wins': away_wins, 'draws': draws,
+        'home_win_rate': home_wins / total, 'away_win_rate': away_wins / total, 'draw_rate': draws / total,
+        'home_goals_avg': home_goals / total, 'away_goals_avg': away_goals / total
+    }
+
+
+def cutoffs(app):
+    with closing(sqlite3.connect(app.DATABASE)) as db:
+        first, last = db.execute('SELECT MIN(match_date), MAX(match_date) FROM matches').fetchone()
+    return [None, first, '2000-01-01', last, '2025-06-15', '2024-02-29']
+
+
+def insert_match(app, match_date, home_team, away_team, home_goals, away_goals):
+    with closing(sqlite3.connect(app.DATABASE)) as db:
+        cursor = db.execute('''
+            INSERT INTO matches (match_date, season, home_team, away_team, home_goals_full_time, away_goals_full_time)
+            VALUES (?, 'test', ?, ?, ?, ?)
+        ''', (match_date, home_team, away_team, home_goals, away_goals))
+        db.commit()
+        return cursor.lastrowid
+
+
+def delete_match(app, match_id):
+    with closing(sqlite3.connect(app.DATABASE)) as db:
+        db.execute('DELETE FROM matches WHERE id = ?', (match_id,))
+        db.commit()
+
+
+@pytest.mark.parametrize('num_matches', [1, 5, 10, 1000])
+def test_summary_matches_sql(app, num_matches):
+    store = app.get_match_store()
+    for home, away in PAIRS:
+        for as_of in cutoffs(app):
+            assert store.h2h.summary(home, away, num_matches, as_of) == sql_summary(app, home, away, num_matches, as_of)
+
+
+def test_out_of_order_adds_match_in_order_adds(app):
+    store = app.get_match_store()
+    rows = list(zip(range(len(store)), store.dates, store.home_teams, store.away_teams,
+                    store.home_goals, store.away_goals))
+    shuffled = rows[:]
+    random.Random(2).shuffle(shuffled)
+    ordered_index, shuffled_index = app.HeadToHeadIndex(), app.HeadToHeadIndex()
+    for row in rows:
+        ordered_index.add(*row)
+    for row in shuffled:
+        shuffled_index.add(*row)
+    for home, away in PAIRS:
+        for as_of in cutoffs(app):
+            assert shuffled_index.summary(home, away, 7, as_of) == ordered_index.summary(home, away, 7, as_of)
+
+
+def test_older_match_imported_later_rebuilds_the_pair(app):
+    store = app.MatchStore(check_interval=0).ensure_loaded()
+    entry = store.h2h._pairs[store.h2h.pair_key('Arsenal', 'Chelsea')]
+    oldest = entry['dates'][0]
+    match_id = insert_match(app, '2001-05-05', 'Chelsea', 'Arsenal', 4, 0)
+    try:
+        assert '2001-05-05' < oldest
+        assert store.sync() == 1
+        assert entry['dates'][0] == '2001-05-05'
+        for as_of in ['2001-05-06', oldest, None]:
+            for num_matches in (1, 3, 1000):
+                assert (store.h2h.summary('Arsenal', 'Chelsea', num_matches, as_of)
+                        == sql_summary(app, 'Arsenal', 'Chelsea', num_matches, as_of))
+    finally:
+        delete_match(app, match_id)
+
+
+def test_store_picks_up_matches_written_by_other_processes(app):
+    store = app.MatchStore(check_interval=0).ensure_loaded()
+    idle = app.MatchStore(check_interval=3600).ensure_loaded()
+    version = store.version
+    match_id = insert_match(app, '2099-01-01', 'Liverpool', 'Man City', 2, 2)
+    try:
+        assert idle.sync() == 0
+        assert store.sync() == 1 and store.version == version + 1
+        assert store.h2h.summary('Liverpool', 'Man City') == sql_summary(app, 'Liverpool', 'Man City')
+        assert store.sync() == 0
+    finally:
+        delete_match(app, match_id)
+    # A table that shrank (rebuilt database) is reloaded from scratch
+    assert store.sync() == len(store) and store.last_id < match_id
+    assert store.h2h.summary('Liverpool', 'Man City') == sql_summary(app, 'Liverpool', 'Man City')
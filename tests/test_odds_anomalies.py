@@ -0,0 +1,93 @@
+"""OddsAnomalyEngine against a per-outcome median / MAD computed by hand"""
+
+import statistics
+
+import pytest
+
+REGIONS = ('both', 'uk', 'us')
+
+
+@pytest.fixture
+def payload(synthetic_odds):
+    data = synthetic_odds(seed=5, events=24)
+    for match in data[:6]:
+        bookmaker = match['bookmakers'][0]
+        h2h = next(market for market in bookmaker['markets'] if market['key'] == 'h2h')
+        bookmaker['markets'].append({'key': 'h2h_lay', 'outcomes': [
+            dict(outcome, price=round(outcome['price'] * 1.02, 2)) for outcome in h2h['outcomes']
+        ]})
+    # One generous bookmaker per fixture for a few fixtures
+    for match in data[10:14]:
+        h2h = next(market for market in match['bookmakers'][1]['markets'] if market['key'] == 'h2h')
+        h2h['outcomes'][0]['price'] = round(h2h['outcomes'][0]['price'] * 1.5, 2)
+    return data
+
+
+def fair_probabilities(engine, tensor, mask, e, s):
+    """Each masked bookmaker's margin-free implied probability for slot s of event e"""
+    outcome_set = next((slots for _, _, slots in engine.outcome_sets(tensor) if s in slots), None)
+    probabilities = []
+    for b in range(len(tensor.bookmakers)):
+        price = tensor.prices[e, b, s]
+        if not mask[b] or price != price:
+            continue
+        if outcome_set is None:
+            probabilities.append(1 / price)
+            continue
+        legs = [tensor.prices[e, b, t] for t in outcome_set]
+        if any(leg != leg for leg in legs):
+            continue
+        probabilities.append((1 / price) / sum(1 / leg for leg in legs))
+    return probabilities
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_scan_matches_median_and_mad(app, payload, region):
+    engine = app.OddsAnomalyEngine()
+    tensor = app.OddsTensor(payload)
+    mask = tensor.region_mask(region)
+    result = engine.scan(tensor, mask)
+
+    for e in range(len(payload)):
+        for s, (market, _, _) in enumerate(tensor.slots):
+            probabilities = fair_probabilities(engine, tensor, mask, e, s)
+            record = engine.record(result, e, s)
+            if not probabilities:
+                assert record is None
+                continue
+            median = statistics.median(probabilities)
+            mad = statistics.median(abs(p - median) for p in probabilities)
+            scale = max(engine.MAD_SCALE * mad, engine.mad_floor)
+            direction = -1 if market == 'h2h_lay' else 1
+            robust_z = max(direction * (median - p) / scale for p in probabilities)
+
+            assert record['consensus_probability'] == pytest.approx(median, abs=1e-12)
+            assert record['robust_z'] == pytest.approx(round(robust_z, 2), abs=1e-9)
+            assert record['bookmakers'] == len(probabilities)
+            edge = direction * (median * record['odds'] - 1)
+            assert record['is_anomaly'] == (len(probabilities) >= engine.min_bookmakers
+                                            and round(robust_z, 9) >= engine.z_threshold and edge > 0)
+
+
+def test_generous_prices_are_flagged(app, payload):
+    engine = app.OddsAnomalyEngine()
+    tensor = app.OddsTensor(payload)
+    result = engine.scan(tensor, tensor.region_mask('both'))
+    home = tensor.slot('h2h', 'home')
+    for e in range(10, 14):
+        record = engine.record(result, e, home)
+        assert record['is_anomaly']
+        assert record['bookmaker'] == payload[e]['bookmakers'][1]['title']
+
+
+def test_empty_payload(app):
+    engine = app.OddsAnomalyEngine()
+    tensor = app.OddsTensor([])
+    assert engine.scan(tensor, tensor.region_mask('both'))['is_anomaly'].shape == (0, 0)
+
+
+def test_results_are_kept_per_payload(app, payload):
+    engine = app.OddsAnomalyEngine()
+    first = engine.get('test_anomalies', payload)
+    assert engine.get('test_anomalies', payload) is first
+    assert engine.get('test_anomalies', list(payload)) is not first
@@ -0,0 +1,23 @@
+"""Odds history endpoints: login and query clamping"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/api/odds-history/some-event', '/api/steam-moves'])
+def test_history_endpoints_require_login(app, path):
+    assert app.app.test_client().get(path).status_code == 302
+
+
+def test_steam_move_windows_are_clamped(app, client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app.ODDS_HISTORY, 'steam_moves', lambda **kwargs: calls.append(kwargs) or [])
+
+    assert client.get('/api/steam-moves?hours=100000&window=100000&min_bookmakers=0').status_code == 200
+    assert client.get('/api/steam-moves?hours=-5&window=-5').status_code == 200
+    widest, narrowest = calls
+    assert datetime.utcnow() - widest['since'] <= timedelta(days=7, seconds=5)
+    assert widest['window_minutes'] == 240 and widest['min_bookmakers'] == 2
+    assert datetime.utcnow() - narrowest['since'] >= timedelta(hours=1)
+    assert narrowest['window_minutes'] == 1
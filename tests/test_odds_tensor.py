@@ -0,0 +1,85 @@
+"""OddsTensor reductions against the per-match JSON walk they replaced"""
+
+import copy
+
+import pytest
+
+REGIONS = ('both', 'uk', 'us')
+
+
+def walk_best_prices(app, match, region_filter):
+    """
+    The pre-tensor walk of one match: best price per outcome (the first
+    bookmaker to reach it wins ties), keyed in first-seen order.
+    """
+    best = {}
+    for bookmaker in match.get('bookmakers', []):
+        key = bookmaker.get('key', '')
+        region = app.bookmaker_region(key)
+        if region_filter == 'uk' and region != 'UK' or region_filter == 'us' and region != 'US':
+            continue
+        for market in bookmaker.get('markets', []):
+            for outcome in market.get('outcomes', []):
+                name, point, price = outcome.get('name'), outcome.get('point'), outcome.get('price')
+                if market.get('key') == 'h2h':
+                    side = {match['home_team']: 'home', match['away_team']: 'away', 'Draw': 'draw'}.get(name)
+                    slot = ('h2h', side, None)
+                elif market.get('key') == 'totals':
+                    slot = ('totals', name.lower(), float(point))
+                elif market.get('key') == 'spreads':
+                    side = 'home' if name == match['home_team'] else 'away'
+                    slot = ('spreads', side, float(point))
+                else:
+                    continue
+                if slot not in best or price > best[slot]['odds']:
+                    best[slot] = {'odds': price, 'bookmaker': bookmaker.get('title'), 'region': region}
+    return best
+
+
+@pytest.fixture
+def payload(synthetic_odds):
+    data = synthetic_odds(seed=4, events=12)
+    # Ties between bookmakers, a second totals line and a bookmaker outside both regions
+    data[0]['bookmakers'][3]['markets'][0]['outcomes'][0]['price'] = 9.5
+    data[0]['bookmakers'][6]['markets'][0]['outcomes'][0]['price'] = 9.5
+    for bookmaker in data[1]['bookmakers'][::2]:
+        bookmaker['markets'][1]['outcomes'] += [{'name': 'Over', 'price': 3.1, 'point': 3.5},
+                                                {'name': 'Under', 'price': 1.35, 'point': 3.5}]
+    extra = copy.deepcopy(data[2]['bookmakers'][0])
+    extra.update(key='pinnacle', title='Pinnacle')
+    extra['markets'][0]['outcomes'][2]['price'] = 50.0
+    data[2]['bookmakers'].append(extra)
+    return data
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_best_quotes_match_json_walk(app, payload, region):
+    tensor = app.OddsTensor(payload)
+    summary = tensor.summary(tensor.region_mask(region))
+    for e, match in enumerate(payload):
+        expected = walk_best_prices(app, match, region)
+        quoted = {tensor.slots[s]: tensor.best_quote(summary, e, s)
+                  for s in range(len(tensor.slots)) if summary['count'][e, s]}
+        assert quoted == expected
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_lines_keep_payload_order(app, payload, region):
+    tensor = app.OddsTensor(payload)
+    summary = tensor.summary(tensor.region_mask(region))
+    for e, match in enumerate(payload):
+        expected = [slot for slot in walk_best_prices(app, match, region) if slot[0] == 'totals']
+        assert [tensor.slots[s] for s in tensor.event_slots(summary, e, 'totals')] == expected
+
+
+def test_tie_goes_to_first_bookmaker(app, payload):
+    tensor = app.OddsTensor(payload)
+    summary = tensor.summary(tensor.region_mask('both'))
+    quote = tensor.best_quote(summary, 0, tensor.slot('h2h', 'home'))
+    assert quote == {'odds': 9.5, 'bookmaker': payload[0]['bookmakers'][3]['title'], 'region': 'UK'}
+
+
+def test_for_payload_parses_once(app, payload):
+    first = app.OddsTensor.for_payload('test_tensor', payload)
+    assert app.OddsTensor.for_payload('test_tensor', payload) is first
+    assert app.OddsTensor.for_payload('test_tensor', copy.deepcopy(payload)) is not first
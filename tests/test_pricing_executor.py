@@ -0,0 +1,59 @@
+"""PricingExecutor pooled pricing against serial pricing"""
+
+import random
+
+import pytest
+
+from replay_server import synthetic_bootstrap
+
+MODELS = ('simple', 'complex', 'form_momentum')
+FPL_MODELS = ('sentiment_external', 'overall')
+
+
+@pytest.fixture
+def fpl_table(app, monkeypatch):
+    """A synthetic FPL snapshot in this process only - pricing workers can't fetch one"""
+    table = app.FPLTeamTable(synthetic_bootstrap(random.Random(8)))
+    monkeypatch.setattr(app, 'FPL_DETAIL_FETCH', False)
+    monkeypatch.setattr(app.FPL_BOOTSTRAP_CACHE, 'team_table', lambda: table)
+    return table
+
+
+def test_pooled_pricing_matches_serial(app, synthetic_odds):
+    executor = app.PricingExecutor(processes=2, min_fixtures=1, models=MODELS)
+    data = synthetic_odds(seed=22, events=9)
+    try:
+        for model in MODELS:
+            serial = app.price_league_value_bets('test_pool', data, model, 'both')
+            assert executor.price('test_pool', data, model, 'both', generation='g1') == serial
+            # Warm workers give the same result
+            assert executor.price('test_pool', data, model, 'both', generation='g1') == serial
+        assert executor.status()['parallel'] == 2 * len(MODELS)
+    finally:
+        executor.shutdown()
+
+
+def test_fpl_models_are_priced_from_the_parents_fpl_data(app, synthetic_odds, fpl_table):
+    executor = app.PricingExecutor(processes=2, min_fixtures=1, models=FPL_MODELS)
+    data = synthetic_odds(seed=23, events=9)
+    try:
+        for model in FPL_MODELS:
+            serial = app.price_league_value_bets('test_pool_fpl', data, model, 'both')
+            # FPL data moved the prices away from the no-data fallback
+            assert any(bet['ai_probability'] != 50 for bet in serial)
+            assert executor.price('test_pool_fpl', data, model, 'both', generation='g1') == serial
+            assert executor.price('test_pool_fpl', data, model, 'both') == serial
+        assert executor.status()['parallel'] == 2 * len(FPL_MODELS)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.parametrize('host_processes, web_workers, per_worker', [(4, 1, 4), (4, 2, 2), (3, 4, 0), (0, 1, 0)])
+def test_host_budget_is_split_between_web_workers(app, synthetic_odds, host_processes, web_workers, per_worker):
+    executor = app.PricingExecutor(processes=host_processes, min_fixtures=1, web_workers=web_workers)
+    assert executor.processes == per_worker
+    assert executor.status()['host_processes'] == host_processes
+    if not per_worker:
+        data = synthetic_odds(seed=24, events=4)
+        assert executor.price('test_pool', data, 'simple') == app.price_league_value_bets('test_pool', data, 'simple')
+        assert executor.status()['serial'] == 1 and not executor.status()['pool_started']
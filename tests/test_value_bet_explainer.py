@@ -0,0 +1,58 @@
+"""ValueBetExplainer explanations against the per-row text they replaced"""
+
+import pytest
+
+
+@pytest.mark.parametrize('model', ['simple', 'opponent', 'complex', 'form_momentum'])
+def test_explanations_match_per_row_text(app, synthetic_odds, model):
+    league = 'test_explain'
+    data = synthetic_odds(league, seed=23, events=8)
+    app.ODDS_CACHE.set(league, data)
+    bets = app.price_league_value_bets(league, data, model, 'both')
+    explanations = app.VALUE_BET_EXPLAINER.explain([bet['explanation_key'] for bet in bets])
+
+    analyzer = app.FormMomentumAnalyzer() if model == 'form_momentum' else app.AdvancedBettingAnalyzer()
+    checked = 0
+    for bet in bets:
+        _, _, _, _, market_type, market = app.ValueBetExplainer.parse_key(bet['explanation_key'])
+        home, away = bet['home_team'], bet['away_team']
+        if market_type == 'spreads':
+            side, point = market.split(':')
+            expected = f"Handicap betting: {home if side == 'home' else away} with {float(point):+.1f} goal handicap"
+        elif model == 'form_momentum':
+            expected = analyzer.get_explanation(home, away, market_type, market)
+        elif market_type == 'goals' and not market.startswith('full_'):
+            continue
+        else:
+            expected = analyzer.get_explanation(home, away, market_type, market, model=model)
+        assert explanations[bet['explanation_key']] == expected
+        checked += 1
+    assert checked
+
+
+def test_explanations_for_unknown_fixtures_are_none(app, synthetic_odds):
+    app.ODDS_CACHE.set('test_explain', synthetic_odds('test_explain', seed=24, events=2))
+    key = app.ValueBetExplainer.make_key('test_explain', 'simple', 'both', 'gone', 'moneyline', 'draw')
+    assert app.VALUE_BET_EXPLAINER.explain([key]) == {key: None}
+    with pytest.raises(ValueError):
+        app.ValueBetExplainer.parse_key('not-a-key')
+
+
+@pytest.mark.parametrize('model', ['anomaly', 'overall', 'complex'])
+def test_rows_priced_from_an_anomaly_are_flagged(app, synthetic_odds, model):
+    league = 'test_anomaly_flag'
+    data = synthetic_odds(league, seed=5, events=12)
+    for match in data[4:8]:
+        h2h = next(market for market in match['bookmakers'][1]['markets'] if market['key'] == 'h2h')
+        h2h['outcomes'][0]['price'] = round(h2h['outcomes'][0]['price'] * 1.5, 2)
+    bets = app.price_league_value_bets(league, data, model, 'both')
+    flagged = [bet for bet in bets if bet['is_anomaly']]
+    if model == 'complex':
+        assert bets and not flagged
+    elif model == 'anomaly':
+        assert bets and bets == flagged
+    else:
+        assert flagged
+        assert all(any(label.startswith('Anomaly+') for label in bet['models_used']) == bet['is_anomaly']
+                   for bet in bets if 'models_used' in bet)
+        assert not any(bet['is_anomaly'] for bet in bets if bet['bet_type'] == 'Spreads')
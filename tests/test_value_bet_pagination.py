@@ -0,0 +1,59 @@
+"""Top-k selection and cursor pagination of value bets"""
+
+import random
+
+import pytest
+
+from replay_server import synthetic_odds as build_synthetic_odds
+
+
+@pytest.fixture(scope='module')
+def priced(app):
+    data = build_synthetic_odds('soccer_epl', random.Random(25), events=20)
+    bets = app.price_league_value_bets('soccer_epl', data, 'simple', 'both')
+    # Repeated EVs exercise the row-id tie break
+    for bet in bets[::4]:
+        bet['ev'] = 5.0
+    return bets
+
+
+@pytest.mark.parametrize('sort', ['ev-desc', 'ev-asc', 'odds-desc', 'odds-asc'])
+def test_cursor_pages_cover_every_row_once(app, priced, sort):
+    field, descending = app.VALUE_BET_SORTS[sort]
+    expected = sorted(priced, key=lambda bet: (bet[field], app.value_bet_row_id(bet)), reverse=descending)
+
+    pages, cursor = [], None
+    while True:
+        page, matched, has_more = app.select_value_bets(priced, sort, limit=7, cursor=cursor)
+        assert matched == len(priced)
+        pages.extend(page)
+        if not has_more:
+            break
+        token = app.encode_value_bet_cursor(sort, page[-1])
+        cursor = app.decode_value_bet_cursor(token, sort)
+    assert pages == expected
+
+
+def test_cursor_pages_apply_the_filter(app, priced):
+    predicate = lambda bet: bet['bet_type'] == 'Moneyline'  # noqa: E731
+    page, matched, has_more = app.select_value_bets(priced, 'ev-desc', limit=1000, predicate=predicate)
+    assert matched == len(page) == sum(bet['bet_type'] == 'Moneyline' for bet in priced)
+    assert not has_more
+
+
+def test_cursor_rejects_other_sorts_and_garbage(app, priced):
+    token = app.encode_value_bet_cursor('ev-desc', priced[0])
+    with pytest.raises(ValueError):
+        app.decode_value_bet_cursor(token, 'odds-asc')
+    with pytest.raises(ValueError):
+        app.decode_value_bet_cursor('not a cursor', 'ev-desc')
+
+
+def test_endpoint_pages_with_next_cursor(app, client, synthetic_odds):
+    app.ODDS_CACHE.set('soccer_epl', synthetic_odds(seed=26, events=10))
+    first = client.get('/api/value-bets?league=soccer_epl&model=simple&limit=5').get_json()
+    assert len(first['value_bets']) == 5
+    second = client.get(f"/api/value-bets?league=soccer_epl&model=simple&limit=5&cursor={first['next_cursor']}").get_json()
+    ids = {app.value_bet_row_id(bet) for bet in first['value_bets']}
+    assert ids.isdisjoint(app.value_bet_row_id(bet) for bet in second['value_bets'])
+    assert client.get('/api/value-bets?league=soccer_epl&cursor=bogus').status_code == 400
@@ -0,0 +1,69 @@
+"""ValueBetPipeline incremental repricing against a full reprice"""
+
+import copy
+import json
+
+import pytest
+
+MODELS = ('simple', 'complex')
+
+
+def stored(bets):
+    """Rows as they come back from value_bet_results"""
+    return json.loads(json.dumps(bets))
+
+
+@pytest.fixture
+def pipeline(app):
+    return app.ValueBetPipeline(app.ODDS_CACHE, models=MODELS, enabled=False)
+
+
+def test_incremental_repricing_matches_full_reprice(app, pipeline, synthetic_odds):
+    league = 'test_incremental'
+    before = synthetic_odds(league, seed=21, events=12)
+    app.ODDS_CACHE.set(league, before)
+    assert pipeline.recompute(league) == len(MODELS) * len(pipeline.REGIONS)
+
+    after = copy.deepcopy(before)
+    # Moved UK and US prices, a rescheduled fixture and a withdrawn one
+    for match in after[:3]:
+        for outcome in match['bookmakers'][0]['markets'][0]['outcomes']:
+            outcome['price'] = round(outcome['price'] * 1.1, 2)
+    after[4]['bookmakers'][5]['markets'][1]['outcomes'][0]['price'] += 0.2
+    after[6]['commence_time'] = after[7]['commence_time']
+    del after[9]
+    app.ODDS_CACHE.set(league, after)
+    pipeline.recompute(league)
+
+    refresh = pipeline.last_refresh[league]
+    assert refresh['combinations_incremental'] == len(MODELS) * len(pipeline.REGIONS)
+    assert refresh['rows_reused'] > 0
+    for model in MODELS:
+        for region in pipeline.REGIONS:
+            incremental = pipeline.load(league, model, region)['bets']
+            full = stored(app.price_league_value_bets(league, after, model, region))
+            assert incremental == full, (model, region)
+
+
+def test_status_requires_login(app, client):
+    assert app.app.test_client().get('/api/value-bets-status').status_code == 302
+    status = client.get('/api/value-bets-status').get_json()
+    assert 'pricing' in status and 'explainer' in status
+
+
+def test_weights_refit_by_another_worker_are_picked_up(app, monkeypatch, tmp_path):
+    path = str(tmp_path / 'model_weights.json')
+    monkeypatch.setattr(app, 'MODEL_WEIGHTS_FILE', path)
+    monkeypatch.setattr(app, 'MODEL_WEIGHTS', copy.deepcopy(app.MODEL_WEIGHTS))
+    monkeypatch.setattr(app, 'MODEL_WEIGHTS_MTIME', None)
+    pipeline = app.ValueBetPipeline(app.ODDS_CACHE, models=MODELS, enabled=False, check_interval=0)
+    assert app.MODEL_WEIGHTS['version'] in pipeline.model_inputs('complex')
+
+    # Another process writes a refit
+    app.ModelWeightCalibrator._write(path, dict(app.load_model_weights(path), version='refit-elsewhere'))
+    assert 'refit-elsewhere' in pipeline.model_inputs('complex').split('|')
+    assert app.reload_model_weights_if_changed() is False
+
+    idle = app.ValueBetPipeline(app.ODDS_CACHE, models=MODELS, enabled=False, check_interval=3600)
+    app.ModelWeightCalibrator._write(path, dict(app.load_model_weights(path), version='not-yet'))
+    assert 'not-yet' not in idle.model_inputs('complex')